@@ -0,0 +1,553 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks do servidor da Balança GFIG
+Execute no gateway (Raspberry Pi) para comparar implementações:
+
+    python3 benchmark.py crc
+    python3 benchmark.py decode
+    python3 benchmark.py fetch      (requer MySQL; usa tabelas temporárias bench_*)
+    python3 benchmark.py impulse
+    python3 benchmark.py uploads    (requer MySQL; sessões de teste são apagadas no fim)
+    python3 benchmark.py leituras   (requer MySQL; GET /leituras em memória vs streaming)
+    python3 benchmark.py http       (servidor HTTP com threads vs asyncio, rotas sem MySQL)
+    python3 benchmark.py json       (serialização: json antigo vs stdlib vs orjson)
+"""
+
+import argparse
+import array
+import asyncio
+import http.client
+import json
+import logging
+import math
+import multiprocessing
+import os
+import random
+import statistics
+import struct
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+logging.disable(logging.INFO)
+
+import server
+
+
+def make_data_packets_v2(count: int, seed: int = 1234) -> list:
+    """Gera pacotes DATA v2 (20 bytes) válidos, iguais aos enviados pelo ESP32."""
+    rnd = random.Random(seed)
+    packets = []
+    for i in range(count):
+        body = struct.pack("<HBBIfiBB", server.MAGIC, server.VERSION, server.TYPE_DATA,
+                           i, rnd.uniform(-5.0, 500.0), rnd.randint(-2**23, 2**23), 0, 0)
+        packets.append(body + struct.pack("<H", server.crc16_ccitt_bitwise(body)))
+    return packets
+
+
+def timed(fn, *args, repeat: int = 3) -> float:
+    """Retorna o melhor tempo (s) entre `repeat` execuções."""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def bench_crc(args):
+    packets = make_data_packets_v2(args.packets)
+    bodies = [p[:-2] for p in packets]
+
+    reference = [server.crc16_ccitt_bitwise(b) for b in bodies]
+    print(f"🧪 CRC16-CCITT: {len(bodies)} pacotes DATA v2 ({server.SIZE_DATA} bytes)")
+    baseline = None
+    for name, impl in server.CRC16_IMPLEMENTATIONS.items():
+        if [impl(b) for b in bodies] != reference:
+            print(f"   ❌ {name}: resultado diverge da implementação bit a bit!")
+            continue
+        elapsed = timed(lambda: [impl(b) for b in bodies])
+        rate = len(bodies) / elapsed
+        baseline = baseline or rate
+        print(f"   {name:<8} {rate:>12,.0f} pacotes/s  ({rate / baseline:5.1f}x)")
+    print(f"   Em uso (CRC16_IMPL={server.CRC16_IMPL}): {server.crc16_ccitt.__name__}")
+
+
+def bench_decode(args):
+    packets = make_data_packets_v2(args.packets)
+    stream = b"".join(packets)
+    count = len(packets)
+
+    def per_packet():
+        buf = bytearray(stream)
+        out = []
+        while buf:
+            packet = bytes(buf[:server.SIZE_DATA])
+            del buf[:server.SIZE_DATA]
+            out.append(server.parse_data_packet(packet, 0x02))
+        return out
+
+    reference = per_packet()
+    variants = [("por pacote", per_packet),
+                ("lote struct", lambda: server.decode_data_run_v2(stream, count, use_numpy=False)[0])]
+    if server.np is not None:
+        variants.append(("lote numpy", lambda: server.decode_data_run_v2(stream, count, use_numpy=True)[0]))
+    else:
+        print("   (NumPy não instalado: variante vetorizada ignorada)")
+
+    print(f"🧪 Decodificação DATA v2: rajada de {count} pacotes")
+    baseline = None
+    for name, fn in variants:
+        if fn() != reference:
+            print(f"   ❌ {name}: amostras divergem do caminho por pacote!")
+            continue
+        elapsed = timed(fn)
+        rate = count / elapsed
+        baseline = baseline or rate
+        print(f"   {name:<12} {rate:>12,.0f} amostras/s  ({rate / baseline:5.1f}x)")
+
+
+BENCH_LEITURAS_DDL = """
+CREATE TABLE {table} (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    sessao_id BIGINT NOT NULL,
+    tempo FLOAT,
+    forca FLOAT,
+    ema FLOAT,
+    massaKg FLOAT,
+    timestamp DATETIME(3){index}
+)
+"""
+
+
+def bench_fetch(args):
+    """Latência de `SELECT ... WHERE sessao_id = ? ORDER BY tempo` vs tamanho da tabela."""
+    tables = {
+        "só FK (sessao_id)": ("bench_leituras_fk", ",\n    INDEX (sessao_id)"),
+        "(sessao_id, tempo)": ("bench_leituras_idx", ",\n    INDEX (sessao_id, tempo)"),
+    }
+    checkpoints = sorted(int(n) for n in args.sessions.split(","))
+    conn = server.new_mysql_connection()
+    rnd = random.Random(42)
+    try:
+        with conn.cursor() as cursor:
+            for table, index in tables.values():
+                cursor.execute(f"DROP TABLE IF EXISTS {table}")
+                cursor.execute(BENCH_LEITURAS_DDL.format(table=table, index=index))
+        conn.commit()
+
+        print(f"🧪 Busca de leituras por sessão ({args.rows} leituras/sessão, leituras intercaladas)")
+        print(f"   {'sessões':>8} {'linhas':>10}  " + "  ".join(f"{name:>20}" for name in tables))
+        loaded = 0
+        for target in checkpoints:
+            # Sessões gravadas em paralelo: linhas intercaladas, como em um banco real antigo
+            new_ids = list(range(loaded + 1, target + 1))
+            for chunk_start in range(0, args.rows, 500):
+                rows = [(sid, (i + rnd.random()) * 0.0125, rnd.uniform(0, 50), 0, 0, None)
+                        for i in range(chunk_start, min(chunk_start + 500, args.rows))
+                        for sid in new_ids]
+                with conn.cursor() as cursor:
+                    for table, _ in tables.values():
+                        cursor.executemany(f"INSERT INTO {table} (sessao_id, tempo, forca, ema, massaKg, timestamp) "
+                                           "VALUES (%s, %s, %s, %s, %s, %s)", rows)
+                conn.commit()
+            loaded = target
+
+            results = []
+            for table, _ in tables.values():
+                with conn.cursor() as cursor:
+                    cursor.execute(f"ANALYZE TABLE {table}")
+                    cursor.fetchall()
+                    samples = []
+                    for _ in range(args.queries):
+                        sid = rnd.randint(1, loaded)
+                        t0 = time.perf_counter()
+                        cursor.execute(f"SELECT tempo, forca, ema, massaKg, timestamp FROM {table} "
+                                       "WHERE sessao_id = %s ORDER BY tempo ASC", (sid,))
+                        cursor.fetchall()
+                        samples.append(time.perf_counter() - t0)
+                results.append(statistics.median(samples) * 1000)
+            print(f"   {loaded:>8} {loaded * args.rows:>10,}  " + "  ".join(f"{ms:>17.2f} ms" for ms in results))
+    finally:
+        with conn.cursor() as cursor:
+            for table, _ in tables.values():
+                cursor.execute(f"DROP TABLE IF EXISTS {table}")
+        conn.commit()
+        conn.close()
+
+
+def bench_impulse(args):
+    sizes = [int(n) for n in args.sizes.split(",")]
+    rnd = random.Random(7)
+    if server.np is None:
+        print("   (NumPy não instalado: só o laço em Python será medido)")
+    print("🧪 Impulso positivo (trapézios): laço Python vs NumPy")
+    print(f"   {'amostras':>10} {'python':>12} {'numpy lista':>12} {'numpy array':>12} {'ganho':>8}  diferença relativa")
+    for n in sizes:
+        tempos = [i * 0.0125 + rnd.uniform(-1e-4, 1e-4) for i in range(n)]
+        forcas = [rnd.uniform(-5.0, 500.0) for _ in range(n)]
+        arr_t, arr_f = array.array('d', tempos), array.array('d', forcas)
+
+        ref = server._impulso_positivo_python(tempos, forcas)
+        t_py = timed(server._impulso_positivo_python, tempos, forcas, repeat=args.repeat)
+        if server.np is None:
+            print(f"   {n:>10,} {t_py * 1000:>10.1f}ms")
+            continue
+        vec = server._impulso_positivo_numpy(memoryview(arr_t), memoryview(arr_f))
+        t_list = timed(server._impulso_positivo_numpy, tempos, forcas, repeat=args.repeat)
+        t_arr = timed(server._impulso_positivo_numpy, memoryview(arr_t), memoryview(arr_f), repeat=args.repeat)
+        rel = abs(vec - ref) / abs(ref) if ref else abs(vec)
+        status = "✅" if rel < 1e-9 else "❌"
+        print(f"   {n:>10,} {t_py * 1000:>10.1f}ms {t_list * 1000:>10.1f}ms {t_arr * 1000:>10.2f}ms "
+              f"{t_py / t_arr:>7.0f}x  {status} {rel:.1e}")
+
+
+BENCH_SESSION_BASE = 900_000_000_000_000  # ids fora da faixa de timestamps em ms usada pela interface
+
+
+def process_usage() -> tuple:
+    """(descritores abertos, RSS em KiB, threads) do próprio processo, via /proc."""
+    fds = len(os.listdir("/proc/self/fd"))
+    with open("/proc/self/status") as f:
+        status = dict(line.split(":", 1) for line in f if ":" in line)
+    return fds, int(status["VmRSS"].split()[0]), threading.active_count()
+
+
+def make_session_payload(sessao_id: int, readings: int) -> bytes:
+    inicio = datetime(2024, 1, 1, 12, 0, 0)
+    # Curva de empuxo sintética: meia senoide ao longo da sessão
+    dados = [{"tempo_esp": i * 0.0125, "newtons": 40.0 * math.sin(math.pi * i / max(readings - 1, 1)),
+              "grama_forca": 0, "quilo_forca": 0.0,
+              "timestamp": (inicio + timedelta(milliseconds=12.5 * i)).strftime("%d/%m/%Y %H:%M:%S.%f")[:-3]}
+             for i in range(readings)]
+    return json.dumps({"id": sessao_id, "nome": f"bench-upload-{sessao_id - BENCH_SESSION_BASE}",
+                       "timestamp": inicio.isoformat() + "Z", "dadosTabela": dados}).encode()
+
+
+def bench_uploads(args):
+    """
+    Teste de carga de POST /api/sessoes: servidor HTTP no próprio processo, uma
+    conexão nova por upload (uma thread de handler por requisição, como no
+    navegador). Descritores, RSS e threads devem ficar estáveis ao longo da série.
+    """
+    server.init_mysql_db()
+    if not server.mysql_connected:
+        print("❌ MySQL indisponível")
+        raise SystemExit(1)
+    class QuietHandler(server.APIRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+    httpd = server.DualStackTCPServer(("127.0.0.1", 0), QuietHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    port = httpd.server_address[1]
+
+    def request(method, path, body=None):
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        try:
+            conn.request(method, path, body=body, headers={"Content-Type": "application/json"} if body else {})
+            resp = conn.getresponse()
+            resp.read()
+            return resp.status
+        finally:
+            conn.close()
+
+    def upload(i):
+        sessao_id = BENCH_SESSION_BASE + i
+        return request("POST", "/api/sessoes", make_session_payload(sessao_id, args.readings))
+
+    print(f"🧪 POST /api/sessoes: {args.sessions} uploads de {args.readings} leituras, {args.clients} clientes")
+    print(f"   {'uploads':>8} {'fds':>6} {'RSS (KiB)':>10} {'threads':>8} {'uploads/s':>10}")
+    fd0, rss0, th0 = process_usage()
+    print(f"   {0:>8} {fd0:>6} {rss0:>10,} {th0:>8}")
+    falhas = 0
+    feitos = 0
+    try:
+        with ThreadPoolExecutor(max_workers=args.clients) as pool:
+            for start in range(0, args.sessions, args.sample_every):
+                t0 = time.perf_counter()
+                ids = range(start, min(start + args.sample_every, args.sessions))
+                falhas += sum(1 for status in pool.map(upload, ids) if status != 201)
+                feitos += len(ids)
+                fds, rss, threads = process_usage()
+                print(f"   {feitos:>8} {fds:>6} {rss:>10,} {threads:>8} {len(ids) / (time.perf_counter() - t0):>10.1f}")
+    finally:
+        for i in range(feitos):
+            request("DELETE", f"/api/sessoes/{BENCH_SESSION_BASE + i}")
+        httpd.shutdown()
+        httpd.server_close()
+    fd1, rss1, th1 = process_usage()
+    status = "✅" if falhas == 0 and fd1 - fd0 <= args.clients and th1 - th0 <= args.clients else "❌"
+    print(f"   {status} Δfds={fd1 - fd0:+d}  ΔRSS={rss1 - rss0:+,} KiB  Δthreads={th1 - th0:+d}  falhas={falhas}")
+
+
+def bench_leituras(args):
+    """
+    GET /api/sessoes/{id}/leituras (JSON com gzip): resposta montada em memória
+    vs streaming. Mede o tempo até o primeiro byte, o total e o pico de memória
+    alocada em Python (tracemalloc) durante a requisição, por tamanho de sessão.
+    """
+    import tracemalloc
+
+    server.init_mysql_db()
+    if not server.mysql_connected:
+        print("❌ MySQL indisponível")
+        raise SystemExit(1)
+    class QuietHandler(server.APIRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+    httpd = server.DualStackTCPServer(("127.0.0.1", 0), QuietHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    port = httpd.server_address[1]
+
+    def request(method, path, body=None):
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+        try:
+            t0 = time.perf_counter()
+            conn.request(method, path, body=body, headers={"Accept-Encoding": "gzip"})
+            resp = conn.getresponse()
+            resp.read(1)
+            ttfb = time.perf_counter() - t0
+            size = 1 + len(resp.read())
+            return resp.status, ttfb, time.perf_counter() - t0, size
+        finally:
+            conn.close()
+
+    sizes = [int(n) for n in args.sizes.split(",")]
+    modos = [("em memória", 0), ("streaming", args.chunk)]
+    print(f"🧪 GET /leituras com gzip: resposta em memória vs streaming ({args.chunk} leituras por pedaço)")
+    print(f"   {'leituras':>9} {'modo':<11} {'1º byte':>9} {'total':>9} {'gzip':>11} {'pico Python':>12}")
+    criadas = []
+    try:
+        for i, n in enumerate(sizes):
+            sessao_id = BENCH_SESSION_BASE + i
+            status, *_ = request("POST", "/api/sessoes", make_session_payload(sessao_id, n))
+            if status != 201:
+                print(f"   ❌ upload de {n} leituras falhou ({status})")
+                continue
+            criadas.append(sessao_id)
+            for nome, chunk in modos:
+                server.LEITURAS_STREAM_ROWS = chunk
+                path = f"/api/sessoes/{sessao_id}/leituras"
+                request("GET", path)  # aquece o pool e o cache do MySQL
+                _, ttfb, total, size = min((request("GET", path) for _ in range(args.repeat)), key=lambda r: r[2])
+                tracemalloc.start()
+                request("GET", path)
+                _, pico = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                print(f"   {n:>9,} {nome:<11} {ttfb * 1000:>7.1f}ms {total * 1000:>7.1f}ms {size:>11,} "
+                      f"{pico / 1024:>9,.0f} KiB")
+    finally:
+        for sessao_id in criadas:
+            request("DELETE", f"/api/sessoes/{sessao_id}")
+        httpd.shutdown()
+        httpd.server_close()
+
+
+def http_client_worker(job) -> tuple:
+    """Processo cliente: `requests` GETs em uma HTTPConnection (reabre se o servidor fechar)."""
+    port, paths, requests, keepalive = job
+    headers = {"Accept-Encoding": "gzip"}
+    if not keepalive:
+        headers["Connection"] = "close"
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    latencies, errors = [], 0
+    for i in range(requests):
+        t0 = time.perf_counter()
+        try:
+            conn.request("GET", paths[i % len(paths)], headers=headers)
+            resp = conn.getresponse()
+            resp.read()
+            if resp.status != 200:
+                errors += 1
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            conn.close()
+        latencies.append(time.perf_counter() - t0)
+    conn.close()
+    return latencies, errors
+
+
+def bench_http(args):
+    """
+    requisições/s e latência do front end com uma thread por conexão
+    (DualStackTCPServer) vs o front end no event loop (AsyncHTTPServer). Os
+    clientes rodam em processos separados para não disputar o GIL do servidor;
+    --serial simula a thread serial decodificando rajadas ao mesmo tempo.
+    """
+    server.STATIC_DIR = args.static
+    paths = args.paths.split(",")
+
+    class QuietHandler(server.APIRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+    class QuietBufferedHandler(server.BufferedAPIRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+    threaded = server.DualStackTCPServer(("127.0.0.1", 0), QuietHandler)
+    threading.Thread(target=threaded.serve_forever, daemon=True).start()
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    frontend = asyncio.run_coroutine_threadsafe(
+        server.AsyncHTTPServer(QuietBufferedHandler, workers=args.workers).start("127.0.0.1", 0), loop).result()
+
+    stop = threading.Event()
+    if args.serial:
+        stream = b"".join(make_data_packets_v2(200))
+
+        def serial_load():
+            while not stop.is_set():
+                server.decode_data_run_v2(stream, 200, use_numpy=False)
+                time.sleep(0.005)
+        threading.Thread(target=serial_load, daemon=True).start()
+
+    print(f"🧪 HTTP: {args.clients} clientes x {args.requests} GETs em {', '.join(paths)}"
+          + (" (com carga serial)" if args.serial else ""))
+    print(f"   {'servidor':<10} {'conexão':<11} {'req/s':>9} {'p50':>9} {'p99':>9} {'erros':>6}")
+    try:
+        with multiprocessing.Pool(args.clients) as pool:
+            for keepalive in (True, False):
+                for name, port in (("threads", threaded.server_address[1]), ("asyncio", frontend.port)):
+                    jobs = [(port, paths, args.requests, keepalive)] * args.clients
+                    t0 = time.perf_counter()
+                    results = pool.map(http_client_worker, jobs)
+                    elapsed = time.perf_counter() - t0
+                    latencies = sorted(lat for lats, _ in results for lat in lats)
+                    errors = sum(err for _, err in results)
+                    p50 = latencies[len(latencies) // 2] * 1000
+                    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+                    print(f"   {name:<10} {'keep-alive' if keepalive else 'close':<11} {len(latencies) / elapsed:>9,.0f} "
+                          f"{p50:>7.2f}ms {p99:>7.2f}ms {errors:>6}")
+    finally:
+        stop.set()
+        threaded.shutdown()
+        threaded.server_close()
+        loop.call_soon_threadsafe(frontend.close)
+
+
+def make_json_payloads(rows: int, sessions: int, frames: int) -> dict:
+    """Respostas típicas: /api/sessoes/<id>/leituras, /api/sessoes e frames data_batch do WebSocket."""
+    rnd = random.Random(42)
+    inicio = datetime(2026, 1, 1, 12, 0, 0)
+    leituras = [{"tempo": i * 0.0125, "forca": rnd.uniform(-5.0, 500.0), "ema": rnd.uniform(-5.0, 500.0),
+                 "massaKg": rnd.uniform(0.0, 50.0), "timestamp": inicio + timedelta(milliseconds=i * 12.5)}
+                for i in range(rows)]
+    sessoes = []
+    for i in range(sessions):
+        data = inicio + timedelta(days=i)
+        sessoes.append(server.sessao_to_json({
+            "id": 1_700_000_000_000 + i, "nome": f"Sessão de teste {i}", "data_inicio": data,
+            "data_fim": data + timedelta(seconds=5), "data_modificacao": data, "impulso_total": rnd.uniform(1, 300),
+            "motor_class": "F", "class_color": "#3498db", "forca_maxima": rnd.uniform(10, 500),
+            "motor_name": "F15-4", "motor_diameter": 29.0, "motor_temperatura": 23.5,
+        }))
+    batches = [{"type": "data_batch",
+                "samples": [{"type": "data", "tempo": (f * 50 + s) * 0.0125, "forca": rnd.uniform(-5.0, 500.0),
+                             "raw": rnd.randint(-2**23, 2**23), "status": 0} for s in range(50)]}
+               for f in range(frames)]
+    return {"leituras": leituras, "sessoes": sessoes, "data_batch": batches}
+
+
+def bench_json(args):
+    payloads = make_json_payloads(args.rows, args.sessions, args.frames)
+    # Como o servidor serializava antes: default=str nas respostas HTTP e
+    # sanitize_for_json + separators compactos em cada frame WebSocket
+    http_antigo = lambda obj: json.dumps(obj, default=str).encode('utf-8')
+    ws_antigo = lambda obj: json.dumps(server.sanitize_for_json(obj), separators=(",", ":"))
+    encoders = [("antigo", None), ("stdlib", server._json_dumps_stdlib)]
+    if server.orjson is not None:
+        encoders.append(("orjson", lambda obj: server.orjson.dumps(
+            obj, default=server._json_default, option=server._ORJSON_OPTIONS)))
+    else:
+        print("   (orjson não instalado: só o módulo json será medido)")
+
+    print(f"🧪 Serialização JSON (backend do servidor: {server.JSON_BACKEND})")
+    print(f"   {'payload':<10} {'encoder':<8} {'tempo':>10} {'bytes':>11} {'ganho':>7}")
+    for name, obj in payloads.items():
+        if name == "data_batch":
+            antigo = lambda objs: [ws_antigo(o) for o in objs]
+        else:
+            antigo = http_antigo
+        base = None
+        for enc_name, enc in encoders:
+            if enc is None:
+                fn = antigo
+            elif name == "data_batch":
+                fn = lambda objs, enc=enc: [enc(o).decode('utf-8') for o in objs]
+            else:
+                fn = enc
+            out = fn(obj)
+            size = sum(len(o) for o in out) if isinstance(out, list) else len(out)
+            t = timed(fn, obj, repeat=args.repeat)
+            base = base or t
+            print(f"   {name:<10} {enc_name:<8} {t * 1000:>8.2f}ms {size:>11,} {base / t:>6.1f}x")
+        # Os encoders novos precisam produzir o mesmo documento
+        amostra = obj[0] if name == "data_batch" else obj
+        docs = [json.loads(enc(amostra)) for _, enc in encoders[1:]]
+        status = "✅" if all(d == docs[0] for d in docs) else "❌"
+        print(f"   {name:<10} {status} saídas equivalentes entre encoders")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    p = sub.add_parser("crc", help="CRC16-CCITT: bit a bit vs tabela vs binascii.crc_hqx")
+    p.add_argument("--packets", type=int, default=50000)
+    p.set_defaults(func=bench_crc)
+
+    p = sub.add_parser("decode", help="DATA v2: decodificação por pacote vs em lote (struct/NumPy)")
+    p.add_argument("--packets", type=int, default=20000)
+    p.set_defaults(func=bench_decode)
+
+    p = sub.add_parser("fetch", help="MySQL: latência de busca de uma sessão vs tamanho da tabela leituras")
+    p.add_argument("--sessions", default="10,50,200", help="pontos de medição (nº de sessões), separados por vírgula")
+    p.add_argument("--rows", type=int, default=4000, help="leituras por sessão")
+    p.add_argument("--queries", type=int, default=20, help="buscas medidas por ponto")
+    p.set_defaults(func=bench_fetch)
+
+    p = sub.add_parser("impulse", help="calcular_impulso_total: laço Python vs NumPy (listas e memoryview)")
+    p.add_argument("--sizes", default="10000,100000,1000000", help="tamanhos das séries, separados por vírgula")
+    p.add_argument("--repeat", type=int, default=3)
+    p.set_defaults(func=bench_impulse)
+
+    p = sub.add_parser("uploads", help="carga em POST /api/sessoes: descritores, memória e threads estáveis")
+    p.add_argument("--sessions", type=int, default=2000, help="total de uploads")
+    p.add_argument("--readings", type=int, default=200, help="leituras por sessão")
+    p.add_argument("--clients", type=int, default=4, help="uploads simultâneos")
+    p.add_argument("--sample-every", type=int, default=250, help="uploads entre cada medição")
+    p.set_defaults(func=bench_uploads)
+
+    p = sub.add_parser("leituras", help="GET /leituras: resposta em memória vs streaming (1º byte e pico de memória)")
+    p.add_argument("--sizes", default="10000,100000,400000", help="leituras por sessão, separadas por vírgula")
+    p.add_argument("--chunk", type=int, default=server.LEITURAS_STREAM_ROWS or 2000, help="leituras por pedaço no streaming")
+    p.add_argument("--repeat", type=int, default=3)
+    p.set_defaults(func=bench_leituras)
+
+    p = sub.add_parser("http", help="HTTP: servidor com threads vs asyncio (req/s e p99)")
+    p.add_argument("--clients", type=int, default=8, help="processos cliente simultâneos")
+    p.add_argument("--requests", type=int, default=2000, help="GETs por cliente")
+    p.add_argument("--paths", default="/api/time,/api/info,/minimal.html", help="rotas, separadas por vírgula")
+    p.add_argument("--static", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"),
+                   help="diretório dos arquivos estáticos")
+    p.add_argument("--workers", type=int, default=server.HTTP_ASYNC_WORKERS, help="threads do front end asyncio")
+    p.add_argument("--serial", action="store_true", help="decodifica rajadas seriais em paralelo (disputa de GIL)")
+    p.set_defaults(func=bench_http)
+
+    p = sub.add_parser("json", help="serialização de respostas e frames WebSocket: json vs orjson")
+    p.add_argument("--rows", type=int, default=20000, help="leituras na resposta de uma sessão")
+    p.add_argument("--sessions", type=int, default=500, help="sessões na listagem /api/sessoes")
+    p.add_argument("--frames", type=int, default=1000, help="frames data_batch de 50 amostras")
+    p.add_argument("--repeat", type=int, default=3)
+    p.set_defaults(func=bench_json)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
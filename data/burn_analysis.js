@@ -5,6 +5,19 @@ let burnStartTime = null;
 let burnEndTime = null;
 let burnChartColorMode = 'simple'; // 'class' ou 'simple' - simple é o padrão com cor sólida azul
 
+// Math.max(...arr) estoura a pilha com centenas de milhares de leituras: usa laço
+function maxDoArray(arr) {
+  let max = -Infinity;
+  for (let i = 0; i < arr.length; i++) if (arr[i] > max) max = arr[i];
+  return max;
+}
+
+function minDoArray(arr) {
+  let min = Infinity;
+  for (let i = 0; i < arr.length; i++) if (arr[i] < min) min = arr[i];
+  return min;
+}
+
 function setBurnChartColorMode(mode) {
   burnChartColorMode = mode;
   
@@ -61,7 +74,7 @@ function aplicarPontosDeQueima(session) {
 
   // Add calculated properties that are expected by PDF generation
   dadosFiltrados.duracao = dadosFiltrados.tempos.length > 0
-    ? Math.max(...dadosFiltrados.tempos) - Math.min(...dadosFiltrados.tempos)
+    ? maxDoArray(dadosFiltrados.tempos) - minDoArray(dadosFiltrados.tempos)
     : 0;
   dadosFiltrados.pontos = dadosFiltrados.tempos.length;
 
@@ -127,8 +140,8 @@ function updateTestTimeInfo(session, dados, burnStart, burnEnd) {
   const testEndTime = session.data_fim;
 
   if (dados.tempos && dados.tempos.length > 0) {
-    const firstReadingTime = Math.min(...dados.tempos);
-    const lastReadingTime = Math.max(...dados.tempos);
+    const firstReadingTime = minDoArray(dados.tempos);
+    const lastReadingTime = maxDoArray(dados.tempos);
     const totalDuration = lastReadingTime - firstReadingTime;
     const totalReadings = dados.tempos.length;
     const readingsPerSecond = totalDuration > 0 ? (totalReadings / totalDuration).toFixed(1) : '0.0';
@@ -215,7 +228,7 @@ function fecharModalBurnAnalysis() {
 
 function detectBurnStart(dados) {
   // Detecta o início da queima como o primeiro ponto onde a força > 5% da máxima
-  const maxForce = Math.max(...dados.newtons);
+  const maxForce = maxDoArray(dados.newtons);
   const threshold = maxForce * 0.05;
 
   for (let i = 0; i < dados.newtons.length; i++) {
@@ -229,7 +242,7 @@ function detectBurnStart(dados) {
 
 function detectBurnEnd(dados) {
   // Detecta o fim da queima como o último ponto onde a força > 5% da máxima
-  const maxForce = Math.max(...dados.newtons);
+  const maxForce = maxDoArray(dados.newtons);
   const threshold = maxForce * 0.05;
 
   for (let i = dados.newtons.length - 1; i >= 0; i--) {
@@ -511,7 +524,7 @@ function updateBurnMetrics(dados) {
   const impulsoData = calcularAreaSobCurva(burnData.tempos, burnData.newtons, false);
   const metricasPropulsao = calcularMetricasPropulsao(impulsoData);
   const avgForce = impulsoData.impulsoTotal / duration;
-  const maxForce = Math.max(...burnData.newtons);
+  const maxForce = maxDoArray(burnData.newtons);
 
   // Atualizar displays
   document.getElementById('burn-duration-display').textContent = `${duration.toFixed(3)} s`;
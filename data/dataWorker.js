@@ -259,6 +259,15 @@ function processWebSocketMessage(data) {
                 processDataPoint(data);
                 break;
 
+            case "data_batch":
+                // Frame agrupado pelo servidor (WS_BATCH_WINDOW_MS): várias leituras de uma vez
+                if (Array.isArray(data.samples)) {
+                    for (let i = 0; i < data.samples.length; i++) {
+                        processDataPoint(data.samples[i]);
+                    }
+                }
+                break;
+
             case "config":
                 // Sanitiza configuração e fixa defaults para números inválidos
                 const cfg = { ...data };
@@ -301,6 +310,30 @@ function processWebSocketMessage(data) {
             case "mysql_save_error": // NEW: Handle MySQL save error
                 self.postMessage({ type: 'mysql_save_error', payload: { message: data.message, sessionId: data.sessionId } });
                 break;
+
+            case "recording_started":
+            case "recording_stopped":
+            case "recording_error":
+                // Gravação feita pelo servidor direto do stream serial
+                self.postMessage({
+                    type: data.type,
+                    payload: {
+                        message: data.message,
+                        sessionId: data.sessionId,
+                        samples: data.samples,
+                        impulsoTotal: data.impulsoTotal,
+                        motorClass: data.motorClass
+                    }
+                });
+                break;
+
+            case "migration_progress":
+                // Migração de métricas das sessões antigas, em segundo plano no servidor
+                self.postMessage({
+                    type: 'migration_progress',
+                    payload: { status: data.status, done: data.done, total: data.total, error: data.error }
+                });
+                break;
         }
     }
 }
@@ -451,6 +484,12 @@ self.onmessage = (e) => {
                 commandToSend.payload = payload.sessionData;
                 console.log('[Worker] ✅ Comando SAVE_SESSION_TO_MYSQL identificado');
             }
+            else if (payload.cmd === 'start_recording' || payload.cmd === 'stop_recording') {
+                // Apenas metadados: as leituras são gravadas pelo servidor
+                commandToSend.cmd = payload.cmd;
+                commandToSend.payload = payload.value || {};
+                console.log(`[Worker] ✅ Comando ${payload.cmd.toUpperCase()} identificado`);
+            }
             else if (payload.cmd === 't') {
                 commandToSend.cmd = 't';
                 console.log('[Worker] ✅ Comando de TARA identificado');
@@ -479,7 +479,12 @@ let minForceInN = Infinity;
 let lastForcaN = 0;
 let lastEmaN = 0;
 let rawDataN = []; // Mantido para conversão de unidades
+let sessaoDecimada = null; // Sessão do DB exibida com série decimada no servidor ({ id, piramide })
+const tileCache = new Map(); // `${sessão}:${nível}:${tile}` -> tile de /api/sessoes/{id}/tiles
+const TILE_CACHE_MAX = 256;
+const SESSAO_DECIMACAO_MIN_PONTOS = 5000; // pontos pedidos ao abrir uma sessão do DB; acima disso ela é exibida decimada
 let isSessionActive = false;
+let gravacaoServidor = null; // Gravação feita pelo servidor direto do stream serial ({ id, nome })
 let isChartPaused = false;
 let sessionStartTime = null; // Armazena o tempo inicial da sessão para normalização
 let sessionRecordingStartTimestamp = null; // Wall-clock time when recording started
@@ -832,6 +837,15 @@ function initializeApexChart() {
       zoom: {
         enabled: true
       },
+      events: {
+        // Sessões grandes do DB: cada zoom busca só a janela visível na resolução da tela
+        zoomed: (chartContext, { xaxis }) => {
+          if (sessaoDecimada && xaxis) carregarSerieDecimada(sessaoDecimada.id, xaxis.min, xaxis.max);
+        },
+        beforeResetZoom: () => {
+          if (sessaoDecimada) carregarSerieDecimada(sessaoDecimada.id);
+        }
+      },
       background: 'transparent'
     },
     grid: {
@@ -909,6 +923,7 @@ function clearChart() {
   maxForceInN = -Infinity;
   minForceInN = Infinity;
   rawDataN = [];
+  sessaoDecimada = null;
   chart.updateSeries([{ data: [] }]);
   updateAccumulatedPointsDisplay(); // Atualiza o contador para 0
   showNotification("info", "Gráfico limpo. (Atalho: L)", 3000);
@@ -1014,6 +1029,7 @@ function toggleChartPause(setPaused = null) {
     isChartPaused = false;
   }
   if (isChartPaused) {
+    sessaoDecimada = null; // dados ao vivo substituem a sessão visualizada
     setChartMode('deslizante');
     showNotification('info', 'Gráfico retomado (Deslizante). (Atalho: P)');
   } else {
@@ -1146,6 +1162,47 @@ function handleWorkerMessage(event) {
     case 'mysql_save_error':
       showNotification('error', `Erro ao salvar sessão "${notificationMessage}" no MySQL.`); // Use notificationMessage
       break;
+    case 'recording_started':
+      showNotification('info', `Gravação "${payload.message}" iniciada no servidor.`);
+      if (!gravacaoServidor) {
+        // Iniciada em outra aba (ou antes desta aba abrir): permite encerrá-la daqui
+        gravacaoServidor = { id: payload.sessionId, nome: payload.message, local: false };
+        document.getElementById('btn-abrir-modal-sessao').disabled = true;
+        document.getElementById('btn-encerrar-sessao').disabled = false;
+      }
+      break;
+    case 'recording_stopped':
+      showNotification('success', `Gravação "${payload.message}" salva no MySQL pelo servidor (${payload.samples} leituras).`);
+      if (gravacaoServidor && gravacaoServidor.id === payload.sessionId) {
+        // Encerrada pela duração configurada ou por outra aba
+        gravacaoServidor = null;
+        if (!isSessionActive) {
+          document.getElementById('btn-abrir-modal-sessao').disabled = false;
+          document.getElementById('btn-encerrar-sessao').disabled = true;
+        }
+      }
+      loadAndDisplayAllSessions();
+      break;
+    case 'recording_error':
+      showNotification('error', `Erro na gravação no servidor: ${payload.message}`);
+      if (gravacaoServidor && gravacaoServidor.local && isSessionActive) {
+        // A tabela desta aba tem a sessão inteira: ao encerrar, salva pelo caminho do navegador
+        gravacaoServidor = null;
+        showNotification('warning', 'A sessão será salva por este navegador ao encerrar.');
+      }
+      break;
+    case 'migration_progress':
+      if (payload.status === 'running' && payload.done === 0) {
+        showNotification('info', `Calculando métricas de ${payload.total} sessões antigas em segundo plano...`);
+      } else if (payload.status === 'done') {
+        showNotification('success', `Métricas de ${payload.done} sessões antigas calculadas.`);
+        loadAndDisplayAllSessions();
+      } else if (payload.status === 'error') {
+        showNotification('error', `Migração interrompida (${payload.done}/${payload.total}): ${payload.error}`);
+      } else {
+        console.log(`[Migração] ${payload.done}/${payload.total} sessões`);
+      }
+      break;
     case 'debug':
       console.log("[Worker Debug]:", message);
       break;
@@ -1616,6 +1673,18 @@ function iniciarSessaoAvancado() {
     isSessionActive = true;
     sessionStartTime = null; // Resetar o tempo inicial (será definido na primeira leitura)
 
+    // Gravação no servidor: as leituras vão do stream serial direto para o MySQL,
+    // então fechar esta aba não perde a sessão. A tabela local fica como cópia.
+    if (document.getElementById('sessao-gravar-servidor')?.checked && isMysqlConnected) {
+      gravacaoServidor = { id: Date.now(), nome: nomeSessao, local: true };
+      sendCommandToWorker('start_recording', {
+        id: gravacaoServidor.id,
+        nome: nomeSessao,
+        duracao: duracaoSegundos,
+        metadadosMotor: lerMetadadosMotorDoModal()
+      });
+    }
+
     // O botão de nova sessão já está desabilitado, mas o de encerrar é habilitado aqui
     document.getElementById('btn-encerrar-sessao').disabled = false;
 
@@ -1671,7 +1740,7 @@ function iniciarSessaoAvancado() {
 // --- Funções de Sessão ---
 
 async function encerrarSessao() {
-  if (!isSessionActive) return;
+  if (!isSessionActive && !gravacaoServidor) return;
   
   // Limpa timers
   if (temporizadorSessaoId) {
@@ -1690,15 +1759,27 @@ async function encerrarSessao() {
   if(tempoRestanteEl) tempoRestanteEl.style.display = 'none';
 
   const nomeSessao = document.getElementById('sessao-nome').value.trim();
+  const servidor = gravacaoServidor;
+  gravacaoServidor = null;
+  if (servidor) {
+    // Só a aba que iniciou a gravação tem os metadados do modal; as demais apenas encerram
+    sendCommandToWorker('stop_recording', servidor.local
+      ? { nome: nomeSessao || servidor.nome, metadadosMotor: lerMetadadosMotorDoModal() }
+      : {});
+  }
   const tabela = document.getElementById("tabela").querySelector("tbody");
-  if (tabela.rows.length > 0) {
+  if (isSessionActive && tabela.rows.length > 0) {
     sessionRecordingEndTimestamp = new Date(); // Capture wall-clock end time
-    const gravacao = await salvarDadosDaSessao(nomeSessao, tabela); // Modified to await
+    // Mesmo ID da sessão gravada no servidor: a cópia local não vira uma sessão duplicada
+    const gravacao = await salvarDadosDaSessao(nomeSessao, tabela, servidor ? servidor.id : undefined);
     
     // Se a sessão foi salva com sucesso
     if (gravacao) {
-      // Sempre tenta enviar para MySQL se conectado
-      if (isMysqlConnected) {
+      if (servidor) {
+        // As leituras já estão no MySQL; o servidor avisa com 'recording_stopped'
+        showNotification('info', 'Encerrando a gravação "' + gravacao.nome + '" no servidor...');
+      } else if (isMysqlConnected) {
+        // Sempre tenta enviar para MySQL se conectado
         showNotification('info', 'Enviando sessão "' + gravacao.nome + '" para o MySQL...');
         sendCommandToWorker('save_session_to_mysql', gravacao); // Save to DB via worker
       } else {
@@ -1713,7 +1794,7 @@ async function encerrarSessao() {
     } else {
       showNotification('error', 'Erro ao salvar a sessão. Verifique se o LocalStorage não está cheio.');
     }
-  } else {
+  } else if (!servidor) {
     showNotification('info', 'Nenhum dado foi gravado. Nada foi salvo.');
   }
   isSessionActive = false;
@@ -1726,19 +1807,8 @@ async function encerrarSessao() {
   document.getElementById('sessao-nome').value = ''; // Limpa o nome no modal
 }
 
-async function salvarDadosDaSessao(nome, tabela) {
-  console.log(`[salvarDadosDaSessao] Iniciando salvamento da sessão: "${nome}"`);
-  console.log(`[salvarDadosDaSessao] Número de linhas na tabela:`, tabela.rows.length);
-  
-  const dadosTabela = Array.from(tabela.rows).map(linha => ({
-    timestamp: linha.cells[0].innerText,
-    tempo_esp: linha.cells[1].innerText,
-    newtons: linha.cells[2].innerText,
-    grama_forca: linha.cells[3].innerText,
-    quilo_forca: linha.cells[4].innerText
-  })).reverse();
-
-  const metadadosMotor = {
+function lerMetadadosMotorDoModal() {
+  return {
     diameter: parseFloat(document.getElementById('sessao-meta-diametro')?.value) || null,
     length: parseFloat(document.getElementById('sessao-meta-comprimento')?.value) || null,
     manufacturer: document.getElementById('sessao-meta-fabricante')?.value?.trim() || null,
@@ -1750,13 +1820,28 @@ async function salvarDadosDaSessao(nome, tabela) {
     umidade: document.getElementById('sessao-meta-umidade')?.value ? parseFloat(document.getElementById('sessao-meta-umidade').value) : null,
     pressao: document.getElementById('sessao-meta-pressao')?.value ? parseFloat(document.getElementById('sessao-meta-pressao').value) : null,
   };
+}
+
+async function salvarDadosDaSessao(nome, tabela, id = Date.now()) {
+  console.log(`[salvarDadosDaSessao] Iniciando salvamento da sessão: "${nome}"`);
+  console.log(`[salvarDadosDaSessao] Número de linhas na tabela:`, tabela.rows.length);
+  
+  const dadosTabela = Array.from(tabela.rows).map(linha => ({
+    timestamp: linha.cells[0].innerText,
+    tempo_esp: linha.cells[1].innerText,
+    newtons: linha.cells[2].innerText,
+    grama_forca: linha.cells[3].innerText,
+    quilo_forca: linha.cells[4].innerText
+  })).reverse();
+
+  const metadadosMotor = lerMetadadosMotorDoModal();
 
   // Use the captured timestamps or fallback to current time
   const startTimestamp = sessionRecordingStartTimestamp ? sessionRecordingStartTimestamp.toISOString() : new Date().toISOString();
   const endTimestamp = sessionRecordingEndTimestamp ? sessionRecordingEndTimestamp.toISOString() : new Date().toISOString();
 
   const gravacao = {
-    id: Date.now(),
+    id,
     nome,
     timestamp: startTimestamp,
     data_inicio: startTimestamp,
@@ -2550,6 +2635,7 @@ function setYAxisRange(mode) {
 // Util: interpreta timestamp vindo do DB como UTC e formata para dd/mm/yyyy HH:MM:SS.mmm (UTC)
 function parseDbTimestampToUTC(ts) {
   if (!ts) return null;
+  if (ts instanceof Date) return ts;
   let s = typeof ts === 'string' ? ts : String(ts);
   // Normaliza: 'YYYY-MM-DD HH:MM:SS(.ffffff)' -> 'YYYY-MM-DDTHH:MM:SS(.mmm)Z'
   s = s.replace(' ', 'T');
@@ -2571,6 +2657,121 @@ function formatUtcDdMm(date) {
   return `${dd}/${mm}/${yyyy} ${HH}:${MM}:${SS}.${mmm}`;
 }
 
+// Leituras de uma sessão do DB no formato binário colunar (/leituras?format=f32).
+// Cabeçalho de 16 bytes ('GFLC', versão, nº de colunas, n) seguido das colunas
+// timestamp (Float64, ms UTC), tempo, forca e massaKg (Float32), já alinhadas:
+// as views apontam direto para o buffer, sem parse de JSON. Com ?points= a
+// resposta é decimada e `total` traz o nº de leituras da sessão (X-Leituras-Total).
+async function fetchDbReadingColumns(sessionId, options = {}, params = {}) {
+  const query = new URLSearchParams({ format: 'f32', ...params });
+  const resp = await apiFetch(`/api/sessoes/${sessionId}/leituras?${query}`, options);
+  if (!resp.ok) return null;
+  const buffer = await resp.arrayBuffer();
+  const header = new DataView(buffer, 0, 16);
+  const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+  if (magic !== 'GFLC' || header.getUint8(4) !== 1) {
+    throw new Error('Formato binário de leituras desconhecido');
+  }
+  const n = header.getUint32(8, true);
+  let offset = 16;
+  const timestamp = new Float64Array(buffer, offset, n); offset += 8 * n;
+  const tempo = new Float32Array(buffer, offset, n); offset += 4 * n;
+  const forca = new Float32Array(buffer, offset, n); offset += 4 * n;
+  const massaKg = new Float32Array(buffer, offset, n);
+  const total = Number(resp.headers.get('X-Leituras-Total')) || n;
+  return { n, total, timestamp, tempo, forca, massaKg };
+}
+
+// Mesmo formato de linha do JSON de /leituras ({tempo, forca, massaKg, timestamp}),
+// com timestamp como Date (UTC) em vez de string.
+async function fetchDbReadings(sessionId, options = {}, params = {}) {
+  const cols = await fetchDbReadingColumns(sessionId, options, params);
+  if (!cols) return null;
+  const rows = new Array(cols.n);
+  rows.total = cols.total;
+  for (let i = 0; i < cols.n; i++) {
+    const ts = cols.timestamp[i];
+    rows[i] = {
+      tempo: cols.tempo[i],
+      forca: cols.forca[i],
+      massaKg: cols.massaKg[i],
+      timestamp: Number.isNaN(ts) ? null : new Date(ts)
+    };
+  }
+  return rows;
+}
+
+async function fetchTile(sessionId, level, tile) {
+  const key = `${sessionId}:${level}:${tile}`;
+  if (tileCache.has(key)) return tileCache.get(key);
+  const resp = await apiFetch(`/api/sessoes/${sessionId}/tiles?level=${level}&start=${tile}`);
+  if (!resp.ok) throw new Error(`Tile ${key} indisponível (${resp.status})`);
+  const data = await resp.json();
+  if (tileCache.size >= TILE_CACHE_MAX) tileCache.delete(tileCache.keys().next().value);
+  tileCache.set(key, data);
+  return data;
+}
+
+// Pontos [tempo, N] da janela a partir da pirâmide: escolhe o nível mais fino cujo
+// nº de entradas na janela cabe na largura do gráfico e busca só os tiles que a cobrem.
+async function serieDaPiramide(sessionId, piramide, from, to, largura) {
+  const inicio = Number.isFinite(from) ? from : piramide.tempoInicio;
+  const fim = Number.isFinite(to) ? to : piramide.tempoFim;
+  const duracao = Math.max(piramide.tempoFim - piramide.tempoInicio, 1e-9);
+  const amostras = piramide.samples * Math.min(1, (fim - inicio) / duracao);
+  const nivel = piramide.levels.find(l => amostras / l.factor <= largura) || piramide.levels[piramide.levels.length - 1];
+
+  const ultimoTileAntes = (t) => {
+    let i = 0;
+    while (i + 1 < nivel.tileStarts.length && nivel.tileStarts[i + 1] <= t) i++;
+    return i;
+  };
+  const tiles = [];
+  for (let k = ultimoTileAntes(inicio); k <= ultimoTileAntes(fim); k++) {
+    tiles.push(fetchTile(sessionId, nivel.level, k));
+  }
+
+  const pontos = [];
+  for (const tile of await Promise.all(tiles)) {
+    for (let i = 0; i < tile.tempo.length; i++) {
+      const t = tile.tempo[i];
+      if (t < inicio || t > fim) continue;
+      if (nivel.level === 0) {
+        pontos.push([t, tile.mean[i]]);
+      } else {
+        // Envelope do balde: mínimo e máximo no mesmo instante
+        pontos.push([t, tile.min[i]], [t, tile.max[i]]);
+      }
+    }
+  }
+  return pontos;
+}
+
+// Série da janela [from, to] (s) com ~1 ponto por pixel do gráfico: tiles da pirâmide
+// quando disponíveis, senão a decimação min/max de /leituras?points=.
+// Substitui os dados do gráfico sem tocar na tabela.
+async function carregarSerieDecimada(sessionId, from, to) {
+  const el = document.querySelector('#grafico');
+  const largura = Math.max(200, Math.round((el && el.clientWidth) || 1000));
+  try {
+    let pontos;
+    if (sessaoDecimada && sessaoDecimada.piramide) {
+      pontos = await serieDaPiramide(sessionId, sessaoDecimada.piramide, from, to, largura);
+    } else {
+      const params = { points: largura * 2 };
+      if (Number.isFinite(from)) params.from = from;
+      if (Number.isFinite(to)) params.to = to;
+      const cols = await fetchDbReadingColumns(sessionId, {}, params);
+      pontos = cols ? Array.from(cols.tempo, (t, i) => [t, cols.forca[i]]) : null;
+    }
+    if (!pontos || !sessaoDecimada || sessaoDecimada.id !== sessionId) return;
+    rawDataN = pontos;
+    chart.updateSeries([{ data: rawDataN.map(([t, f]) => [t, convertForce(f, displayUnit)]) }]);
+  } catch (e) {
+    console.warn('Falha ao carregar série decimada:', e);
+  }
+}
+
 async function fetchDbSessions() {
   try {
     const response = await apiFetch('/api/sessoes');
@@ -2765,6 +2966,16 @@ async function loadAndDisplayAllSessions() {
       const motorClass = session.motorClass || 'N/A';
       const classColor = session.classColor || '#95a5a6';
 
+      // Métricas de empuxo calculadas pelo servidor ao salvar (sessões do DB)
+      const me = session.metricasEmpuxo || {};
+      const empuxoInfo = me.forcaPico !== null && me.forcaPico !== undefined ? `
+        <p style="font-size: 0.75rem; color: var(--cor-texto-secundario); margin-top: 3px;">
+          🔥 ${escapeHtml(me.designacao) || 'N/D'} • Pico: ${Number(me.forcaPico).toFixed(1)} N em ${Number(me.tempoAtePico).toFixed(2)} s •
+          Queima: ${Number(me.tempoQueima).toFixed(2)} s • Média: ${Number(me.forcaMedia).toFixed(1)} N •
+          Impulso da queima: ${Number(me.impulsoQueima).toFixed(2)} N⋅s
+        </p>
+      ` : '';
+
       // Metadados do motor
       const meta = session.metadadosMotor || {};
       const hasMeta = meta.diameter || meta.length || meta.manufacturer || meta.propweight || meta.totalweight;
@@ -2787,7 +2998,7 @@ async function loadAndDisplayAllSessions() {
         </p>
       ` : '';
 
-      const metadadosDisplay = motorInfo + conditionsInfo;
+      const metadadosDisplay = empuxoInfo + motorInfo + conditionsInfo;
 
       // Indicador de conflito
       const conflictIndicator = session.hasConflict ? `
@@ -3088,9 +3299,8 @@ async function salvarMetadadosMotor(sessionId) {
     // Busca as leituras se não estiverem presentes
     if (!sessionToUpdate.dadosTabela || sessionToUpdate.dadosTabela.length === 0) {
       try {
-        const readingsResp = await apiFetch(`/api/sessoes/${sessionId}/leituras`);
-        if (readingsResp.ok) {
-          const dbReadings = await readingsResp.json();
+        const dbReadings = await fetchDbReadings(sessionId);
+        if (dbReadings) {
           sessionToUpdate.dadosTabela = dbReadings.map(r => ({
             timestamp: formatUtcDdMm(parseDbTimestampToUTC(r.timestamp)),
             tempo_esp: r.tempo,
@@ -3207,9 +3417,8 @@ async function getSessionDataForExport(sessionId, source) {
       const dbSession = await dbSessionResponse.json();
 
       if (dbSession) {
-        const readingsResponse = await apiFetch('/api/sessoes/' + sessionId + '/leituras');
-        if (!readingsResponse.ok) throw new Error('Falha ao carregar leituras do DB para exportação.');
-        const dbReadings = await readingsResponse.json();
+        const dbReadings = await fetchDbReadings(sessionId);
+        if (!dbReadings) throw new Error('Falha ao carregar leituras do DB para exportação.');
 
         sessionData = {
           id: dbSession.id,
@@ -3253,6 +3462,84 @@ async function getSessionDataForExport(sessionId, source) {
 // ... (resto do código)
 
 // Visualiza uma sessão salva (gráfico + tabela) garantindo eixo X numérico e ordenado
+// Timestamp do DB vem como UTC "ingênuo": formata sem converter de fuso
+function formatarTimestampLeitura(date) {
+  return date ? date.toLocaleString('pt-BR', { hour12: false, timeZone: 'UTC' }).replace(', ', ' ') : '';
+}
+
+// Preenche a tabela de leituras ([timestamp, tempo (s), força (N)]) em blocos,
+// para não travar a UI em sessões muito grandes.
+function preencherTabelaLeituras(linhas) {
+  const tbody = document.querySelector('#tabela tbody');
+  if (!tbody) return;
+  tbody.innerHTML = '';
+  const renderChunk = (startIdx, chunkSize = 1000) => {
+    const end = Math.min(startIdx + chunkSize, linhas.length);
+    const frag = document.createDocumentFragment();
+
+    for (let i = startIdx; i < end; i++) {
+      const [ts, t, N] = linhas[i];
+      const gf = (N / 9.80665) * 1000;
+      const kgf = (N / 9.80665);
+
+      const tr = document.createElement('tr');
+      const tdTs = document.createElement('td'); tdTs.textContent = ts;
+      const tdT = document.createElement('td'); tdT.textContent = t.toFixed(3);
+      const tdN = document.createElement('td'); tdN.textContent = N.toFixed(6);
+      const tdGf = document.createElement('td'); tdGf.textContent = gf.toFixed(3);
+      const tdKgf = document.createElement('td'); tdKgf.textContent = kgf.toFixed(6);
+
+      tr.appendChild(tdTs);
+      tr.appendChild(tdT);
+      tr.appendChild(tdN);
+      tr.appendChild(tdGf);
+      tr.appendChild(tdKgf);
+      frag.appendChild(tr);
+    }
+
+    tbody.appendChild(frag);
+
+    if (end < linhas.length) {
+      // Próximo bloco na próxima iteração do event loop
+      setTimeout(() => renderChunk(end, chunkSize), 0);
+    }
+  };
+
+  renderChunk(0);
+}
+
+// Sessão longa do DB exibida decimada: a tabela só baixa todas as leituras se o usuário pedir
+// (exportação e edição buscam as leituras completas por conta própria).
+function mostrarTabelaSobDemanda(sessionId, total) {
+  const tbody = document.querySelector('#tabela tbody');
+  if (!tbody) return;
+  tbody.innerHTML = '';
+  const tr = document.createElement('tr');
+  const td = document.createElement('td');
+  td.colSpan = 5;
+  const btn = document.createElement('button');
+  btn.className = 'btn btn-secundario';
+  btn.textContent = `📋 Carregar as ${total.toLocaleString('pt-BR')} leituras na tabela`;
+  btn.onclick = async () => {
+    btn.disabled = true;
+    btn.textContent = 'Carregando leituras...';
+    try {
+      const leituras = await fetchDbReadings(sessionId, { cache: 'no-store' });
+      if (!leituras) throw new Error('leituras indisponíveis');
+      if (!sessaoDecimada || sessaoDecimada.id !== sessionId) return; // outra sessão ou dados ao vivo
+      preencherTabelaLeituras(leituras.map(r => [formatarTimestampLeitura(r.timestamp), r.tempo, r.forca]));
+    } catch (e) {
+      console.error('Erro ao carregar a tabela completa:', e);
+      showNotification('error', 'Não foi possível carregar as leituras da sessão.');
+      btn.disabled = false;
+      btn.textContent = `📋 Carregar as ${total.toLocaleString('pt-BR')} leituras na tabela`;
+    }
+  };
+  td.appendChild(btn);
+  tr.appendChild(td);
+  tbody.appendChild(tr);
+}
+
 async function visualizarSessao(sessionId) {
   try {
     // 1) Obter sessão (LocalStorage → API)
@@ -3271,22 +3558,26 @@ async function visualizarSessao(sessionId) {
 
     // Se o registro da sessão foi encontrado (local ou DB), mas os dadosTabela estão ausentes ou vazios,
     // E a sessão *pode* estar no DB (checar se tem os campos do DB, ex: data_inicio), buscamos as leituras no DB.
+    let leiturasDoDb = false;
+    let totalLeiturasDb = 0;
     if (sessao && (!Array.isArray(sessao.dadosTabela) || sessao.dadosTabela.length === 0)) {
       // Tentativa de buscar leituras do DB, caso o registro da sessão tenha vindo da API.
       // Assumimos que a sessão é do DB se ela veio da API e não tem dadosTabela.
       try {
-        const readingsResp = await apiFetch(`/api/sessoes/${sessionId}/leituras`, { cache: 'no-store' });
-        if (readingsResp.ok) {
-          const dbReadings = await readingsResp.json();
-
+        // Só a série decimada (min/max preserva os picos): abrir uma sessão longa não
+        // baixa todas as leituras. Sessões pequenas vêm inteiras nesta mesma resposta.
+        const dbReadings = await fetchDbReadings(sessionId, { cache: 'no-store' }, { points: SESSAO_DECIMACAO_MIN_PONTOS });
+        if (dbReadings) {
+          totalLeiturasDb = dbReadings.total;
           // Anexa os dados lidos do DB ao objeto 'sessao'
           sessao.dadosTabela = dbReadings.map(r => ({
-            timestamp: new Date(r.timestamp).toLocaleString('pt-BR', { hour12: false }).replace(', ', ' '),
+            timestamp: formatarTimestampLeitura(r.timestamp),
             tempo_esp: r.tempo,
             newtons: r.forca,
             grama_forca: (r.forca / 9.80665 * 1000).toFixed(3),
             quilo_forca: (r.forca / 9.80665).toFixed(6)
           }));
+          leiturasDoDb = true;
         }
       } catch (e) {
         console.error("Erro ao buscar leituras da sessão no DB:", e);
@@ -3313,12 +3604,25 @@ async function visualizarSessao(sessionId) {
 
     // 3) Atualizar buffers internos e estatísticas
     rawDataN = parsed.map(([t, f]) => [t, f]); // mantém base em Newtons
-    maxForceInN = Math.max(...parsed.map(p => p[1]));
-    minForceInN = Math.min(...parsed.map(p => p[1]));
+    maxForceInN = parsed.reduce((m, p) => Math.max(m, p[1]), -Infinity);
+    minForceInN = parsed.reduce((m, p) => Math.min(m, p[1]), Infinity);
 
     // 4) Atualizar gráfico (convertendo para a unidade atual de exibição)
-    const displayData = parsed.map(([t, f]) => [t, convertForce(f, displayUnit)]);
-    chart.updateSeries([{ data: displayData }]);
+    // Sessões grandes do DB usam a série decimada no servidor; o zoom recarrega a janela
+    sessaoDecimada = leiturasDoDb && totalLeiturasDb > parsed.length ? { id: sessionId, piramide: null } : null;
+    if (sessaoDecimada) {
+      tileCache.clear(); // a sessão pode ter sido salva de novo desde a última visualização
+      try {
+        const resp = await apiFetch(`/api/sessoes/${sessionId}/tiles`, { cache: 'no-store' });
+        if (resp.ok) sessaoDecimada.piramide = await resp.json();
+      } catch (e) {
+        console.warn('Pirâmide de tiles indisponível, usando decimação simples:', e);
+      }
+      await carregarSerieDecimada(sessionId);
+    } else {
+      const displayData = parsed.map(([t, f]) => [t, convertForce(f, displayUnit)]);
+      chart.updateSeries([{ data: displayData }]);
+    }
 
     // 5) Atualizar textos de métricas no header, se existirem
     const forceNow = parsed[parsed.length - 1][1];
@@ -3337,45 +3641,11 @@ async function visualizarSessao(sessionId) {
     if (elMin) elMin.textContent = `mín: ${minDisplayForce.toFixed(3)}`;
 
     // 6) Repopular a tabela
-    const tbody = document.querySelector('#tabela tbody');
-    if (tbody) {
-      tbody.innerHTML = '';
-      // Evita travar a UI em sessões muito grandes — renderiza em blocos
-      const renderChunk = (startIdx, chunkSize = 1000) => {
-        const end = Math.min(startIdx + chunkSize, parsed.length);
-        const frag = document.createDocumentFragment();
-
-        for (let i = startIdx; i < end; i++) {
-          const [t, N] = parsed[i];
-          const gf = (N / 9.80665) * 1000;
-          const kgf = (N / 9.80665);
-
-          const tr = document.createElement('tr');
-          const ts = (sessao.dadosTabela[i] && sessao.dadosTabela[i].timestamp) || '';
-
-          const tdTs = document.createElement('td'); tdTs.textContent = ts;
-          const tdT = document.createElement('td'); tdT.textContent = t.toFixed(3);
-          const tdN = document.createElement('td'); tdN.textContent = N.toFixed(6);
-          const tdGf = document.createElement('td'); tdGf.textContent = gf.toFixed(3);
-          const tdKgf = document.createElement('td'); tdKgf.textContent = kgf.toFixed(6);
-
-          tr.appendChild(tdTs);
-          tr.appendChild(tdT);
-          tr.appendChild(tdN);
-          tr.appendChild(tdGf);
-          tr.appendChild(tdKgf);
-          frag.appendChild(tr);
-        }
-
-        tbody.appendChild(frag);
-
-        if (end < parsed.length) {
-          // Próximo bloco na próxima iteração do event loop
-          setTimeout(() => renderChunk(end, chunkSize), 0);
-        }
-      };
-
-      renderChunk(0);
+    if (sessaoDecimada) {
+      // Só a série decimada foi baixada: a tabela completa vem sob demanda
+      mostrarTabelaSobDemanda(sessionId, totalLeiturasDb);
+    } else {
+      preencherTabelaLeituras(parsed.map(([t, N], i) => [(sessao.dadosTabela[i] && sessao.dadosTabela[i].timestamp) || '', t, N]));
     }
 
     // 7) Ajustes visuais/UX
@@ -3638,9 +3908,8 @@ async function saveDbSessionToLocal(sessionId) {
     }
 
     // Fetch readings from DB
-    const readingsResponse = await apiFetch('/api/sessoes/' + sessionId + '/leituras');
-    if (!readingsResponse.ok) throw new Error('Falha ao carregar leituras do DB para salvar localmente.');
-    const dbReadings = await readingsResponse.json();
+    const dbReadings = await fetchDbReadings(sessionId);
+    if (!dbReadings) throw new Error('Falha ao carregar leituras do DB para salvar localmente.');
 
     const gravacao = {
       id: dbSession.id,
@@ -3852,9 +4121,8 @@ async function resolverConflito_UsarDB(sessionId) {
     const dbSession = await resp.json();
 
     // Busca as leituras
-    const readingsResp = await apiFetch(`/api/sessoes/${sessionId}/leituras`);
-    if (readingsResp.ok) {
-      const dbReadings = await readingsResp.json();
+    const dbReadings = await fetchDbReadings(sessionId);
+    if (dbReadings) {
       dbSession.dadosTabela = dbReadings.map(r => ({
         timestamp: formatUtcDdMm(parseDbTimestampToUTC(r.timestamp)),
         tempo_esp: r.tempo,
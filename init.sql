@@ -18,7 +18,20 @@ CREATE TABLE IF NOT EXISTS sessoes (
     motor_observations TEXT,
     motor_temperatura FLOAT,
     motor_umidade FLOAT,
-    motor_pressao FLOAT
+    motor_pressao FLOAT,
+    impulso_total FLOAT,
+    motor_class VARCHAR(50),
+    class_color VARCHAR(20),
+    burn_start_time FLOAT,
+    burn_end_time FLOAT,
+    forca_pico FLOAT,
+    tempo_ate_pico FLOAT,
+    queima_inicio FLOAT,
+    queima_fim FLOAT,
+    tempo_queima FLOAT,
+    forca_media FLOAT,
+    impulso_queima FLOAT,
+    designacao VARCHAR(32)
 );
 
 CREATE TABLE IF NOT EXISTS leituras (
@@ -29,6 +42,25 @@ CREATE TABLE IF NOT EXISTS leituras (
     ema FLOAT,
     massaKg FLOAT,
     timestamp DATETIME(3),
+    INDEX idx_leituras_sessao_tempo (sessao_id, tempo),
+    FOREIGN KEY (sessao_id) REFERENCES sessoes(id) ON DELETE CASCADE
+);
+
+-- Leituras compactadas (LEITURAS_STORAGE=blob): uma linha por sessão
+CREATE TABLE IF NOT EXISTS leituras_blob (
+    sessao_id BIGINT PRIMARY KEY,
+    n INT NOT NULL,
+    codec TINYINT NOT NULL,
+    dados LONGBLOB NOT NULL,
+    FOREIGN KEY (sessao_id) REFERENCES sessoes(id) ON DELETE CASCADE
+);
+
+-- Pirâmide min/max/média (1x, 4x, 16x, ...) para /api/sessoes/{id}/tiles
+CREATE TABLE IF NOT EXISTS sessao_piramide (
+    sessao_id BIGINT PRIMARY KEY,
+    niveis TINYINT NOT NULL,
+    tile_size INT NOT NULL,
+    dados LONGBLOB NOT NULL,
     FOREIGN KEY (sessao_id) REFERENCES sessoes(id) ON DELETE CASCADE
 );
 
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Converte as leituras das sessões já gravadas entre os dois formatos:
+
+    python3 migrate_leituras_blob.py              # leituras -> leituras_blob
+    python3 migrate_leituras_blob.py --to rows    # leituras_blob -> leituras
+    python3 migrate_leituras_blob.py --dry-run    # só lista o que seria convertido
+
+Cada sessão é convertida em sua própria transação, então o processo pode ser
+interrompido e executado de novo. Defina LEITURAS_STORAGE=blob no servidor para
+que as novas sessões também sejam gravadas no formato compacto.
+"""
+
+import argparse
+import logging
+import time
+
+logging.disable(logging.INFO)
+
+import server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--to", choices=("blob", "rows"), default="blob", help="formato de destino")
+    parser.add_argument("--limit", type=int, default=0, help="máximo de sessões a converter (0 = todas)")
+    parser.add_argument("--dry-run", action="store_true", help="não altera o banco")
+    args = parser.parse_args()
+
+    conn = server.new_mysql_connection()
+    try:
+        server.apply_schema_migrations(conn)
+        with conn.cursor() as cursor:
+            if args.to == "blob":
+                cursor.execute("SELECT DISTINCT sessao_id FROM leituras ORDER BY sessao_id")
+            else:
+                cursor.execute("SELECT sessao_id FROM leituras_blob ORDER BY sessao_id")
+            pendentes = [row['sessao_id'] for row in cursor.fetchall()]
+        if args.limit:
+            pendentes = pendentes[:args.limit]
+
+        print(f"🔄 {len(pendentes)} sessões para converter para '{args.to}'")
+        if args.dry_run:
+            for sessao_id in pendentes:
+                print(f"   {sessao_id}")
+            return
+
+        convert = server.pack_session_leituras if args.to == "blob" else server.unpack_session_leituras
+        total = 0
+        t0 = time.monotonic()
+        for sessao_id in pendentes:
+            with conn.cursor() as cursor:
+                n = convert(cursor, sessao_id)
+                tamanho = ""
+                if args.to == "blob":
+                    cursor.execute("SELECT LENGTH(dados) AS bytes FROM leituras_blob WHERE sessao_id = %s", (sessao_id,))
+                    blob = cursor.fetchone()
+                    if blob:
+                        tamanho = f", {blob['bytes']:,} bytes ({blob['bytes'] / max(n, 1):.1f} B/leitura)"
+            conn.commit()
+            total += n
+            print(f"   ✅ Sessão {sessao_id}: {n} leituras{tamanho}")
+        print(f"✅ {total} leituras convertidas em {time.monotonic() - t0:.1f}s")
+    except server.pymysql.Error as e:
+        conn.rollback()
+        print(f"❌ Erro de MySQL: {e}")
+        raise SystemExit(1)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -13,10 +13,40 @@ import struct
 import time
 import gzip
 import io
-from typing import Optional, Dict, Any
+import binascii
+import math
+import collections
+import array
+import contextlib
+import concurrent.futures
+import multiprocessing
+import bisect
+import sys
+import zlib
+import hashlib
+import itertools
+import email.utils
+import mimetypes
+import re
+from typing import Optional, Dict, Any, List, Tuple, Iterator
 import pymysql.cursors
-from datetime import datetime, timedelta
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional; os caminhos vetorizados caem para Python puro
+    np = None
+try:
+    import brotli
+except ImportError:  # Brotli é opcional; sem ele os estáticos são servidos só com gzip
+    brotli = None
+try:
+    import orjson
+except ImportError:  # orjson é opcional; sem ele a serialização usa o módulo json
+    orjson = None
+from datetime import date, datetime, timedelta
+from decimal import Decimal
 from zoneinfo import ZoneInfo
+from urllib.parse import urlsplit, parse_qs
 
 # ================== Calculation Helpers ==================
 def classificar_motor(impulso_ns):
@@ -49,11 +79,7 @@ def classificar_motor(impulso_ns):
             return {"classe": c["classe"], "cor": c["cor"]}
     return {"classe": 'Indefinido', "cor": '#95a5a6'}
 
-def calcular_impulso_total(tempos, forcas):
-    """Calcula o impulso total positivo de uma série de leituras de força."""
-    if not tempos or not forcas or len(tempos) != len(forcas) or len(tempos) < 2:
-        return 0
-    
+def _impulso_positivo_python(tempos, forcas):
     impulso_total_positivo = 0
     for i in range(len(tempos) - 1):
         # Garante que os valores são numéricos
@@ -72,6 +98,82 @@ def calcular_impulso_total(tempos, forcas):
             
     return impulso_total_positivo
 
+def _impulso_positivo_numpy(tempos, forcas):
+    t = np.asarray(tempos, dtype=np.float64)
+    f = np.asarray(forcas, dtype=np.float64)
+    area = np.diff(t) * (f[:-1] + f[1:]) / 2
+    # NaN > 0 é falso: pontos inválidos ficam de fora, como no laço em Python
+    return float(area[area > 0].sum())
+
+def calcular_impulso_total(tempos, forcas):
+    """
+    Calcula o impulso total positivo de uma série de leituras de força.
+    Aceita listas, array.array, memoryview ou arrays NumPy; com NumPy instalado a
+    integração é vetorizada, e séries com valores não numéricos (None, texto)
+    caem para o laço em Python, que pula os trapézios inválidos.
+    """
+    if tempos is None or forcas is None or len(tempos) != len(forcas) or len(tempos) < 2:
+        return 0
+    if np is not None:
+        try:
+            return _impulso_positivo_numpy(tempos, forcas)
+        except (ValueError, TypeError):
+            pass
+    return _impulso_positivo_python(tempos, forcas)
+
+BURN_THRESHOLD_FRACTION = 0.05  # mesmo limiar de detectBurnStart/detectBurnEnd (burn_analysis.js)
+
+def calcular_metricas_empuxo(tempos, forcas, burn_start=None, burn_end=None) -> Dict[str, Any]:
+    """
+    Métricas da curva de empuxo calculadas uma vez por gravação. A queima vai do
+    primeiro ao último ponto com força acima de 5% do pico, a menos que
+    burn_start/burn_end (pontos escolhidos na Análise de Queima) sejam informados.
+    As chaves são os nomes das colunas em `sessoes`.
+    """
+    pares = sorted((float(t), float(f)) for t, f in zip(tempos, forcas)
+                   if t is not None and f is not None and math.isfinite(t) and math.isfinite(f))
+    impulso_total = calcular_impulso_total([t for t, _ in pares], [f for _, f in pares])
+    classificacao = classificar_motor(impulso_total) if len(pares) >= 2 else {"classe": 'N/A', "cor": '#95a5a6'}
+    metricas = {
+        "impulso_total": impulso_total,
+        "motor_class": classificacao['classe'],
+        "class_color": classificacao['cor'],
+        "forca_pico": None,
+        "tempo_ate_pico": None,
+        "queima_inicio": None,
+        "queima_fim": None,
+        "tempo_queima": None,
+        "forca_media": None,
+        "impulso_queima": None,
+        "designacao": None,
+    }
+    if len(pares) < 2:
+        metricas["tempo_queima"] = 0.0  # marca a sessão como já calculada
+        return metricas
+
+    t_pico, forca_pico = max(pares, key=lambda p: p[1])
+    limiar = forca_pico * BURN_THRESHOLD_FRACTION
+    acima = [t for t, f in pares if f > limiar]
+    inicio = burn_start if burn_start is not None else (acima[0] if acima else pares[0][0])
+    fim = burn_end if burn_end is not None else (acima[-1] if acima else pares[-1][0])
+    queima = [(t, f) for t, f in pares if inicio <= t <= fim]
+    impulso_queima = calcular_impulso_total([t for t, _ in queima], [f for _, f in queima])
+    tempo_queima = fim - inicio
+    forca_media = impulso_queima / tempo_queima if tempo_queima > 0 else 0.0
+
+    metricas.update({
+        "forca_pico": forca_pico,
+        "tempo_ate_pico": t_pico - inicio,
+        "queima_inicio": inicio,
+        "queima_fim": fim,
+        "tempo_queima": tempo_queima,
+        "forca_media": forca_media,
+        "impulso_queima": impulso_queima,
+        # Designação NAR/TRA: classe pelo impulso total + empuxo médio em N (atraso não é medido)
+        "designacao": f"{classificacao['classe']}{round(forca_media)}" if classificacao['classe'] != 'Indefinido' else None,
+    })
+    return metricas
+
 
 """
 Binary Protocol Server - Balança GFIG (IPv4 + IPv6)
@@ -88,6 +190,43 @@ HTTP_PORT   = int(os.environ.get("HTTP_PORT", "80"))
 WS_PORT     = int(os.environ.get("WS_PORT", "81"))
 BIND_HOST   = os.environ.get("BIND_HOST", "0.0.0.0")
 V6ONLY_ENV  = os.environ.get("IPV6_V6ONLY", "0")
+CRC16_IMPL  = os.environ.get("CRC16_IMPL", "hqx")  # hqx | table | bitwise
+SERIAL_BATCH_DECODE = os.environ.get("SERIAL_BATCH_DECODE", "1") == "1"
+SERIAL_BATCH_NUMPY_MIN = int(os.environ.get("SERIAL_BATCH_NUMPY_MIN", "32"))  # pacotes por rajada para usar NumPy
+WS_BATCH_WINDOW_MS = float(os.environ.get("WS_BATCH_WINDOW_MS", "20"))  # 0 desativa o agrupamento
+WS_BATCH_MAX_SAMPLES = int(os.environ.get("WS_BATCH_MAX_SAMPLES", "50"))
+SERIAL_QUEUE_SIZE = int(os.environ.get("SERIAL_QUEUE_SIZE", "4096"))  # mensagens entre a thread serial e o event loop
+WS_CLIENT_QUEUE_SIZE = int(os.environ.get("WS_CLIENT_QUEUE_SIZE", "64"))  # frames pendentes por cliente
+WS_SLOW_CLIENT_POLICY = os.environ.get("WS_SLOW_CLIENT_POLICY", "drop_oldest")  # drop_oldest | downsample | disconnect
+RECORDING_FLUSH_INTERVAL = float(os.environ.get("RECORDING_FLUSH_INTERVAL", "1.0"))  # segundos entre gravações no MySQL
+RECORDING_FLUSH_ROWS = int(os.environ.get("RECORDING_FLUSH_ROWS", "2000"))
+RECORDING_MYSQL_RETRIES = int(os.environ.get("RECORDING_MYSQL_RETRIES", "3"))  # reconexões por etapa antes de abortar a gravação
+UPLOAD_BATCH_ROWS = int(os.environ.get("UPLOAD_BATCH_ROWS", "1000"))  # leituras por executemany no upload NDJSON
+MYSQL_POOL_SIZE = int(os.environ.get("MYSQL_POOL_SIZE", "4"))
+MYSQL_POOL_TIMEOUT = float(os.environ.get("MYSQL_POOL_TIMEOUT", "10"))  # segundos esperando uma conexão livre
+MYSQL_POOL_IDLE_TIMEOUT = float(os.environ.get("MYSQL_POOL_IDLE_TIMEOUT", "300"))  # fecha conexões ociosas há mais tempo
+MYSQL_POOL_PING_AFTER = float(os.environ.get("MYSQL_POOL_PING_AFTER", "30"))  # ping antes de reutilizar conexão ociosa
+LEITURAS_STORAGE = os.environ.get("LEITURAS_STORAGE", "rows")  # rows | blob (float32 compactado em leituras_blob)
+SERIES_CACHE_SESSIONS = int(os.environ.get("SERIES_CACHE_SESSIONS", "8"))  # sessões com série em memória para decimação
+SERIES_MAX_POINTS = int(os.environ.get("SERIES_MAX_POINTS", "20000"))  # limite de ?points= em /leituras
+LEITURAS_STREAM_ROWS = int(os.environ.get("LEITURAS_STREAM_ROWS", "2000"))  # leituras por pedaço do JSON de /leituras (0 = monta a resposta inteira)
+LEITURAS_STREAM_MAX = int(os.environ.get("LEITURAS_STREAM_MAX", "2"))  # streams simultâneos, cada um com conexão MySQL própria (fora do pool)
+HTTP_STREAM_WRITE_TIMEOUT = float(os.environ.get("HTTP_STREAM_WRITE_TIMEOUT", "30"))  # segundos esperando o cliente aceitar cada pedaço
+PYRAMID_TILE_SIZE = int(os.environ.get("PYRAMID_TILE_SIZE", "1024"))  # entradas por tile em /tiles
+PYRAMID_CACHE_SESSIONS = int(os.environ.get("PYRAMID_CACHE_SESSIONS", "16"))
+MIGRATION_CHUNK_SESSIONS = int(os.environ.get("MIGRATION_CHUNK_SESSIONS", "20"))  # sessões por commit/checkpoint
+DB_EXECUTOR_WORKERS = int(os.environ.get("DB_EXECUTOR_WORKERS", str(MYSQL_POOL_SIZE)))  # threads para MySQL chamado do event loop
+HTTP_SERVER_MODE = os.environ.get("HTTP_SERVER", "threaded")  # threaded (thread por conexão) | asyncio (no event loop)
+HTTP_ASYNC_WORKERS = int(os.environ.get("HTTP_ASYNC_WORKERS", "4"))  # threads para rotas bloqueantes no modo asyncio
+HTTP_KEEPALIVE_TIMEOUT = float(os.environ.get("HTTP_KEEPALIVE_TIMEOUT", "15"))  # segundos de conexão ociosa
+HTTP_MAX_BODY = int(os.environ.get("HTTP_MAX_BODY", str(256 * 1024 * 1024)))  # corpo máximo aceito no modo asyncio
+STATIC_DIR = os.environ.get("STATIC_DIR", "/app/data")
+JSON_ENCODER = os.environ.get("JSON_ENCODER", "auto")  # auto (orjson se instalado) | orjson | stdlib
+STATIC_SENDFILE_MIN = int(os.environ.get("STATIC_SENDFILE_MIN", str(256 * 1024)))  # arquivos a partir disso saem do disco via sendfile
+STATIC_CACHE_BYTES = int(os.environ.get("STATIC_CACHE_BYTES", str(32 * 1024 * 1024)))  # teto do cache de estáticos (todas as variantes)
+LOOP_LAG_INTERVAL_MS = float(os.environ.get("LOOP_LAG_INTERVAL_MS", "100"))  # período da sonda de atraso do event loop
+LOOP_LAG_WARN_MS = float(os.environ.get("LOOP_LAG_WARN_MS", "200"))  # atraso acima disso é registrado no log
+MIGRATION_WORKERS = int(os.environ.get("MIGRATION_WORKERS", "0"))  # processos de cálculo (0 = na própria thread)
 
 # MySQL Config
 MYSQL_HOST = os.environ.get("MYSQL_HOST", "db")
@@ -118,51 +257,252 @@ SIZE_CMD_CALIB  = 10
 SIZE_CMD_GETCONF = 8
 SIZE_CMD_SETPAR = 18
 
+# Tamanho esperado por versão e tipo de pacote
+PACKET_SIZES = {
+    0x01: {TYPE_DATA: 16, TYPE_CONFIG: 64, TYPE_STATUS: 14},
+    0x02: {TYPE_DATA: 20, TYPE_CONFIG: 64, TYPE_STATUS: 14}
+}
+
 logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
 logging.info(f"Configuração de BIND_HOST: {BIND_HOST}")
 logging.info(f"Configuração de IPV6_V6ONLY: {V6ONLY_ENV}")
 logging.info(f"MySQL DB: {MYSQL_DB}")
 logging.info(f"MYSQL_DB from env: {os.environ.get('MYSQL_DB')}")
 
-CONNECTED_CLIENTS = set()
+CONNECTED_CLIENTS: Dict[Any, "ClientSender"] = {}  # websocket → fila de envio própria
 serial_connection: Optional[serial.Serial] = None
 serial_lock = threading.Lock()
-mysql_connection = None
-mysql_connected = False
+mysql_connected = False  # só fica True depois que init_mysql_db cria/migra o esquema
+mysql_schema_ready = threading.Event()
 serial_connected = False
 serial_last_error = None
+session_recorder: Optional["SessionRecorder"] = None
+
+# ================== Serialização JSON ==================
+# Toda saída JSON (API HTTP e frames WebSocket) passa por json_dumps. Com orjson
+# instalado, datetime/date, NaN/Infinity (-> null) e arrays NumPy são tratados no
+# próprio encoder, sem o passe recursivo de sanitize_for_json. O fallback com o
+# módulo json produz o mesmo texto: datas em ISO 8601, compacto, UTF-8.
+
+def _json_default(obj):
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if np is not None:
+        if isinstance(obj, np.generic):
+            return obj.item()
+        if isinstance(obj, np.ndarray):
+            return obj.tolist()
+    return str(obj)
+
+def _json_dumps_stdlib(obj) -> bytes:
+    try:
+        text = json.dumps(obj, default=_json_default, separators=(",", ":"), ensure_ascii=False, allow_nan=False)
+    except ValueError:
+        # Só quem contém NaN/Infinity paga a cópia recursiva
+        text = json.dumps(sanitize_for_json(obj), default=_json_default, separators=(",", ":"), ensure_ascii=False)
+    return text.encode('utf-8')
 
-# ================== MySQL Utils ==================
-def connect_to_mysql():
-    global mysql_connection, mysql_connected
+if orjson is not None and JSON_ENCODER in ("auto", "orjson"):
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
 
-    # Validate existing connection with ping
-    if mysql_connection:
+    def json_dumps(obj) -> bytes:
         try:
-            mysql_connection.ping(reconnect=False)
-            if mysql_connection.open:
-                return mysql_connection
-        except (pymysql.Error, AttributeError):
-            logging.warning("Conexão MySQL existente está inválida, criando nova conexão...")
-            mysql_connection = None
-            mysql_connected = False
+            return orjson.dumps(obj, default=_json_default, option=_ORJSON_OPTIONS)
+        except TypeError:
+            # orjson.JSONEncodeError (ex.: inteiro acima de 64 bits)
+            return _json_dumps_stdlib(obj)
+
+    JSON_BACKEND = "orjson"
+else:
+    if JSON_ENCODER == "orjson":
+        logging.warning("JSON_ENCODER=orjson, mas o orjson não está instalado; usando o módulo json")
+    json_dumps = _json_dumps_stdlib
+    JSON_BACKEND = "stdlib"
+
+def json_dumps_text(obj) -> str:
+    """Para frames WebSocket de texto."""
+    return json_dumps(obj).decode('utf-8')
+
+# ================== MySQL Utils ==================
+def new_mysql_connection():
+    """Abre uma conexão nova (não compartilhada) com o banco da aplicação."""
+    return pymysql.connect(
+        host=MYSQL_HOST,
+        user=MYSQL_USER,
+        password=MYSQL_PASSWORD,
+        database=MYSQL_DB,
+        cursorclass=pymysql.cursors.DictCursor,
+        connect_timeout=5,
+        autocommit=False,
+        charset='utf8mb4'
+    )
+
+class MySQLPoolTimeout(pymysql.err.OperationalError):
+    """Nenhuma conexão livre no pool dentro de MYSQL_POOL_TIMEOUT."""
+
+# Códigos do cliente que significam conexão perdida. Outros OperationalError
+# (lock wait timeout 1205, deadlock 1213...) deixam a conexão utilizável.
+MYSQL_CONNECTION_LOST_CODES = (2003, 2006, 2013, 2055)
+
+def is_connection_lost(e: BaseException) -> bool:
+    if isinstance(e, MySQLPoolTimeout):
+        return False
+    if isinstance(e, pymysql.err.InterfaceError):
+        return True
+    return isinstance(e, pymysql.err.OperationalError) and bool(e.args) and e.args[0] in MYSQL_CONNECTION_LOST_CODES
+
+class MySQLConnectionPool:
+    """
+    Pool limitado e thread-safe de conexões PyMySQL. Cada thread (handlers HTTP,
+    WebSocket, migração) empresta sua própria conexão em vez de compartilhar uma
+    global. Conexões ociosas há mais de `ping_after` segundos passam por ping antes
+    de serem reutilizadas; ociosas há mais de `idle_timeout` são fechadas.
+    """
+
+    def __init__(self, factory, max_size: int, acquire_timeout: float, idle_timeout: float, ping_after: float):
+        self.factory = factory
+        self.max_size = max(1, max_size)
+        self.acquire_timeout = acquire_timeout
+        self.idle_timeout = idle_timeout
+        self.ping_after = ping_after
+        self.cond = threading.Condition()
+        self.idle = []  # (conexão, instante da devolução), usado como pilha
+        self.size = 0   # conexões abertas (ociosas + emprestadas)
+        self.created = 0
+        self.evicted = 0
+        self.timeouts = 0
+
+    def _close(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _evict_idle_locked(self) -> list:
+        now = time.monotonic()
+        expired = [item for item in self.idle if now - item[1] > self.idle_timeout]
+        if expired:
+            self.idle = [item for item in self.idle if now - item[1] <= self.idle_timeout]
+            self.size -= len(expired)
+            self.evicted += len(expired)
+        return [conn for conn, _ in expired]
+
+    def acquire(self):
+        global mysql_connected
+        deadline = time.monotonic() + self.acquire_timeout
+        while True:
+            conn, returned_at = None, None
+            with self.cond:
+                while True:
+                    expired = self._evict_idle_locked()
+                    if self.idle:
+                        conn, returned_at = self.idle.pop()
+                        break
+                    if self.size < self.max_size:
+                        self.size += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.timeouts += 1
+                        raise MySQLPoolTimeout(2013, f"Pool MySQL esgotado ({self.max_size} conexões em uso)")
+                    self.cond.wait(remaining)
+            for old in expired:
+                self._close(old)
+
+            if conn is None:
+                try:
+                    conn = self.factory()
+                except Exception:
+                    with self.cond:
+                        self.size -= 1
+                        self.cond.notify()
+                    mysql_connected = False
+                    raise
+                self.created += 1
+                mysql_connected = mysql_schema_ready.is_set()
+                return conn
+
+            if time.monotonic() - returned_at <= self.ping_after:
+                mysql_connected = mysql_schema_ready.is_set()
+                return conn
+            try:
+                conn.ping(reconnect=False)
+                mysql_connected = mysql_schema_ready.is_set()
+                return conn
+            except pymysql.Error:
+                logging.warning("Conexão MySQL ociosa do pool está inválida, descartando...")
+                self._discard(conn)
+
+    def _discard(self, conn):
+        self._close(conn)
+        with self.cond:
+            self.size -= 1
+            self.cond.notify()
+
+    def release(self, conn, broken: bool = False):
+        if not broken:
+            try:
+                # Encerra a transação (inclusive snapshots de SELECT) antes de reutilizar
+                conn.rollback()
+            except pymysql.Error:
+                broken = True
+        if broken or not conn.open:
+            self._discard(conn)
+            return
+        with self.cond:
+            self.idle.append((conn, time.monotonic()))
+            self.cond.notify()
+
+    @contextlib.contextmanager
+    def connection(self):
+        """Empresta uma conexão: `with mysql_pool.connection() as conn: ...`"""
+        conn = self.acquire()
+        broken = False
+        try:
+            yield conn
+        except pymysql.Error as e:
+            broken = is_connection_lost(e)
+            raise
+        finally:
+            self.release(conn, broken)
+
+    def close_all(self):
+        with self.cond:
+            idle, self.idle = self.idle, []
+            self.size -= len(idle)
+        for conn, _ in idle:
+            self._close(conn)
+
+    def stats(self) -> Dict[str, Any]:
+        with self.cond:
+            return {
+                "size": self.size,
+                "idle": len(self.idle),
+                "in_use": self.size - len(self.idle),
+                "max_size": self.max_size,
+                "created": self.created,
+                "evicted": self.evicted,
+                "timeouts": self.timeouts
+            }
+
+mysql_pool = MySQLConnectionPool(new_mysql_connection, MYSQL_POOL_SIZE, MYSQL_POOL_TIMEOUT,
+                                 MYSQL_POOL_IDLE_TIMEOUT, MYSQL_POOL_PING_AFTER)
 
+def connect_to_mysql() -> bool:
+    """
+    Verifica (com retentativas) se o pool consegue obter uma conexão válida.
+    Não marca mysql_connected: isso só acontece com o esquema pronto (init_mysql_db).
+    """
+    global mysql_connected
     max_retries = 3
     for attempt in range(max_retries):
         try:
-            mysql_connection = pymysql.connect(
-                host=MYSQL_HOST,
-                user=MYSQL_USER,
-                password=MYSQL_PASSWORD,
-                database=MYSQL_DB,
-                cursorclass=pymysql.cursors.DictCursor,
-                connect_timeout=5,
-                autocommit=False,
-                charset='utf8mb4'
-            )
+            with mysql_pool.connection() as conn:
+                conn.ping(reconnect=False)
             logging.info("Conectado ao MySQL com sucesso!")
-            mysql_connected = True
-            return mysql_connection
+            return True
         except pymysql.Error as e:
             if attempt < max_retries - 1:
                 wait_time = 2 ** (attempt + 1)
@@ -171,15 +511,15 @@ def connect_to_mysql():
             else:
                 logging.error(f"Erro ao conectar ao MySQL após {max_retries} tentativas: {e}")
                 mysql_connected = False
-                mysql_connection = None
-                return None
+                return False
 
 def init_mysql_db():
-    global mysql_connection, mysql_connected
+    global mysql_connected
     max_retries = 5
     retry_count = 0
     
     # Connect as root to create the database and grant privileges
+    t_root = time.monotonic()
     while retry_count < max_retries:
         try:
             root_conn = pymysql.connect(
@@ -202,89 +542,107 @@ def init_mysql_db():
             else:
                 logging.error(f"Não foi possível criar o banco de dados '{MYSQL_DB}' após {max_retries} tentativas: {e}")
                 mysql_connected = False
+                startup.add("mysql_root", time.monotonic() - t_root)
                 return
+    startup.add("mysql_root", time.monotonic() - t_root)
 
     # Now connect as balanca_user to the specific database to create tables
-    mysql_connection = connect_to_mysql()
-
-    if mysql_connection:
+    with startup.phase("mysql_pool"):
+        conectado = connect_to_mysql()
+    if conectado:
         try:
-            with mysql_connection.cursor() as cursor:
-                sql_sessoes_create = """
-                CREATE TABLE IF NOT EXISTS sessoes (
-                    id BIGINT PRIMARY KEY,
-                    nome VARCHAR(255) NOT NULL,
-                    data_inicio DATETIME NOT NULL,
-                    data_fim DATETIME,
-                    data_modificacao DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-                    motor_name VARCHAR(255),
-                    motor_diameter FLOAT,
-                    motor_length FLOAT,
-                    motor_delay FLOAT,
-                    motor_propweight FLOAT,
-                    motor_totalweight FLOAT,
-                    motor_manufacturer VARCHAR(255),
-                    motor_description TEXT,
-                    motor_observations TEXT,
-                    impulso_total FLOAT,
-                    motor_class VARCHAR(50),
-                    class_color VARCHAR(20),
-                    burn_start_time FLOAT,
-                    burn_end_time FLOAT
-                )
-                """
-                cursor.execute(sql_sessoes_create)
-
-                # Migrate existing table to add motor metadata columns if they don't exist
-                motor_columns = [
-                    ('data_modificacao', 'DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP'),
-                    ('motor_name', 'VARCHAR(255)'),
-                    ('motor_diameter', 'FLOAT'),
-                    ('motor_length', 'FLOAT'),
-                    ('motor_delay', 'FLOAT'),
-                    ('motor_propweight', 'FLOAT'),
-                    ('motor_totalweight', 'FLOAT'),
-                    ('motor_manufacturer', 'VARCHAR(255)'),
-                    ('motor_description', 'TEXT'),
-                    ('motor_observations', 'TEXT'),
-                    ('motor_temperatura', 'FLOAT'),
-                    ('motor_umidade', 'FLOAT'),
-                    ('motor_pressao', 'FLOAT'),
-                    ('impulso_total', 'FLOAT'),
-                    ('motor_class', 'VARCHAR(50)'),
-                    ('class_color', 'VARCHAR(20)'),
-                    ('burn_start_time', 'FLOAT'),
-                    ('burn_end_time', 'FLOAT')
-                ]
-
-                for column_name, column_type in motor_columns:
-                    try:
-                        cursor.execute(f"ALTER TABLE sessoes ADD COLUMN {column_name} {column_type}")
-                        logging.info(f"Coluna '{column_name}' adicionada à tabela 'sessoes'")
-                    except pymysql.Error as e:
-                        # Column already exists (error 1060), ignore
-                        if e.args[0] != 1060:
+            with startup.phase("tabelas"), mysql_pool.connection() as conn:
+                with conn.cursor() as cursor:
+                    sql_sessoes_create = """
+                    CREATE TABLE IF NOT EXISTS sessoes (
+                        id BIGINT PRIMARY KEY,
+                        nome VARCHAR(255) NOT NULL,
+                        data_inicio DATETIME NOT NULL,
+                        data_fim DATETIME,
+                        data_modificacao DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                        motor_name VARCHAR(255),
+                        motor_diameter FLOAT,
+                        motor_length FLOAT,
+                        motor_delay FLOAT,
+                        motor_propweight FLOAT,
+                        motor_totalweight FLOAT,
+                        motor_manufacturer VARCHAR(255),
+                        motor_description TEXT,
+                        motor_observations TEXT,
+                        impulso_total FLOAT,
+                        motor_class VARCHAR(50),
+                        class_color VARCHAR(20),
+                        burn_start_time FLOAT,
+                        burn_end_time FLOAT,
+                        forca_pico FLOAT,
+                        tempo_ate_pico FLOAT,
+                        queima_inicio FLOAT,
+                        queima_fim FLOAT,
+                        tempo_queima FLOAT,
+                        forca_media FLOAT,
+                        impulso_queima FLOAT,
+                        designacao VARCHAR(32)
+                    )
+                    """
+                    cursor.execute(sql_sessoes_create)
+
+                    # Migrate existing table to add motor metadata columns if they don't exist
+                    motor_columns = [
+                        ('data_modificacao', 'DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP'),
+                        ('motor_name', 'VARCHAR(255)'),
+                        ('motor_diameter', 'FLOAT'),
+                        ('motor_length', 'FLOAT'),
+                        ('motor_delay', 'FLOAT'),
+                        ('motor_propweight', 'FLOAT'),
+                        ('motor_totalweight', 'FLOAT'),
+                        ('motor_manufacturer', 'VARCHAR(255)'),
+                        ('motor_description', 'TEXT'),
+                        ('motor_observations', 'TEXT'),
+                        ('motor_temperatura', 'FLOAT'),
+                        ('motor_umidade', 'FLOAT'),
+                        ('motor_pressao', 'FLOAT'),
+                        ('impulso_total', 'FLOAT'),
+                        ('motor_class', 'VARCHAR(50)'),
+                        ('class_color', 'VARCHAR(20)'),
+                        ('burn_start_time', 'FLOAT'),
+                        ('burn_end_time', 'FLOAT')
+                    ]
+
+                    # Uma consulta ao information_schema em vez de um ALTER (que falharia) por coluna
+                    existentes = table_columns(cursor, 'sessoes')
+                    for column_name, column_type in motor_columns:
+                        if column_name in existentes:
+                            continue
+                        try:
+                            cursor.execute(f"ALTER TABLE sessoes ADD COLUMN {column_name} {column_type}")
+                            logging.info(f"Coluna '{column_name}' adicionada à tabela 'sessoes'")
+                        except pymysql.Error as e:
                             logging.warning(f"Erro ao adicionar coluna '{column_name}': {e}")
 
-                sql_leituras_create = """
-                CREATE TABLE IF NOT EXISTS leituras (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    sessao_id BIGINT NOT NULL,
-                    tempo FLOAT,
-                    forca FLOAT,
-                    ema FLOAT,
-                    massaKg FLOAT,
-                    timestamp DATETIME(3),
-                    FOREIGN KEY (sessao_id) REFERENCES sessoes(id) ON DELETE CASCADE
-                )
-                """
-                cursor.execute(sql_leituras_create)
-
-            mysql_connection.commit()
+                    sql_leituras_create = """
+                    CREATE TABLE IF NOT EXISTS leituras (
+                        id INT AUTO_INCREMENT PRIMARY KEY,
+                        sessao_id BIGINT NOT NULL,
+                        tempo FLOAT,
+                        forca FLOAT,
+                        ema FLOAT,
+                        massaKg FLOAT,
+                        timestamp DATETIME(3),
+                        INDEX idx_leituras_sessao_tempo (sessao_id, tempo),
+                        FOREIGN KEY (sessao_id) REFERENCES sessoes(id) ON DELETE CASCADE
+                    )
+                    """
+                    cursor.execute(sql_leituras_create)
+                    cursor.execute(SQL_LEITURAS_BLOB_CREATE)
+                    cursor.execute(SQL_SESSAO_PIRAMIDE_CREATE)
+
+                conn.commit()
+            with startup.phase("esquema"), mysql_pool.connection() as conn:
+                apply_schema_migrations(conn)
             logging.info(f"Banco de dados '{MYSQL_DB}' e tabelas 'sessoes', 'leituras' verificadas/criadas.")
-
-            # Migrate existing sessions to calculate impulse if not already calculated
-            migrate_existing_sessions()
+            # Só agora os handlers podem usar o banco: tabelas e migrações existem
+            mysql_schema_ready.set()
+            mysql_connected = True
 
         except pymysql.Error as e:
             logging.error(f"Erro ao inicializar o banco de dados MySQL: {e}")
@@ -292,77 +650,1234 @@ def init_mysql_db():
     else:
         logging.warning("Não foi possível inicializar o banco de dados MySQL: conexão não estabelecida.")
 
-def migrate_existing_sessions():
-    """Calculate and update impulso_total, motor_class, and class_color for existing sessions"""
-    global mysql_connection
-    if not mysql_connection or not mysql_connection.open:
-        return
+# ==================== MIGRAÇÕES DE ESQUEMA ====================
+# Cada migração roda uma única vez e fica registrada em `schema_migrations`.
+# As funções devem ser idempotentes: bancos criados do zero (init.sql /
+# init_mysql_db) já nascem com o esquema final.
+
+def index_exists(cursor, table: str, index_name: str) -> bool:
+    cursor.execute("""
+        SELECT 1 FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+        LIMIT 1
+    """, (table, index_name))
+    return cursor.fetchone() is not None
+
+def table_columns(cursor, table: str) -> set:
+    cursor.execute("""
+        SELECT column_name AS nome FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = %s
+    """, (table,))
+    return {row['nome'] for row in cursor.fetchall()}
+
+def column_exists(cursor, table: str, column: str) -> bool:
+    cursor.execute("""
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s
+        LIMIT 1
+    """, (table, column))
+    return cursor.fetchone() is not None
+
+def _migration_leituras_sessao_tempo(cursor):
+    """Índice composto para `WHERE sessao_id = ? ORDER BY tempo` sem filesort."""
+    if not index_exists(cursor, 'leituras', 'idx_leituras_sessao_tempo'):
+        cursor.execute("ALTER TABLE leituras ADD INDEX idx_leituras_sessao_tempo (sessao_id, tempo)")
+
+def _migration_leituras_blob(cursor):
+    cursor.execute(SQL_LEITURAS_BLOB_CREATE)
+
+def _migration_sessao_piramide(cursor):
+    cursor.execute(SQL_SESSAO_PIRAMIDE_CREATE)
+
+METRICAS_EMPUXO_COLUMNS = [
+    ('forca_pico', 'FLOAT'),
+    ('tempo_ate_pico', 'FLOAT'),
+    ('queima_inicio', 'FLOAT'),
+    ('queima_fim', 'FLOAT'),
+    ('tempo_queima', 'FLOAT'),
+    ('forca_media', 'FLOAT'),
+    ('impulso_queima', 'FLOAT'),
+    ('designacao', 'VARCHAR(32)'),
+]
+
+def _migration_checkpoints(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS migration_checkpoints (
+            nome VARCHAR(64) PRIMARY KEY,
+            ultimo_id BIGINT NOT NULL,
+            atualizado_em DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        )
+    """)
+
+def _migration_metricas_empuxo(cursor):
+    # Os valores das sessões existentes são preenchidos em segundo plano por session_migration
+    for column_name, column_type in METRICAS_EMPUXO_COLUMNS:
+        if not column_exists(cursor, 'sessoes', column_name):
+            cursor.execute(f"ALTER TABLE sessoes ADD COLUMN {column_name} {column_type}")
+
+SCHEMA_MIGRATIONS = [
+    (1, "leituras: índice (sessao_id, tempo)", _migration_leituras_sessao_tempo),
+    (2, "leituras_blob: leituras compactadas por sessão", _migration_leituras_blob),
+    (3, "sessao_piramide: pirâmide min/max/média por sessão", _migration_sessao_piramide),
+    (4, "sessoes: métricas da curva de empuxo", _migration_metricas_empuxo),
+    (5, "migration_checkpoints: progresso de migrações em segundo plano", _migration_checkpoints),
+]
+
+def apply_schema_migrations(conn):
+    """Aplica, em ordem, as migrações de SCHEMA_MIGRATIONS ainda não registradas."""
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INT PRIMARY KEY,
+                descricao VARCHAR(255) NOT NULL,
+                aplicada_em DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        cursor.execute("SELECT version FROM schema_migrations")
+        aplicadas = {row['version'] for row in cursor.fetchall()}
+
+        for version, descricao, migration in SCHEMA_MIGRATIONS:
+            if version in aplicadas:
+                continue
+            t0 = time.monotonic()
+            migration(cursor)
+            cursor.execute("INSERT INTO schema_migrations (version, descricao) VALUES (%s, %s)",
+                           (version, descricao))
+            conn.commit()
+            logging.info(f"Migração de esquema {version} aplicada ({descricao}) em {time.monotonic() - t0:.2f}s")
+
+SQL_UPDATE_METRICAS_EMPUXO = """
+UPDATE sessoes
+SET impulso_total = %s, motor_class = %s, class_color = %s,
+    forca_pico = %s, tempo_ate_pico = %s, queima_inicio = %s, queima_fim = %s,
+    tempo_queima = %s, forca_media = %s, impulso_queima = %s, designacao = %s
+WHERE id = %s
+"""
 
-    try:
-        with mysql_connection.cursor() as cursor:
-            # Find sessions without calculated impulse
+# Sessões que ainda não têm as métricas calculadas (alvo da migração)
+SQL_METRICAS_PENDENTES = "(impulso_total IS NULL OR motor_class IS NULL OR tempo_queima IS NULL)"
+
+def gravar_metricas_sessao(cursor, sessao_id, m: Dict[str, Any]):
+    cursor.execute(SQL_UPDATE_METRICAS_EMPUXO, (
+        m['impulso_total'], m['motor_class'], m['class_color'],
+        m['forca_pico'], m['tempo_ate_pico'], m['queima_inicio'], m['queima_fim'],
+        m['tempo_queima'], m['forca_media'], m['impulso_queima'], m['designacao'], sessao_id))
+
+def gravar_metricas_sessao_se_inalterada(cursor, sessao_id, m: Dict[str, Any], data_modificacao) -> bool:
+    """
+    Como gravar_metricas_sessao, mas só se a sessão ainda estiver pendente e com a
+    mesma data_modificacao lida antes do cálculo: um salvamento feito nesse meio
+    tempo já gravou métricas novas, que não podem ser sobrescritas.
+    """
+    cursor.execute(SQL_UPDATE_METRICAS_EMPUXO.rstrip() +
+                   f" AND {SQL_METRICAS_PENDENTES} AND data_modificacao <=> %s", (
+        m['impulso_total'], m['motor_class'], m['class_color'],
+        m['forca_pico'], m['tempo_ate_pico'], m['queima_inicio'], m['queima_fim'],
+        m['tempo_queima'], m['forca_media'], m['impulso_queima'], m['designacao'], sessao_id,
+        data_modificacao))
+    return cursor.rowcount > 0
+
+def atualizar_metricas_sessao(cursor, sessao_id, tempos=None, forcas=None) -> Dict[str, Any]:
+    """
+    Recalcula e grava as métricas de empuxo da sessão, respeitando os pontos de
+    queima salvos. Sem tempos/forcas, as leituras são buscadas no banco.
+    """
+    cursor.execute("SELECT burn_start_time, burn_end_time FROM sessoes WHERE id = %s", (sessao_id,))
+    burn = cursor.fetchone() or {}
+    if tempos is None or forcas is None:
+        leituras = fetch_leituras(cursor, sessao_id)
+        tempos = [l['tempo'] for l in leituras]
+        forcas = [l['forca'] for l in leituras]
+    m = calcular_metricas_empuxo(tempos, forcas, burn.get('burn_start_time'), burn.get('burn_end_time'))
+    gravar_metricas_sessao(cursor, sessao_id, m)
+    return m
+
+def metricas_empuxo_json(sessao: Dict[str, Any]) -> Dict[str, Any]:
+    """Colunas de métricas de uma linha de `sessoes` no formato da API (camelCase)."""
+    return {
+        "impulsoTotal": sessao.get('impulso_total'),
+        "impulsoQueima": sessao.get('impulso_queima'),
+        "forcaPico": sessao.get('forca_pico'),
+        "tempoAtePico": sessao.get('tempo_ate_pico'),
+        "queimaInicio": sessao.get('queima_inicio'),
+        "queimaFim": sessao.get('queima_fim'),
+        "tempoQueima": sessao.get('tempo_queima'),
+        "forcaMedia": sessao.get('forca_media'),
+        "designacao": sessao.get('designacao'),
+    }
+
+def _calcular_metricas_worker(payload):
+    """Executado no pool de processos: (sessao_id, tempos, forcas, início, fim) -> (sessao_id, métricas)."""
+    sessao_id, tempos, forcas, burn_start, burn_end = payload
+    return sessao_id, calcular_metricas_empuxo(tempos, forcas, burn_start, burn_end)
+
+class SessionMetricsMigration:
+    """
+    Calcula impulso, classe e métricas de empuxo das sessões gravadas antes
+    dessas colunas existirem. Roda em uma thread depois que os servidores estão
+    no ar: busca as leituras em blocos de MIGRATION_CHUNK_SESSIONS sessões,
+    calcula em um pool de processos e grava cada bloco em uma transação junto com
+    o checkpoint (maior id concluído), então uma reinicialização retoma de onde
+    parou. O progresso vai para os clientes WebSocket como `migration_progress`.
+    """
+
+    CHECKPOINT = 'metricas_empuxo'
+
+    def __init__(self, chunk_size: int, workers: int):
+        self.chunk_size = max(1, chunk_size)
+        self.workers = workers
+        self.status = "idle"  # idle | running | done | error
+        self.total = 0
+        self.done = 0
+        self.error = None
+        self.started_at = None
+        self.thread = None
+
+    def start(self):
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+
+    def _pending(self, cursor, after_id) -> List[int]:
+        cursor.execute("""
+            SELECT id FROM sessoes
+            WHERE """ + SQL_METRICAS_PENDENTES + """ AND id > %s
+            ORDER BY id
+        """, (after_id,))
+        return [row['id'] for row in cursor.fetchall()]
+
+    def _load_chunk(self, ids: List[int]) -> Tuple[List[tuple], Dict[int, Any]]:
+        """Payloads para o cálculo e a data_modificacao de cada sessão no momento da leitura."""
+        payloads = []
+        versoes = {}
+        with mysql_pool.connection() as conn, conn.cursor() as cursor:
+            for sessao_id in ids:
+                cursor.execute("SELECT burn_start_time, burn_end_time, data_modificacao FROM sessoes WHERE id = %s",
+                               (sessao_id,))
+                burn = cursor.fetchone() or {}
+                versoes[sessao_id] = burn.get('data_modificacao')
+                leituras = fetch_leituras(cursor, sessao_id)
+                payloads.append((sessao_id,
+                                 array.array('d', (l['tempo'] if l['tempo'] is not None else math.nan for l in leituras)),
+                                 array.array('d', (l['forca'] if l['forca'] is not None else math.nan for l in leituras)),
+                                 burn.get('burn_start_time'), burn.get('burn_end_time')))
+        return payloads, versoes
+
+    def _store_chunk(self, results: List[tuple], versoes: Dict[int, Any]):
+        with mysql_pool.connection() as conn, conn.cursor() as cursor:
+            for sessao_id, m in results:
+                if not gravar_metricas_sessao_se_inalterada(cursor, sessao_id, m, versoes.get(sessao_id)):
+                    logging.info(f"Sessão {sessao_id} alterada durante a migração; mantendo as métricas atuais")
             cursor.execute("""
-                SELECT id FROM sessoes
-                WHERE impulso_total IS NULL OR motor_class IS NULL
-            """)
-            sessions_to_migrate = cursor.fetchall()
-
-            if not sessions_to_migrate:
+                INSERT INTO migration_checkpoints (nome, ultimo_id) VALUES (%s, %s)
+                ON DUPLICATE KEY UPDATE ultimo_id = VALUES(ultimo_id)
+            """, (self.CHECKPOINT, max(sessao_id for sessao_id, _ in results)))
+            conn.commit()
+            session_index.refresh([sessao_id for sessao_id, _ in results], cursor)
+        for sessao_id, _ in results:
+            invalidate_session_caches(sessao_id)
+
+    def _broadcast(self):
+        serial_queue.put({"type": "migration_progress", **self.stats()})
+
+    def _run(self):
+        self.started_at = time.monotonic()
+        self.status = "running"
+        executor = None
+        try:
+            with mysql_pool.connection() as conn, conn.cursor() as cursor:
+                cursor.execute("SELECT ultimo_id FROM migration_checkpoints WHERE nome = %s", (self.CHECKPOINT,))
+                checkpoint = cursor.fetchone()
+                after_id = checkpoint['ultimo_id'] if checkpoint else -1
+                pending = self._pending(cursor, after_id)
+            if not pending:
                 logging.info("Nenhuma sessão precisa de migração de impulso.")
+                self.status = "done"
                 return
 
-            logging.info(f"Migrando {len(sessions_to_migrate)} sessões para calcular impulso...")
+            self.total = len(pending)
+            logging.info(f"Migrando {self.total} sessões em segundo plano (blocos de {self.chunk_size}, "
+                         f"{self.workers} processos, retomando após id {after_id})...")
+            self._broadcast()
+            if self.workers > 0 and self.total > 1:
+                try:
+                    # Nunca fork: o servidor já tem threads (serial, HTTP, gravação) e um filho
+                    # poderia herdar locks presos, como o do logging
+                    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+                    executor = concurrent.futures.ProcessPoolExecutor(
+                        max_workers=self.workers, mp_context=multiprocessing.get_context(method))
+                except (OSError, NotImplementedError, ValueError) as e:
+                    logging.warning(f"Pool de processos indisponível ({e}); calculando na própria thread")
+
+            for i in range(0, self.total, self.chunk_size):
+                payloads, versoes = self._load_chunk(pending[i:i + self.chunk_size])
+                if executor is not None:
+                    results = list(executor.map(_calcular_metricas_worker, payloads))
+                else:
+                    results = [_calcular_metricas_worker(p) for p in payloads]
+                self._store_chunk(results, versoes)
+                self.done += len(results)
+                self._broadcast()
+
+            # Passada completa: o próximo boot procura desde o início outra vez
+            with mysql_pool.connection() as conn, conn.cursor() as cursor:
+                cursor.execute("DELETE FROM migration_checkpoints WHERE nome = %s", (self.CHECKPOINT,))
+                conn.commit()
+            self.status = "done"
+            logging.info(f"Migração concluída: {self.done} sessões atualizadas em "
+                         f"{time.monotonic() - self.started_at:.1f}s.")
+        except Exception as e:
+            # Blocos já gravados ficam; o checkpoint retoma no próximo boot (inclui
+            # BrokenProcessPool, ex.: worker morto pelo OOM killer)
+            self.status = "error"
+            self.error = f"{type(e).__name__}: {e}"
+            logging.error(f"Erro durante migração de sessões ({self.done}/{self.total} concluídas): {e}", exc_info=True)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False)
+            if self.total:
+                self._broadcast()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "total": self.total,
+            "done": self.done,
+            "error": self.error,
+            "elapsed": round(time.monotonic() - self.started_at, 1) if self.started_at else None
+        }
 
-            for session in sessions_to_migrate:
-                session_id = session['id']
+session_migration = SessionMetricsMigration(MIGRATION_CHUNK_SESSIONS, MIGRATION_WORKERS)
+
+SQL_UPSERT_SESSAO = """
+INSERT INTO sessoes (id, nome, data_inicio, data_fim, data_modificacao, motor_name, motor_diameter,
+                    motor_length, motor_delay, motor_propweight, motor_totalweight, motor_manufacturer,
+                    motor_description, motor_observations, motor_temperatura, motor_umidade, motor_pressao,
+                    impulso_total, motor_class, class_color)
+VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+ON DUPLICATE KEY UPDATE
+    nome = VALUES(nome),
+    data_inicio = VALUES(data_inicio),
+    data_fim = VALUES(data_fim),
+    data_modificacao = VALUES(data_modificacao),
+    motor_name = VALUES(motor_name),
+    motor_diameter = VALUES(motor_diameter),
+    motor_length = VALUES(motor_length),
+    motor_delay = VALUES(motor_delay),
+    motor_propweight = VALUES(motor_propweight),
+    motor_totalweight = VALUES(motor_totalweight),
+    motor_manufacturer = VALUES(motor_manufacturer),
+    motor_description = VALUES(motor_description),
+    motor_observations = VALUES(motor_observations),
+    motor_temperatura = VALUES(motor_temperatura),
+    motor_umidade = VALUES(motor_umidade),
+    motor_pressao = VALUES(motor_pressao),
+    impulso_total = VALUES(impulso_total),
+    motor_class = VALUES(motor_class),
+    class_color = VALUES(class_color)
+"""
 
-                # Fetch readings for this session
-                cursor.execute("""
-                    SELECT tempo, forca FROM leituras
-                    WHERE sessao_id = %s ORDER BY tempo ASC
-                """, (session_id,))
-                leituras = cursor.fetchall()
+SQL_INSERT_LEITURA = "INSERT INTO leituras (sessao_id, tempo, forca, massaKg, timestamp) VALUES (%s, %s, %s, %s, %s)"
 
-                if leituras:
-                    tempos = [float(l['tempo']) for l in leituras if l['tempo'] is not None]
-                    forcas = [float(l['forca']) for l in leituras if l['forca'] is not None]
+def parse_leitura(sessao_id, leitura: Dict[str, Any], i: int) -> Optional[tuple]:
+    """Converte uma linha de dadosTabela na tupla de INSERT em `leituras` (None se inválida)."""
+    leitura_timestamp = None
+    try:
+        # Tenta primeiro com milissegundos
+        leitura_timestamp = datetime.strptime(leitura['timestamp'], '%d/%m/%Y %H:%M:%S.%f')
+    except (ValueError, KeyError, TypeError):
+        try:
+            # Se falhar, tenta sem milissegundos
+            leitura_timestamp = datetime.strptime(leitura.get('timestamp', ''), '%d/%m/%Y %H:%M:%S')
+        except (ValueError, KeyError, TypeError):
+            logging.warning(f"Erro ao converter timestamp da leitura {i}: {leitura.get('timestamp')}, usando None")
+            leitura_timestamp = None
 
-                    impulso_total = calcular_impulso_total(tempos, forcas)
-                    classificacao = classificar_motor(impulso_total)
+    try:
+        # Safely convert to float, handling None values
+        tempo_esp = float(leitura.get('tempo_esp') or 0)
+        newtons = float(leitura.get('newtons') or 0)
+        quilo_forca = float(leitura.get('quilo_forca') or 0)
+        return (sessao_id, tempo_esp, newtons, quilo_forca, leitura_timestamp)
+    except (ValueError, TypeError, KeyError) as e:
+        logging.warning(f"Erro ao processar leitura {i}: {type(e).__name__}: {e}, pulando...")
+        return None
 
-                    # Update session with calculated values
-                    cursor.execute("""
-                        UPDATE sessoes
-                        SET impulso_total = %s, motor_class = %s, class_color = %s
-                        WHERE id = %s
-                    """, (impulso_total, classificacao['classe'], classificacao['cor'], session_id))
+# ==================== ARMAZENAMENTO COMPACTO (leituras_blob) ====================
+# Com LEITURAS_STORAGE=blob, as leituras de uma sessão ficam em uma única linha
+# de `leituras_blob`: colunas float32 (tempo, forca, massaKg) e timestamps em ms
+# codificados por delta, tudo comprimido com zlib. A leitura é transparente:
+# fetch_leituras() consulta o blob e, se não existir, a tabela `leituras`.
+
+SQL_LEITURAS_BLOB_CREATE = """
+CREATE TABLE IF NOT EXISTS leituras_blob (
+    sessao_id BIGINT PRIMARY KEY,
+    n INT NOT NULL,
+    codec TINYINT NOT NULL,
+    dados LONGBLOB NOT NULL,
+    FOREIGN KEY (sessao_id) REFERENCES sessoes(id) ON DELETE CASCADE
+)
+"""
 
-                    logging.info(f"Sessão {session_id}: Impulso={impulso_total:.2f} Ns, Classe={classificacao['classe']}")
-                else:
-                    # No readings, set default values
-                    cursor.execute("""
-                        UPDATE sessoes
-                        SET impulso_total = 0, motor_class = 'N/A', class_color = '#95a5a6'
-                        WHERE id = %s
-                    """, (session_id,))
+LEITURAS_BLOB_CODEC = 1
+LEITURAS_BLOB_NO_TIMESTAMP = -1  # ms; nenhuma leitura real é anterior a 1970
+EPOCH_NAIVE = datetime(1970, 1, 1)
+ONE_MS = timedelta(milliseconds=1)
+
+def _array_bytes(values: array.array) -> bytes:
+    # O formato em disco é little-endian, independente da arquitetura
+    if sys.byteorder != 'little':
+        values = array.array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+def _array_from_bytes(typecode: str, data) -> array.array:
+    values = array.array(typecode)
+    values.frombytes(data)
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values
+
+def timestamp_ms_blob(ts: Optional[datetime]) -> int:
+    """Timestamp de uma leitura em ms desde 1970, como guardado em leituras_blob."""
+    return (ts - EPOCH_NAIVE) // ONE_MS if ts is not None else LEITURAS_BLOB_NO_TIMESTAMP
+
+def encode_leituras_blob_columns(tempos, forcas, massas, timestamps_ms) -> bytes:
+    """
+    Codifica colunas paralelas (arrays de tempo, forca, massaKg e timestamp em ms,
+    ver timestamp_ms_blob) no formato de leituras_blob, sem montar uma tupla por leitura.
+    """
+    n = len(tempos)
+    ordem = None
+    if any(tempos[i] < tempos[i - 1] for i in range(1, n)):
+        ordem = sorted(range(n), key=tempos.__getitem__)
+    if ordem is None:
+        tempos, forcas, massas = (array.array('f', c) for c in (tempos, forcas, massas))
+    else:
+        tempos, forcas, massas = (array.array('f', (c[i] for i in ordem)) for c in (tempos, forcas, massas))
+        timestamps_ms = [timestamps_ms[i] for i in ordem]
+    deltas = array.array('q')
+    anterior = 0
+    for ms in timestamps_ms:
+        deltas.append(ms - anterior)
+        anterior = ms
+    raw = b''.join((struct.pack('<I', n), _array_bytes(tempos), _array_bytes(forcas),
+                    _array_bytes(massas), _array_bytes(deltas)))
+    return zlib.compress(raw, 6)
+
+def encode_leituras_blob(rows) -> bytes:
+    """Codifica tuplas (tempo, forca, massaKg, timestamp) no formato de leituras_blob."""
+    tempos, forcas, massas, timestamps_ms = array.array('d'), array.array('d'), array.array('d'), array.array('q')
+    for r in rows:
+        tempos.append(r[0])
+        forcas.append(r[1])
+        massas.append(r[2])
+        timestamps_ms.append(timestamp_ms_blob(r[3]))
+    return encode_leituras_blob_columns(tempos, forcas, massas, timestamps_ms)
+
+def iter_leituras_blob(dados: bytes) -> Iterator[Dict[str, Any]]:
+    """
+    Leituras do blob uma a uma, no mesmo formato de linha do SELECT em `leituras`.
+    Descompacta na chamada (erros aparecem aqui); os dicts são gerados sob demanda.
+    """
+    raw = zlib.decompress(dados)
+    (n,) = struct.unpack_from('<I', raw)
+    off = 4
+    tempos = _array_from_bytes('f', raw[off:off + 4 * n]); off += 4 * n
+    forcas = _array_from_bytes('f', raw[off:off + 4 * n]); off += 4 * n
+    massas = _array_from_bytes('f', raw[off:off + 4 * n]); off += 4 * n
+    deltas = _array_from_bytes('q', raw[off:off + 8 * n])
+
+    def rows():
+        ms = 0
+        for i in range(n):
+            ms += deltas[i]
+            yield {
+                "tempo": tempos[i],
+                "forca": forcas[i],
+                "ema": None,
+                "massaKg": massas[i],
+                "timestamp": EPOCH_NAIVE + ms * ONE_MS if ms != LEITURAS_BLOB_NO_TIMESTAMP else None,
+            }
+    return rows()
+
+def decode_leituras_blob(dados: bytes) -> List[Dict[str, Any]]:
+    """Inverso de encode_leituras_blob, no mesmo formato de linha do SELECT em `leituras`."""
+    return list(iter_leituras_blob(dados))
+
+def insert_leituras_blob(cursor, sessao_id, rows) -> int:
+    """Grava (substituindo) o blob da sessão a partir de tuplas (tempo, forca, massaKg, timestamp)."""
+    rows = list(rows)
+    cursor.execute("REPLACE INTO leituras_blob (sessao_id, n, codec, dados) VALUES (%s, %s, %s, %s)",
+                   (sessao_id, len(rows), LEITURAS_BLOB_CODEC, encode_leituras_blob(rows)))
+    return len(rows)
+
+def insert_leituras_blob_columns(cursor, sessao_id, tempos, forcas, massas, timestamps_ms) -> int:
+    """Como insert_leituras_blob, a partir de colunas (ver encode_leituras_blob_columns)."""
+    cursor.execute("REPLACE INTO leituras_blob (sessao_id, n, codec, dados) VALUES (%s, %s, %s, %s)",
+                   (sessao_id, len(tempos), LEITURAS_BLOB_CODEC,
+                    encode_leituras_blob_columns(tempos, forcas, massas, timestamps_ms)))
+    return len(tempos)
+
+def delete_leituras(cursor, sessao_id):
+    """Remove as leituras da sessão nos dois formatos de armazenamento (e a pirâmide derivada delas)."""
+    cursor.execute("DELETE FROM leituras WHERE sessao_id = %s", (sessao_id,))
+    cursor.execute("DELETE FROM leituras_blob WHERE sessao_id = %s", (sessao_id,))
+    cursor.execute("DELETE FROM sessao_piramide WHERE sessao_id = %s", (sessao_id,))
+
+SQL_LEITURAS_SESSAO = "SELECT tempo, forca, ema, massaKg, timestamp FROM leituras WHERE sessao_id = %s ORDER BY tempo ASC"
+
+def fetch_leituras(cursor, sessao_id) -> List[Dict[str, Any]]:
+    """Leituras da sessão ordenadas por tempo, venham do blob ou da tabela `leituras`."""
+    cursor.execute("SELECT codec, dados FROM leituras_blob WHERE sessao_id = %s", (sessao_id,))
+    blob = cursor.fetchone()
+    if blob:
+        if blob['codec'] != LEITURAS_BLOB_CODEC:
+            raise ValueError(f"Codec de leituras_blob desconhecido: {blob['codec']}")
+        return decode_leituras_blob(blob['dados'])
+    cursor.execute(SQL_LEITURAS_SESSAO, (sessao_id,))
+    return cursor.fetchall()
+
+# Cada stream segura uma conexão durante toda a transferência; clientes lentos
+# (celulares no hotspot) não podem esgotar o pool das demais rotas
+leituras_stream_slots = threading.BoundedSemaphore(max(1, LEITURAS_STREAM_MAX))
+
+def _leituras_json_chunks(sessao_id, chunk_rows: int) -> Iterator[bytes]:
+    conn = None
+    try:
+        conn = new_mysql_connection()
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT codec, dados FROM leituras_blob WHERE sessao_id = %s", (sessao_id,))
+            blob = cursor.fetchone()
+        stream = None
+        try:
+            if blob:
+                if blob['codec'] != LEITURAS_BLOB_CODEC:
+                    raise ValueError(f"Codec de leituras_blob desconhecido: {blob['codec']}")
+                rows = iter_leituras_blob(blob['dados'])
+                batches = iter(lambda: list(itertools.islice(rows, chunk_rows)), [])
+            else:
+                # Sem buffer: as linhas vêm do MySQL conforme são consumidas
+                stream = conn.cursor(pymysql.cursors.SSDictCursor)
+                stream.execute(SQL_LEITURAS_SESSAO, (sessao_id,))
+                batches = iter(lambda: stream.fetchmany(chunk_rows), [])
+            yield b""  # consultas feitas (ver stream_leituras_json)
+            yield b"["
+            sep = b""
+            for batch in batches:
+                yield sep + json_dumps(batch)[1:-1]
+                sep = b","
+            yield b"]"
+        finally:
+            if stream is not None:
+                # Se o cliente desistiu, descarta o resto do resultado antes de fechar
+                stream.close()
+    finally:
+        if conn is not None:
+            try:
+                conn.close()
+            except pymysql.Error:
+                pass
+        leituras_stream_slots.release()
+
+def stream_leituras_json(sessao_id, chunk_rows: int) -> Optional[Iterator[bytes]]:
+    """
+    O mesmo JSON de fetch_leituras, gerado em pedaços de `chunk_rows` leituras:
+    nem as linhas nem o documento inteiro ficam em memória. As consultas rodam
+    já nesta chamada, então erros de MySQL aparecem antes de qualquer cabeçalho.
+    Usa uma conexão própria (não a do pool) até o gerador terminar ou ser
+    fechado. None se já há LEITURAS_STREAM_MAX streams em andamento.
+    """
+    if not leituras_stream_slots.acquire(blocking=False):
+        return None
+    chunks = _leituras_json_chunks(sessao_id, chunk_rows)  # libera a vaga ao terminar
+    next(chunks)
+    return chunks
+
+def pack_session_leituras(cursor, sessao_id) -> int:
+    """Converte as linhas de `leituras` da sessão em um blob. Retorna o nº de leituras."""
+    cursor.execute("SELECT tempo, forca, massaKg, timestamp FROM leituras WHERE sessao_id = %s", (sessao_id,))
+    rows = [(r['tempo'] or 0.0, r['forca'] or 0.0, r['massaKg'] or 0.0, r['timestamp']) for r in cursor.fetchall()]
+    if not rows:
+        return 0
+    insert_leituras_blob(cursor, sessao_id, rows)
+    cursor.execute("DELETE FROM leituras WHERE sessao_id = %s", (sessao_id,))
+    return len(rows)
+
+def unpack_session_leituras(cursor, sessao_id) -> int:
+    """Inverso de pack_session_leituras: devolve o blob da sessão para `leituras`."""
+    cursor.execute("SELECT dados FROM leituras_blob WHERE sessao_id = %s", (sessao_id,))
+    blob = cursor.fetchone()
+    if not blob:
+        return 0
+    rows = [(sessao_id, l['tempo'], l['forca'], l['massaKg'], l['timestamp'])
+            for l in decode_leituras_blob(blob['dados'])]
+    cursor.execute("DELETE FROM leituras WHERE sessao_id = %s", (sessao_id,))
+    cursor.executemany(SQL_INSERT_LEITURA, rows)
+    cursor.execute("DELETE FROM leituras_blob WHERE sessao_id = %s", (sessao_id,))
+    return len(rows)
+
+# Formato binário colunar de GET /api/sessoes/{id}/leituras?format=f32 (little-endian):
+#   cabeçalho (16 bytes): magic b'GFLC', versão u8, nº de colunas u8, reservado u16, n u32, reservado u32
+#   timestamp  float64[n]  ms desde 1970 (DATETIME do banco tratado como UTC; NaN se ausente)
+#   tempo      float32[n]  s
+#   forca      float32[n]  N
+#   massaKg    float32[n]  kg
+# O float64 vem primeiro para que todas as colunas fiquem alinhadas (Float64Array/Float32Array).
+LEITURAS_F32_HEADER = struct.Struct('<4sBBHI4x')
+LEITURAS_F32_MAGIC = b'GFLC'
+
+def encode_leituras_f32(leituras: List[Dict[str, Any]]) -> bytes:
+    nan = float('nan')
+    timestamps = array.array('d', (
+        (l['timestamp'] - EPOCH_NAIVE) / ONE_MS if l['timestamp'] is not None else nan for l in leituras))
+    columns = [timestamps] + [
+        array.array('f', (l[key] if l[key] is not None else nan for l in leituras))
+        for key in ('tempo', 'forca', 'massaKg')
+    ]
+    header = LEITURAS_F32_HEADER.pack(LEITURAS_F32_MAGIC, 1, len(columns), 0, len(leituras))
+    return header + b''.join(_array_bytes(col) for col in columns)
+
+# ==================== DECIMAÇÃO DE SÉRIES ====================
+# GET /api/sessoes/{id}/leituras?points=N[&from=s&to=s][&mode=minmax|lttb]
+# devolve um subconjunto das leituras (mesmo formato de linha, JSON ou f32) que
+# preserva a forma da curva na resolução da tela. As colunas da sessão ficam em
+# cache (LRU) para que zoom/pan só custem o recorte e a decimação da janela.
+
+def decimate_minmax(tempo, forca, points: int):
+    """Índices do mínimo e do máximo de força em points/2 baldes de mesmo tamanho."""
+    n = len(forca)
+    if n <= points:
+        return list(range(n))
+    buckets = max(1, points // 2)
+    if np is not None:
+        edges = np.linspace(0, n, buckets + 1).astype(np.intp)
+        width = int(np.diff(edges).max())
+        idx = edges[:-1, None] + np.arange(width)[None, :]
+        valid = idx < edges[1:, None]
+        idx = np.minimum(idx, n - 1)
+        values = forca[idx]
+        rows = np.arange(buckets)
+        imin = idx[rows, np.where(valid, values, np.inf).argmin(axis=1)]
+        imax = idx[rows, np.where(valid, values, -np.inf).argmax(axis=1)]
+        return np.unique(np.concatenate((imin, imax, [0, n - 1]))).tolist()
+    selected = {0, n - 1}
+    for b in range(buckets):
+        lo, hi = b * n // buckets, (b + 1) * n // buckets
+        bucket = range(lo, hi)
+        selected.add(min(bucket, key=forca.__getitem__))
+        selected.add(max(bucket, key=forca.__getitem__))
+    return sorted(selected)
+
+def decimate_lttb(tempo, forca, points: int):
+    """Largest-Triangle-Three-Buckets: `points` índices, incluindo o primeiro e o último."""
+    n = len(forca)
+    if n <= points:
+        return list(range(n))
+    if points < 3:
+        return [0, n - 1]
+    buckets = points - 2
+    edges = [1 + b * (n - 2) // buckets for b in range(buckets + 1)]
+    if np is not None:
+        e = np.asarray(edges[:-1], dtype=np.intp)
+        counts = np.diff(np.asarray(edges, dtype=np.float64))
+        # Média de cada balde; o "próximo balde" do último é o ponto final
+        mean_t = np.append(np.add.reduceat(tempo[:n - 1], e) / counts, tempo[n - 1])
+        mean_f = np.append(np.add.reduceat(forca[:n - 1], e) / counts, forca[n - 1])
+    else:
+        mean_t = [sum(tempo[edges[b]:edges[b + 1]]) / (edges[b + 1] - edges[b]) for b in range(buckets)] + [tempo[n - 1]]
+        mean_f = [sum(forca[edges[b]:edges[b + 1]]) / (edges[b + 1] - edges[b]) for b in range(buckets)] + [forca[n - 1]]
+
+    selected = [0]
+    a = 0
+    for b in range(buckets):
+        lo, hi = edges[b], edges[b + 1]
+        ta, fa = tempo[a], forca[a]
+        tc, fc = mean_t[b + 1], mean_f[b + 1]
+        if np is not None:
+            area = np.abs((ta - tc) * (forca[lo:hi] - fa) - (ta - tempo[lo:hi]) * (fc - fa))
+            a = lo + int(area.argmax())
+        else:
+            a = max(range(lo, hi), key=lambda i: abs((ta - tc) * (forca[i] - fa) - (ta - tempo[i]) * (fc - fa)))
+        selected.append(a)
+    selected.append(n - 1)
+    return selected
+
+DECIMATORS = {
+    "minmax": decimate_minmax,
+    "lttb": decimate_lttb,
+}
+
+class SessionSeries:
+    """Colunas de uma sessão (ordenadas por tempo, só amostras finitas) prontas para decimação."""
+
+    def __init__(self, leituras: List[Dict[str, Any]]):
+        nan = float('nan')
+        rows = [l for l in leituras
+                if l['tempo'] is not None and l['forca'] is not None
+                and math.isfinite(l['tempo']) and math.isfinite(l['forca'])]
+        self.size = len(rows)
+        tempo = array.array('d', (l['tempo'] for l in rows))
+        forca = array.array('d', (l['forca'] for l in rows))
+        self.massa = array.array('d', (l['massaKg'] if l['massaKg'] is not None else nan for l in rows))
+        self.timestamp = array.array('d', (
+            (l['timestamp'] - EPOCH_NAIVE) / ONE_MS if l['timestamp'] is not None else nan for l in rows))
+        if np is not None:
+            self.tempo = np.frombuffer(tempo, dtype=np.float64)
+            self.forca = np.frombuffer(forca, dtype=np.float64)
+        else:
+            self.tempo, self.forca = tempo, forca
+
+    def window(self, t_from: Optional[float], t_to: Optional[float]) -> Tuple[int, int]:
+        """Faixa [lo, hi) da janela de tempo, com um ponto extra de cada lado para a linha chegar às bordas."""
+        lo, hi = 0, self.size
+        if t_from is not None:
+            lo = max(0, bisect.bisect_left(self.tempo, t_from) - 1)
+        if t_to is not None:
+            hi = min(self.size, bisect.bisect_right(self.tempo, t_to) + 1)
+        return lo, max(lo, hi)
+
+    def row(self, i: int) -> Dict[str, Any]:
+        ts = self.timestamp[i]
+        massa = self.massa[i]
+        return {
+            "tempo": float(self.tempo[i]),
+            "forca": float(self.forca[i]),
+            "ema": None,
+            "massaKg": massa if not math.isnan(massa) else None,
+            "timestamp": EPOCH_NAIVE + timedelta(milliseconds=ts) if not math.isnan(ts) else None,
+        }
 
-            mysql_connection.commit()
-            logging.info(f"Migração concluída: {len(sessions_to_migrate)} sessões atualizadas.")
+    def decimate(self, mode: str, points: int, t_from: Optional[float], t_to: Optional[float]):
+        lo, hi = self.window(t_from, t_to)
+        indices = DECIMATORS[mode](self.tempo[lo:hi], self.forca[lo:hi], points)
+        return [self.row(lo + i) for i in indices], hi - lo
+
+class SessionSeriesCache:
+    """LRU de SessionSeries por sessão, com os últimos resultados de decimação de cada uma."""
+
+    RESULTS_PER_SESSION = 16
+
+    def __init__(self, max_sessions: int):
+        self.max_sessions = max(1, max_sessions)
+        self.lock = threading.Lock()
+        self.entries = collections.OrderedDict()  # sessao_id -> (SessionSeries, OrderedDict de resultados)
+        self.generations = {}  # sessao_id -> nº de invalidações (descarta cargas que ficaram velhas)
+        self.hits = 0
+        self.misses = 0
+
+    def decimated(self, sessao_id, mode: str, points: int, t_from: Optional[float], t_to: Optional[float], loader):
+        key = (mode, points, t_from, t_to)
+        with self.lock:
+            entry = self.entries.get(sessao_id)
+            if entry:
+                self.entries.move_to_end(sessao_id)
+                result = entry[1].get(key)
+                if result is not None:
+                    entry[1].move_to_end(key)
+                    self.hits += 1
+                    return result
+            self.misses += 1
+            generation = self.generations.get(sessao_id, 0)
+        if entry is None:
+            # Carrega fora do lock: outra sessão não espera pelo MySQL desta
+            entry = (SessionSeries(loader(sessao_id)), collections.OrderedDict())
+        result = entry[0].decimate(mode, points, t_from, t_to)
+        with self.lock:
+            if self.generations.get(sessao_id, 0) != generation:
+                # Invalidada durante a carga: responde, mas não guarda a série antiga
+                return result
+            entry = self.entries.setdefault(sessao_id, entry)
+            self.entries.move_to_end(sessao_id)
+            entry[1][key] = result
+            while len(entry[1]) > self.RESULTS_PER_SESSION:
+                entry[1].popitem(last=False)
+            while len(self.entries) > self.max_sessions:
+                self.entries.popitem(last=False)
+        return result
 
-    except pymysql.Error as e:
-        logging.error(f"Erro durante migração de sessões: {e}")
-        if mysql_connection:
-            mysql_connection.rollback()
+    def invalidate(self, sessao_id):
+        with self.lock:
+            self.entries.pop(sessao_id, None)
+            self.generations[sessao_id] = self.generations.get(sessao_id, 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "sessions": len(self.entries),
+                "max_sessions": self.max_sessions,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+series_cache = SessionSeriesCache(SERIES_CACHE_SESSIONS)
+
+def load_leituras(sessao_id) -> List[Dict[str, Any]]:
+    with mysql_pool.connection() as conn, conn.cursor() as cursor:
+        return fetch_leituras(cursor, sessao_id)
+
+# ==================== PIRÂMIDE MULTIRRESOLUÇÃO ====================
+# Para cada sessão salva, `sessao_piramide` guarda níveis com fator 4^k
+# (1x, 4x, 16x, ...) até o nível caber em um tile. O nível 0 são as próprias
+# amostras (tempo, forca); os demais guardam, por balde de 4^k amostras, o tempo
+# inicial e o mínimo, o máximo e a média da força. GET /api/sessoes/{id}/tiles
+# serve tiles de PYRAMID_TILE_SIZE entradas, então pan/zoom custam O(largura da
+# tela) por requisição. Só os caminhos de gravação persistem a pirâmide; a de
+# sessões antigas é construída em memória no primeiro acesso (um GET com um
+# snapshot antigo não pode sobrescrever a pirâmide de um save concorrente).
+
+SQL_SESSAO_PIRAMIDE_CREATE = """
+CREATE TABLE IF NOT EXISTS sessao_piramide (
+    sessao_id BIGINT PRIMARY KEY,
+    niveis TINYINT NOT NULL,
+    tile_size INT NOT NULL,
+    dados LONGBLOB NOT NULL,
+    FOREIGN KEY (sessao_id) REFERENCES sessoes(id) ON DELETE CASCADE
+)
+"""
+
+PYRAMID_FACTOR = 4
+PYRAMID_HEADER = struct.Struct('<4sBBHII')  # magic, versão, níveis, fator, tile_size, n
+PYRAMID_MAGIC = b'GFPY'
+PYRAMID_COLUMNS = ("tempo", "min", "max", "mean")
+
+class SessionPyramid:
+    """Níveis da pirâmide de uma sessão; cada nível é um dict de colunas array('f')."""
+
+    def __init__(self, levels: List[Dict[str, array.array]], tile_size: int):
+        self.levels = levels
+        self.tile_size = tile_size
+
+    @classmethod
+    def build(cls, tempo, forca, tile_size: int = PYRAMID_TILE_SIZE) -> 'SessionPyramid':
+        pares = sorted((t, f) for t, f in zip(tempo, forca)
+                       if t is not None and f is not None and math.isfinite(t) and math.isfinite(f))
+        tempo = array.array('f', (t for t, _ in pares))
+        forca = array.array('f', (f for _, f in pares))
+        n = len(forca)
+        levels = [{"tempo": tempo, "min": forca, "max": forca, "mean": forca}]
+        factor = PYRAMID_FACTOR
+        while len(levels[-1]["tempo"]) > tile_size:
+            if np is not None:
+                f = np.frombuffer(forca, dtype=np.float32)
+                starts = np.arange(0, n, factor)
+                counts = np.diff(np.append(starts, n))
+                level = {
+                    "tempo": array.array('f', np.frombuffer(tempo, dtype=np.float32)[starts].tobytes()),
+                    "min": array.array('f', np.minimum.reduceat(f, starts).tobytes()),
+                    "max": array.array('f', np.maximum.reduceat(f, starts).tobytes()),
+                    "mean": array.array('f', (np.add.reduceat(f.astype(np.float64), starts) / counts)
+                                        .astype(np.float32).tobytes()),
+                }
+            else:
+                level = {name: array.array('f') for name in PYRAMID_COLUMNS}
+                for start in range(0, n, factor):
+                    bucket = forca[start:start + factor]
+                    level["tempo"].append(tempo[start])
+                    level["min"].append(min(bucket))
+                    level["max"].append(max(bucket))
+                    level["mean"].append(sum(bucket) / len(bucket))
+            levels.append(level)
+            factor *= PYRAMID_FACTOR
+        return cls(levels, tile_size)
+
+    def encode(self) -> bytes:
+        parts = [PYRAMID_HEADER.pack(PYRAMID_MAGIC, 1, len(self.levels), PYRAMID_FACTOR,
+                                     self.tile_size, len(self.levels[0]["tempo"]))]
+        for k, level in enumerate(self.levels):
+            parts.append(struct.pack('<I', len(level["tempo"])))
+            # No nível 0 min = max = média = força: guarda só uma coluna
+            for name in (("tempo", "mean") if k == 0 else PYRAMID_COLUMNS):
+                parts.append(_array_bytes(level[name]))
+        return zlib.compress(b''.join(parts), 6)
+
+    @classmethod
+    def decode(cls, dados: bytes) -> 'SessionPyramid':
+        raw = zlib.decompress(dados)
+        magic, version, nlevels, factor, tile_size, _ = PYRAMID_HEADER.unpack_from(raw)
+        if magic != PYRAMID_MAGIC or version != 1 or factor != PYRAMID_FACTOR:
+            raise ValueError("Formato de sessao_piramide desconhecido")
+        off = PYRAMID_HEADER.size
+        levels = []
+        for k in range(nlevels):
+            (count,) = struct.unpack_from('<I', raw, off)
+            off += 4
+            level = {}
+            for name in (("tempo", "mean") if k == 0 else PYRAMID_COLUMNS):
+                level[name] = _array_from_bytes('f', raw[off:off + 4 * count])
+                off += 4 * count
+            if k == 0:
+                level["min"] = level["max"] = level["mean"]
+            levels.append(level)
+        return cls(levels, tile_size)
+
+    def describe(self) -> Dict[str, Any]:
+        """Metadados para o cliente escolher nível e tiles: tempo inicial de cada tile por nível."""
+        tempo0 = self.levels[0]["tempo"]
+        return {
+            "samples": len(tempo0),
+            "tempoInicio": _f32_json(tempo0[0]) if tempo0 else None,
+            "tempoFim": _f32_json(tempo0[-1]) if tempo0 else None,
+            "tileSize": self.tile_size,
+            "levels": [{
+                "level": k,
+                "factor": PYRAMID_FACTOR ** k,
+                "count": len(level["tempo"]),
+                "tileStarts": [_f32_json(t) for t in level["tempo"][::self.tile_size]],
+            } for k, level in enumerate(self.levels)],
+        }
+
+    def tile(self, level: int, start: int) -> Dict[str, Any]:
+        columns = self.levels[level]
+        lo = start * self.tile_size
+        hi = lo + self.tile_size
+        tile = {
+            "level": level,
+            "factor": PYRAMID_FACTOR ** level,
+            "tile": start,
+            "tileSize": self.tile_size,
+            "tiles": -(-len(columns["tempo"]) // self.tile_size),
+        }
+        for name in PYRAMID_COLUMNS:
+            tile[name] = [_f32_json(v) for v in columns[name][lo:hi]]
+        return tile
+
+def _f32_json(value: float) -> float:
+    # Representação curta de um float32 (evita 0.012500000186264515 no JSON)
+    return float('%.7g' % value)
+
+def store_session_pyramid(cursor, sessao_id, tempo, forca) -> SessionPyramid:
+    pyramid = SessionPyramid.build(tempo, forca)
+    cursor.execute("REPLACE INTO sessao_piramide (sessao_id, niveis, tile_size, dados) VALUES (%s, %s, %s, %s)",
+                   (sessao_id, len(pyramid.levels), pyramid.tile_size, pyramid.encode()))
+    return pyramid
+
+def rebuild_session_pyramid(cursor, sessao_id) -> SessionPyramid:
+    leituras = fetch_leituras(cursor, sessao_id)
+    return store_session_pyramid(cursor, sessao_id, (l['tempo'] for l in leituras), [l['forca'] for l in leituras])
+
+class PyramidCache:
+    """LRU em memória das pirâmides decodificadas; a fonte persistente é `sessao_piramide`."""
+
+    def __init__(self, max_sessions: int):
+        self.max_sessions = max(1, max_sessions)
+        self.lock = threading.Lock()
+        self.entries = collections.OrderedDict()
+        self.generations = {}  # sessao_id -> nº de invalidações (descarta cargas que ficaram velhas)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, sessao_id) -> Optional[SessionPyramid]:
+        with self.lock:
+            pyramid = self.entries.get(sessao_id)
+            if pyramid is not None:
+                self.entries.move_to_end(sessao_id)
+                self.hits += 1
+                return pyramid
+            self.misses += 1
+            generation = self.generations.get(sessao_id, 0)
+        pyramid = self._load(sessao_id)
+        if pyramid is not None:
+            with self.lock:
+                if self.generations.get(sessao_id, 0) != generation:
+                    return pyramid  # invalidada durante a carga: não guarda
+                self.entries[sessao_id] = pyramid
+                while len(self.entries) > self.max_sessions:
+                    self.entries.popitem(last=False)
+        return pyramid
+
+    def _load(self, sessao_id) -> Optional[SessionPyramid]:
+        with mysql_pool.connection() as conn, conn.cursor() as cursor:
+            cursor.execute("SELECT dados, tile_size FROM sessao_piramide WHERE sessao_id = %s", (sessao_id,))
+            row = cursor.fetchone()
+            if row and row['tile_size'] == PYRAMID_TILE_SIZE:
+                return SessionPyramid.decode(row['dados'])
+            cursor.execute("SELECT 1 FROM sessoes WHERE id = %s", (sessao_id,))
+            if cursor.fetchone() is None:
+                return None
+            # Sessão anterior à pirâmide (ou tile_size alterado): constrói só em memória
+            leituras = fetch_leituras(cursor, sessao_id)
+            pyramid = SessionPyramid.build((l['tempo'] for l in leituras), [l['forca'] for l in leituras])
+            logging.info(f"Pirâmide da sessão {sessao_id} construída sob demanda ({len(pyramid.levels)} níveis)")
+            return pyramid
+
+    def invalidate(self, sessao_id):
+        with self.lock:
+            self.entries.pop(sessao_id, None)
+            self.generations[sessao_id] = self.generations.get(sessao_id, 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "sessions": len(self.entries),
+                "max_sessions": self.max_sessions,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+pyramid_cache = PyramidCache(PYRAMID_CACHE_SESSIONS)
+
+def invalidate_session_caches(sessao_id):
+    """Chamado sempre que as leituras de uma sessão mudam ou a sessão é removida."""
+    series_cache.invalidate(sessao_id)
+    pyramid_cache.invalidate(sessao_id)
+
+# ==================== ÍNDICE DE SESSÕES (/api/sessoes) ====================
+SQL_SESSOES_LISTA = """
+SELECT id, nome, data_inicio, data_fim, data_modificacao,
+       motor_name, motor_diameter, motor_length, motor_delay,
+       motor_propweight, motor_totalweight, motor_manufacturer,
+       motor_description, motor_observations, motor_temperatura, motor_umidade, motor_pressao,
+       impulso_total, motor_class, class_color,
+       forca_pico, tempo_ate_pico, queima_inicio, queima_fim, tempo_queima,
+       forca_media, impulso_queima, designacao
+FROM sessoes
+"""
+
+SESSION_INDEX_TOMBSTONES = 1024  # remoções lembradas para ?since=
+
+def sessao_to_json(sessao: Dict[str, Any]) -> Dict[str, Any]:
+    """Linha de SQL_SESSOES_LISTA no formato de /api/sessoes."""
+    sessao['impulsoTotal'] = sessao.get('impulso_total', 0) or 0
+    sessao['motorClass'] = sessao.get('motor_class', 'N/A') or 'N/A'
+    sessao['classColor'] = sessao.get('class_color', '#95a5a6') or '#95a5a6'
+    sessao['metricasEmpuxo'] = metricas_empuxo_json(sessao)
+    sessao['metadadosMotor'] = {
+        'name': sessao.get('motor_name', None),
+        'diameter': sessao.get('motor_diameter', None),
+        'length': sessao.get('motor_length', None),
+        'delay': sessao.get('motor_delay', None),
+        'propweight': sessao.get('motor_propweight', None),
+        'totalweight': sessao.get('motor_totalweight', None),
+        'manufacturer': sessao.get('motor_manufacturer', None),
+        'description': sessao.get('motor_description', None),
+        'observations': sessao.get('motor_observations', None),
+        'temperatura': sessao.get('motor_temperatura', None),
+        'umidade': sessao.get('motor_umidade', None),
+        'pressao': sessao.get('motor_pressao', None)
+    }
+    return sessao
+
+def parse_session_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Cursor de paginação `<data_inicio ISO>~<id>` (ValueError se inválido)."""
+    data_inicio, sep, sessao_id = cursor.rpartition('~')
+    if not sep:
+        raise ValueError("Cursor inválido")
+    return datetime.fromisoformat(data_inicio), int(sessao_id)
+
+def parse_since(value: str) -> datetime:
+    """Instante de ?since= (formato de data_modificacao ou ISO 8601), sem fuso como no MySQL."""
+    since = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return since.replace(tzinfo=None) if since.tzinfo else since
+
+class SessionIndex:
+    """
+    Lista de sessões em memória para /api/sessoes: carregada uma vez (no primeiro
+    pedido) e atualizada linha a linha por refresh()/remove() a cada gravação,
+    remoção ou mudança de metadados de queima. Cada mudança incrementa a versão
+    usada na ETag. Para ?since=, cada entrada guarda quando mudou no relógio do
+    MySQL (NOW() medido na carga), e as remoções ficam como lápides.
+    Cada releitura recebe um número de sequência antes do SELECT: uma releitura
+    mais antiga que termine por último não sobrescreve a mais nova.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.load_lock = threading.Lock()
+        self.entries: Dict[int, Dict[str, Any]] = {}
+        self.alterado: Dict[int, datetime] = {}
+        self.removidas: "collections.OrderedDict[int, datetime]" = collections.OrderedDict()
+        self.removidas_desde: Optional[datetime] = None  # lápides cobrem remoções a partir daqui
+        self.ordered: Optional[List[Dict[str, Any]]] = None  # data_inicio DESC, id DESC
+        self.keys: Optional[List[Tuple[datetime, int]]] = None  # as mesmas chaves, em ordem crescente
+        self.loaded = False
+        self.stale = False
+        self.version = 0
+        self.seq = 0
+        self.seq_floor = 0  # sequência da última carga completa
+        self.applied: Dict[int, int] = {}  # sessao_id -> sequência da releitura aplicada
+        self.boot = format(int(time.time()), 'x')
+        self.db_offset = timedelta(0)
+        self.loads = 0
+        self.refreshes = 0
+
+    def db_now(self) -> datetime:
+        return datetime.now() + self.db_offset
+
+    def ensure_loaded(self):
+        if self.loaded:
+            return
+        with self.load_lock:
+            while not self.loaded:
+                self.stale = False
+                seq = self._next_seq()
+                with mysql_pool.connection() as conn, conn.cursor() as cursor:
+                    cursor.execute("SELECT NOW(6) AS agora")
+                    offset = cursor.fetchone()['agora'] - datetime.now()
+                    cursor.execute(SQL_SESSOES_LISTA)
+                    rows = cursor.fetchall()
+                with self.lock:
+                    self.db_offset = offset
+                    self.entries = {row['id']: sessao_to_json(row) for row in rows}
+                    self.alterado = {row['id']: row['data_modificacao'] or row['data_inicio'] for row in rows}
+                    self.removidas.clear()
+                    self.removidas_desde = self.db_now()
+                    self.seq_floor = seq
+                    self.applied.clear()
+                    self.ordered = self.keys = None
+                    self.version += 1
+                    self.loads += 1
+                    # Uma gravação durante o SELECT deixa a carga desatualizada: repete
+                    self.loaded = not self.stale
+        logging.info(f"Índice de sessões carregado: {len(self.entries)} sessões")
+
+    def refresh(self, ids, cursor=None):
+        """Relê as sessões `ids` depois de um commit (no cursor dado ou em uma conexão do pool)."""
+        ids = list(ids)
+        if not ids:
+            return
+        if not self.loaded:
+            self.stale = True
+            return
+        sql = SQL_SESSOES_LISTA + f"WHERE id IN ({', '.join(['%s'] * len(ids))})"
+        # Tomada antes do SELECT: sequência maior = leitura iniciada depois
+        seq = self._next_seq()
+        try:
+            if cursor is None:
+                with mysql_pool.connection() as conn, conn.cursor() as own_cursor:
+                    own_cursor.execute(sql, ids)
+                    rows = own_cursor.fetchall()
+            else:
+                cursor.execute(sql, ids)
+                rows = cursor.fetchall()
+        except pymysql.Error as e:
+            logging.warning(f"Índice de sessões descartado (erro ao atualizar {ids}): {e}")
+            self.loaded = False
+            self.stale = True
+            return
+        rows = {row['id']: row for row in rows}
+        with self.lock:
+            agora = self.db_now()
+            changed = False
+            for sessao_id in ids:
+                if seq < max(self.seq_floor, self.applied.get(sessao_id, 0)):
+                    continue  # uma releitura mais nova desta sessão já foi aplicada
+                self.applied[sessao_id] = seq
+                changed = True
+                row = rows.get(sessao_id)
+                if row is None:
+                    self._remove_locked(sessao_id, agora)
+                    continue
+                self.entries[sessao_id] = sessao_to_json(row)
+                self.alterado[sessao_id] = max(agora, row['data_modificacao'] or agora)
+                self.removidas.pop(sessao_id, None)
+            if changed:
+                self._changed_locked()
+            self.refreshes += 1
+
+    def _next_seq(self) -> int:
+        with self.lock:
+            self.seq += 1
+            return self.seq
+
+    def remove(self, sessao_id):
+        if not self.loaded:
+            self.stale = True
+            return
+        with self.lock:
+            # Também conta como releitura: uma anterior ao DELETE não ressuscita a sessão
+            self.seq += 1
+            self.applied[sessao_id] = self.seq
+            self._remove_locked(sessao_id, self.db_now())
+            self._changed_locked()
+
+    def _remove_locked(self, sessao_id, agora: datetime):
+        if self.entries.pop(sessao_id, None) is None:
+            return
+        self.alterado.pop(sessao_id, None)
+        self.removidas[sessao_id] = agora
+        while len(self.removidas) > SESSION_INDEX_TOMBSTONES:
+            _, quando = self.removidas.popitem(last=False)
+            self.removidas_desde = quando
+
+    def _changed_locked(self):
+        self.ordered = self.keys = None
+        self.version += 1
+
+    def etag(self, version: int) -> str:
+        return f'"sessoes-{self.boot}-{version}"'
+
+    def _ordered_locked(self) -> Tuple[List[Dict[str, Any]], List[Tuple[datetime, int]]]:
+        if self.ordered is None:
+            self.ordered = sorted(self.entries.values(), key=lambda e: (e['data_inicio'], e['id']), reverse=True)
+            self.keys = [(e['data_inicio'], e['id']) for e in reversed(self.ordered)]
+        return self.ordered, self.keys
+
+    def page(self, limit: Optional[int], after: Optional[Tuple[datetime, int]]):
+        """(sessões, próximo cursor ou None, total, versão) em ordem de data_inicio decrescente."""
+        with self.lock:
+            ordered, keys = self._ordered_locked()
+            start = 0
+            if after is not None:
+                # Primeira sessão estritamente "mais antiga" que o cursor
+                start = len(keys) - bisect.bisect_left(keys, after)
+            end = len(ordered) if limit is None else min(len(ordered), start + limit)
+            items = ordered[start:end]
+            next_cursor = None
+            if end < len(ordered) and items:
+                last = items[-1]
+                next_cursor = f"{last['data_inicio'].isoformat()}~{last['id']}"
+            return items, next_cursor, len(ordered), self.version
+
+    def delta(self, since: datetime) -> Tuple[Dict[str, Any], int]:
+        """
+        Sessões alteradas e removidas depois de `since`. Se as lápides não cobrem
+        o intervalo, devolve a lista inteira com completa=True (o cliente substitui a sua).
+        """
+        with self.lock:
+            ordered, _ = self._ordered_locked()
+            completa = self.removidas_desde is None or since < self.removidas_desde
+            sessoes = ordered if completa else [e for e in ordered if self.alterado.get(e['id'], since) > since]
+            removidas = [] if completa else [i for i, quando in self.removidas.items() if quando > since]
+            # Mudanças registram o instante dentro do lock: nada posterior a `ate` já foi incluído
+            return {"sessoes": sessoes, "removidas": removidas, "completa": completa,
+                    "ate": self.db_now()}, self.version
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "loaded": self.loaded,
+            "sessions": len(self.entries),
+            "version": self.version,
+            "tombstones": len(self.removidas),
+            "loads": self.loads,
+            "refreshes": self.refreshes
+        }
+
+session_index = SessionIndex()
+
+# O driver (PyMySQL) é bloqueante: o código que roda no event loop nunca o chama
+# diretamente, e sim por run_db, em um executor reservado ao banco. Assim um
+# salvamento grande não congela o envio de dados ao vivo para os clientes WS.
+db_executor = concurrent.futures.ThreadPoolExecutor(max_workers=DB_EXECUTOR_WORKERS, thread_name_prefix="mysql")
+
+async def run_db(fn, *args):
+    """Executa `fn(*args)` (bloqueante) no executor do banco e aguarda o resultado."""
+    return await asyncio.get_running_loop().run_in_executor(db_executor, fn, *args)
 
 async def save_session_to_mysql_db(session_data: Dict[str, Any]):
-    global mysql_connection, mysql_connected
+    return await run_db(save_session_to_mysql_db_blocking, session_data)
+
+def save_session_to_mysql_db_blocking(session_data: Dict[str, Any]) -> bool:
+    global mysql_connected
 
-    # Force fresh connection validation before saving
-    mysql_connection = connect_to_mysql()
-    if not mysql_connection or not mysql_connected:
-        logging.error("Não foi possível conectar ao MySQL. Sessão não salva.")
+    # Empresta uma conexão própria do pool (validada por ping se estava ociosa)
+    try:
+        conn = mysql_pool.acquire()
+    except pymysql.Error as e:
+        logging.error(f"Não foi possível conectar ao MySQL: {e}. Sessão não salva.")
         return False
 
+    broken = False
     try:
         # Validate required fields
         if 'id' not in session_data:
@@ -377,7 +1892,7 @@ async def save_session_to_mysql_db(session_data: Dict[str, Any]):
 
         logging.info(f"Salvando sessão '{session_data['nome']}' (ID: {session_data['id']}) no MySQL...")
 
-        with mysql_connection.cursor() as cursor:
+        with conn.cursor() as cursor:
             dados_tabela = session_data.get('dadosTabela', [])
 
             # Parse data_inicio - prioritize data_inicio field from localStorage, fallback to timestamp
@@ -456,33 +1971,6 @@ async def save_session_to_mysql_db(session_data: Dict[str, Any]):
                 except (ValueError, TypeError, KeyError) as e:
                     logging.warning(f"Erro ao calcular impulso: {e}")
 
-            sql_sessoes = """
-            INSERT INTO sessoes (id, nome, data_inicio, data_fim, data_modificacao, motor_name, motor_diameter,
-                                motor_length, motor_delay, motor_propweight, motor_totalweight, motor_manufacturer,
-                                motor_description, motor_observations, motor_temperatura, motor_umidade, motor_pressao,
-                                impulso_total, motor_class, class_color)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            ON DUPLICATE KEY UPDATE
-                nome = VALUES(nome),
-                data_inicio = VALUES(data_inicio),
-                data_fim = VALUES(data_fim),
-                data_modificacao = VALUES(data_modificacao),
-                motor_name = VALUES(motor_name),
-                motor_diameter = VALUES(motor_diameter),
-                motor_length = VALUES(motor_length),
-                motor_delay = VALUES(motor_delay),
-                motor_propweight = VALUES(motor_propweight),
-                motor_totalweight = VALUES(motor_totalweight),
-                motor_manufacturer = VALUES(motor_manufacturer),
-                motor_description = VALUES(motor_description),
-                motor_observations = VALUES(motor_observations),
-                motor_temperatura = VALUES(motor_temperatura),
-                motor_umidade = VALUES(motor_umidade),
-                motor_pressao = VALUES(motor_pressao),
-                impulso_total = VALUES(impulso_total),
-                motor_class = VALUES(motor_class),
-                class_color = VALUES(class_color)
-            """
             try:
                 motor_temperatura = metadados.get('temperatura') if metadados else None
                 motor_umidade = metadados.get('umidade') if metadados else None
@@ -501,7 +1989,7 @@ async def save_session_to_mysql_db(session_data: Dict[str, Any]):
                     data_modificacao = datetime.now()
                     logging.info(f"data_modificacao não fornecido, usando data atual: {data_modificacao}")
 
-                cursor.execute(sql_sessoes, (session_data['id'], session_data['nome'], data_inicio, data_fim, data_modificacao,
+                cursor.execute(SQL_UPSERT_SESSAO, (session_data['id'], session_data['nome'], data_inicio, data_fim, data_modificacao,
                                             motor_name, motor_diameter, motor_length, motor_delay,
                                             motor_propweight, motor_totalweight, motor_manufacturer,
                                             motor_description, motor_observations, motor_temperatura, motor_umidade, motor_pressao,
@@ -512,85 +2000,693 @@ async def save_session_to_mysql_db(session_data: Dict[str, Any]):
                 raise
 
             try:
-                cursor.execute("DELETE FROM leituras WHERE sessao_id = %s", (session_data['id'],))
+                delete_leituras(cursor, session_data['id'])
                 logging.info(f"Leituras antigas deletadas para sessão {session_data['id']}")
             except pymysql.Error as e:
                 logging.error(f"Erro ao deletar leituras antigas: {type(e).__name__}: {e}")
                 raise
 
+            leituras_to_insert = []
             if dados_tabela:
-                sql_leituras = "INSERT INTO leituras (sessao_id, tempo, forca, massaKg, timestamp) VALUES (%s, %s, %s, %s, %s)"
-                leituras_to_insert = []
                 for i, leitura in enumerate(dados_tabela):
-                    leitura_timestamp = None
-                    try:
-                        # Tenta primeiro com milissegundos
-                        leitura_timestamp = datetime.strptime(leitura['timestamp'], '%d/%m/%Y %H:%M:%S.%f')
-                    except (ValueError, KeyError) as e:
-                        try:
-                            # Se falhar, tenta sem milissegundos
-                            leitura_timestamp = datetime.strptime(leitura.get('timestamp', ''), '%d/%m/%Y %H:%M:%S')
-                        except (ValueError, KeyError) as e2:
-                            logging.warning(f"Erro ao converter timestamp da leitura {i}: {leitura.get('timestamp')}, usando None")
-                            leitura_timestamp = None
-
-                    try:
-                        # Safely convert to float, handling None values
-                        tempo_esp = float(leitura.get('tempo_esp') or 0)
-                        newtons = float(leitura.get('newtons') or 0)
-                        quilo_forca = float(leitura.get('quilo_forca') or 0)
-                        
-                        leituras_to_insert.append((
-                            session_data['id'],
-                            tempo_esp,
-                            newtons,
-                            quilo_forca,
-                            leitura_timestamp
-                        ))
-                    except (ValueError, TypeError, KeyError) as e:
-                        logging.warning(f"Erro ao processar leitura {i}: {type(e).__name__}: {e}, pulando...")
-                        continue
+                    row = parse_leitura(session_data['id'], leitura, i)
+                    if row:
+                        leituras_to_insert.append(row)
 
                 if leituras_to_insert:
                     try:
-                        cursor.executemany(sql_leituras, leituras_to_insert)
+                        if LEITURAS_STORAGE == 'blob':
+                            insert_leituras_blob(cursor, session_data['id'], (row[1:] for row in leituras_to_insert))
+                        else:
+                            cursor.executemany(SQL_INSERT_LEITURA, leituras_to_insert)
                         logging.info(f"Inseridas {len(leituras_to_insert)} leituras para sessão {session_data['id']}")
                     except pymysql.Error as e:
                         logging.error(f"Erro ao inserir leituras: {type(e).__name__}: {e}")
                         raise
 
-        mysql_connection.commit()
+                    store_session_pyramid(cursor, session_data['id'],
+                                          [row[1] for row in leituras_to_insert], [row[2] for row in leituras_to_insert])
+
+            metricas = atualizar_metricas_sessao(cursor, session_data['id'],
+                                                 [row[1] for row in leituras_to_insert], [row[2] for row in leituras_to_insert])
+            logging.info(f"Métricas de empuxo: pico={metricas['forca_pico']} N, queima={metricas['tempo_queima']} s, "
+                         f"designação={metricas['designacao']}")
+
+        conn.commit()
+        invalidate_session_caches(session_data['id'])
+        with conn.cursor() as cursor:
+            session_index.refresh([session_data['id']], cursor)
         logging.info(f"Sessão '{session_data['nome']}' (ID: {session_data['id']}) salva/atualizada no MySQL com sucesso!")
         return True
     except pymysql.Error as e:
         logging.error(f"Erro de MySQL ao salvar sessão: {type(e).__name__}: {e}")
-        mysql_connected = False
-        if mysql_connection:
-            try:
-                mysql_connection.rollback()
-            except:
-                pass
-            try:
-                mysql_connection.close()
-            except:
-                pass
-        mysql_connection = None
+        if is_connection_lost(e):
+            # Conexão perdida: descarta em vez de devolver ao pool
+            broken = True
+            mysql_connected = False
         return False
     except Exception as e:
         logging.error(f"Erro inesperado ao salvar sessão no MySQL: {type(e).__name__}: {e}", exc_info=True)
-        if mysql_connection:
+        return False
+    finally:
+        # Devolve ao pool; sem commit, a transação é desfeita
+        mysql_pool.release(conn, broken)
+
+def parse_iso_datetime(value) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        logging.warning(f"Data ISO inválida: {value}")
+        return None
+
+def save_session_stream_to_mysql_db(session_data: Dict[str, Any], leituras) -> int:
+    """
+    Variante em streaming de save_session_to_mysql_db_blocking. `leituras` é um iterável
+    (ex.: linhas NDJSON decodificadas sob demanda) com o mesmo formato de
+    dadosTabela; as leituras são inseridas em lotes de UPLOAD_BATCH_ROWS dentro
+    de uma única transação, então a memória não cresce com o tamanho da sessão
+    (com LEITURAS_STORAGE=blob as leituras são acumuladas em colunas compactas e
+    gravadas em um só blob).
+    Retorna o número de leituras inseridas. Levanta ValueError para metadados inválidos.
+    """
+    for field in ('id', 'nome', 'timestamp'):
+        if field not in session_data:
+            raise ValueError(f"session_data não contém o campo '{field}'")
+    sessao_id = session_data['id']
+    data_inicio = parse_iso_datetime(session_data.get('data_inicio')) or parse_iso_datetime(session_data.get('timestamp'))
+    if not data_inicio:
+        raise ValueError("session_data não contém data_inicio ou timestamp válidos")
+    data_fim = parse_iso_datetime(session_data.get('data_fim'))
+    data_modificacao = parse_iso_datetime(session_data.get('data_modificacao')) or datetime.now()
+    m = session_data.get('metadadosMotor') or {}
+
+    logging.info(f"Salvando sessão '{session_data['nome']}' (ID: {sessao_id}) no MySQL via streaming...")
+    with mysql_pool.connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(SQL_UPSERT_SESSAO, (sessao_id, session_data['nome'], data_inicio, data_fim or data_inicio, data_modificacao,
+                                               m.get('name'), m.get('diameter'), m.get('length'), m.get('delay'),
+                                               m.get('propweight'), m.get('totalweight'), m.get('manufacturer'),
+                                               m.get('description'), m.get('observations'),
+                                               m.get('temperatura'), m.get('umidade'), m.get('pressao'),
+                                               0, 'N/A', '#95a5a6'))
+            delete_leituras(cursor, sessao_id)
+
+            use_blob = LEITURAS_STORAGE == 'blob'
+            tempos, forcas = array.array('d'), array.array('d')  # para a pirâmide
+            # Com blob, massas e timestamps completam as colunas; nenhuma tupla por leitura fica em memória
+            massas, timestamps_ms = array.array('d'), array.array('q')
+            batch = []
+            total = 0
+            impulso_total = 0.0
+            pontos = 0
+            anterior = None
+            ultimo_timestamp = None
+            for i, leitura in enumerate(leituras):
+                if not isinstance(leitura, dict):
+                    logging.warning(f"Leitura {i} não é um objeto JSON, pulando...")
+                    continue
+                row = parse_leitura(sessao_id, leitura, i)
+                if row is None:
+                    continue
+                # Integração incremental, equivalente a calcular_impulso_total
+                if leitura.get('tempo_esp') is not None and leitura.get('newtons') is not None:
+                    pontos += 1
+                    if anterior is not None:
+                        area_trap = (row[1] - anterior[0]) * (anterior[1] + row[2]) / 2
+                        if area_trap > 0:
+                            impulso_total += area_trap
+                    anterior = (row[1], row[2])
+                if row[4] is not None:
+                    ultimo_timestamp = row[4]
+                tempos.append(row[1])
+                forcas.append(row[2])
+                if use_blob:
+                    massas.append(row[3])
+                    timestamps_ms.append(timestamp_ms_blob(row[4]))
+                    continue
+                batch.append(row)
+                if len(batch) >= UPLOAD_BATCH_ROWS:
+                    cursor.executemany(SQL_INSERT_LEITURA, batch)
+                    total += len(batch)
+                    batch = []
+            if use_blob:
+                if tempos:
+                    total += insert_leituras_blob_columns(cursor, sessao_id, tempos, forcas, massas, timestamps_ms)
+            elif batch:
+                cursor.executemany(SQL_INSERT_LEITURA, batch)
+                total += len(batch)
+            store_session_pyramid(cursor, sessao_id, tempos, forcas)
+
+            if pontos:
+                classificacao = classificar_motor(impulso_total)
+            else:
+                classificacao = {"classe": 'N/A', "cor": '#95a5a6'}
+            cursor.execute("""
+                UPDATE sessoes SET data_fim = %s, impulso_total = %s, motor_class = %s, class_color = %s
+                WHERE id = %s
+            """, (data_fim or ultimo_timestamp or data_inicio, impulso_total,
+                  classificacao['classe'], classificacao['cor'], sessao_id))
+            atualizar_metricas_sessao(cursor, sessao_id, tempos, forcas)
+        conn.commit()
+        invalidate_session_caches(sessao_id)
+        with conn.cursor() as cursor:
+            session_index.refresh([sessao_id], cursor)
+        logging.info(f"Sessão '{session_data['nome']}' (ID: {sessao_id}) salva via streaming: {total} leituras, "
+                     f"Impulso={impulso_total:.2f} Ns, Classe={classificacao['classe']}")
+        return total
+
+def iter_ndjson(chunks):
+    """Decodifica NDJSON incrementalmente a partir de blocos de bytes."""
+    pending = bytearray()
+    for chunk in chunks:
+        pending.extend(chunk)
+        start = 0
+        while True:
+            end = pending.find(b'\n', start)
+            if end == -1:
+                break
+            line = pending[start:end].strip()
+            start = end + 1
+            if line:
+                yield json.loads(line)
+        del pending[:start]
+    if pending.strip():
+        yield json.loads(pending)
+
+# ================== Server-side Recording ==================
+class SessionRecorder:
+    """
+    Grava uma sessão direto do stream serial, sem passar pelo navegador.
+    A thread serial anexa amostras em buffers colunares (array); uma thread
+    própria grava os lotes pendentes em `leituras` a cada RECORDING_FLUSH_INTERVAL
+    segundos ou RECORDING_FLUSH_ROWS amostras. O impulso é integrado de forma
+    incremental, então nada além do lote pendente fica em memória. Erros
+    transitórios de MySQL reconectam e repetem a etapa sem perder o lote.
+    `duracao` (s) nos metadados encerra a gravação sozinha, mesmo que a aba
+    que a iniciou tenha sido fechada.
+    """
+
+    def __init__(self, session_meta: Dict[str, Any]):
+        self.session_id = int(session_meta.get('id') or time.time() * 1000)
+        self.nome = session_meta.get('nome') or f"Sessão {datetime.now():%d/%m/%Y %H:%M:%S}"
+        self.metadados = session_meta.get('metadadosMotor') or {}
+        self.data_inicio = datetime.now()
+        duracao = float(session_meta.get('duracao') or 0)
+        self.deadline = time.monotonic() + duracao if duracao > 0 else None
+        self.lock = threading.Lock()
+        self.tempos = array.array('d')
+        self.forcas = array.array('d')
+        self.t0 = None
+        self.last = None
+        self.impulso_total = 0.0
+        self.samples = 0
+        self.flushed = 0
+        self.error = None
+        self.conn = None
+        self.stop_event = threading.Event()
+        self.flush_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self, session_meta: Optional[Dict[str, Any]] = None):
+        """Encerra a gravação; metadados enviados no stop substituem os do start."""
+        if session_meta:
+            self.nome = session_meta.get('nome') or self.nome
+            self.metadados = session_meta.get('metadadosMotor') or self.metadados
+        self.stop_event.set()
+        self.flush_event.set()
+
+    def append(self, samples: List[Dict[str, Any]]):
+        """Chamado pela thread serial para cada lote de amostras DATA decodificadas."""
+        with self.lock:
+            for sample in samples:
+                forca = sample.get("forca")
+                if forca is None or not math.isfinite(forca):
+                    continue
+                if self.t0 is None:
+                    self.t0 = sample["tempo"]
+                tempo = sample["tempo"] - self.t0
+                if self.last is not None:
+                    area_trap = (tempo - self.last[0]) * (self.last[1] + forca) / 2
+                    if area_trap > 0:
+                        self.impulso_total += area_trap
+                self.last = (tempo, forca)
+                self.tempos.append(tempo)
+                self.forcas.append(forca)
+                self.samples += 1
+            if len(self.tempos) >= RECORDING_FLUSH_ROWS:
+                self.flush_event.set()
+
+    def _take_pending(self):
+        with self.lock:
+            pending = (self.tempos, self.forcas)
+            self.tempos, self.forcas = array.array('d'), array.array('d')
+        return pending
+
+    def _restore_pending(self, tempos, forcas):
+        """Devolve um lote que não foi gravado à frente das amostras chegadas nesse meio tempo."""
+        with self.lock:
+            self.tempos = tempos + self.tempos
+            self.forcas = forcas + self.forcas
+
+    def _flush(self, conn):
+        tempos, forcas = self._take_pending()
+        if not tempos:
+            return
+        # Timestamp de cada amostra pelo relógio do ESP (tempo já relativo a t0)
+        rows = [
+            (self.session_id, t, f, f / 9.80665, self.data_inicio + timedelta(seconds=t))
+            for t, f in zip(tempos, forcas)
+        ]
+        try:
+            with conn.cursor() as cursor:
+                cursor.executemany(SQL_INSERT_LEITURA, rows)
+            conn.commit()
+        except BaseException:
+            self._restore_pending(tempos, forcas)
+            raise
+        invalidate_session_caches(self.session_id)
+        self.flushed += len(rows)
+
+    def _with_retry(self, step):
+        """
+        Executa step(conn); em erro transitório de MySQL (conexão perdida, deadlock,
+        lock wait timeout) reconecta e repete até RECORDING_MYSQL_RETRIES vezes.
+        """
+        attempt = 0
+        while True:
+            try:
+                if self.conn is None:
+                    self.conn = new_mysql_connection()
+                return step(self.conn)
+            except (pymysql.err.OperationalError, pymysql.err.InterfaceError) as e:
+                attempt += 1
+                if attempt > RECORDING_MYSQL_RETRIES:
+                    raise
+                logging.warning(f"Gravação {self.session_id}: erro de MySQL ({e}), reconectando "
+                                f"(tentativa {attempt}/{RECORDING_MYSQL_RETRIES})")
+                self._close_conn()
+                time.sleep(min(2.0 ** (attempt - 1), 5.0))
+
+    def _close_conn(self):
+        if self.conn is not None:
             try:
-                mysql_connection.rollback()
-            except:
+                self.conn.close()
+            except pymysql.Error:
                 pass
-        return False
+            self.conn = None
+
+    def _insert_session(self, conn):
+        m = self.metadados
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                INSERT INTO sessoes (id, nome, data_inicio, data_modificacao, motor_name, motor_diameter,
+                                     motor_length, motor_delay, motor_propweight, motor_totalweight,
+                                     motor_manufacturer, motor_description, motor_observations,
+                                     motor_temperatura, motor_umidade, motor_pressao)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """, (self.session_id, self.nome, self.data_inicio, self.data_inicio,
+                  m.get('name'), m.get('diameter'), m.get('length'), m.get('delay'),
+                  m.get('propweight'), m.get('totalweight'), m.get('manufacturer'),
+                  m.get('description'), m.get('observations'),
+                  m.get('temperatura'), m.get('umidade'), m.get('pressao')))
+        conn.commit()
+        with conn.cursor() as cursor:
+            session_index.refresh([self.session_id], cursor)
+
+    def _finalize_session(self, conn):
+        m = self.metadados
+        classificacao = classificar_motor(self.impulso_total) if self.samples >= 2 else {"classe": 'N/A', "cor": '#95a5a6'}
+        data_fim = datetime.now()
+        with conn.cursor() as cursor:
+            if LEITURAS_STORAGE == 'blob':
+                # Durante a gravação as leituras vão em lotes para `leituras`; compacta ao final
+                pack_session_leituras(cursor, self.session_id)
+            rebuild_session_pyramid(cursor, self.session_id)
+            cursor.execute("""
+                UPDATE sessoes
+                SET nome = %s, data_fim = %s, data_modificacao = %s,
+                    motor_name = %s, motor_diameter = %s, motor_length = %s, motor_delay = %s,
+                    motor_propweight = %s, motor_totalweight = %s, motor_manufacturer = %s,
+                    motor_description = %s, motor_observations = %s,
+                    motor_temperatura = %s, motor_umidade = %s, motor_pressao = %s,
+                    impulso_total = %s, motor_class = %s, class_color = %s
+                WHERE id = %s
+            """, (self.nome, data_fim, data_fim,
+                  m.get('name'), m.get('diameter'), m.get('length'), m.get('delay'),
+                  m.get('propweight'), m.get('totalweight'), m.get('manufacturer'),
+                  m.get('description'), m.get('observations'),
+                  m.get('temperatura'), m.get('umidade'), m.get('pressao'),
+                  self.impulso_total, classificacao['classe'], classificacao['cor'], self.session_id))
+            atualizar_metricas_sessao(cursor, self.session_id)
+        conn.commit()
+        invalidate_session_caches(self.session_id)
+        with conn.cursor() as cursor:
+            session_index.refresh([self.session_id], cursor)
+        return classificacao
+
+    def _run(self):
+        global session_recorder
+        try:
+            self._with_retry(self._insert_session)
+            logging.info(f"Gravação no servidor iniciada: '{self.nome}' (ID: {self.session_id})")
+            while not self.stop_event.is_set():
+                self.flush_event.wait(RECORDING_FLUSH_INTERVAL)
+                self.flush_event.clear()
+                self._with_retry(self._flush)
+                if self.deadline is not None and time.monotonic() >= self.deadline:
+                    self.stop_event.set()
+            self._with_retry(self._flush)
+            classificacao = self._with_retry(self._finalize_session)
+            logging.info(f"Gravação '{self.nome}' (ID: {self.session_id}) encerrada: {self.flushed} leituras, "
+                         f"Impulso={self.impulso_total:.2f} Ns, Classe={classificacao['classe']}")
+            serial_queue.put({
+                "type": "recording_stopped",
+                "sessionId": self.session_id,
+                "message": self.nome,
+                "samples": self.flushed,
+                "impulsoTotal": self.impulso_total,
+                "motorClass": classificacao['classe']
+            })
+        except Exception as e:
+            self.error = str(e) or type(e).__name__
+            if isinstance(e, pymysql.Error):
+                logging.error(f"Erro de MySQL na gravação da sessão {self.session_id}: {type(e).__name__}: {e}")
+            else:
+                logging.error(f"Erro na gravação da sessão {self.session_id}: {e}", exc_info=True)
+            if len(self.tempos):
+                logging.error(f"Gravação {self.session_id}: {len(self.tempos)} leituras não gravadas foram perdidas")
+            if self.conn:
+                try:
+                    self.conn.rollback()
+                except pymysql.Error:
+                    pass
+            serial_queue.put({"type": "recording_error", "sessionId": self.session_id, "message": self.error})
+        finally:
+            if session_recorder is self:
+                session_recorder = None
+            self._close_conn()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sessionId": self.session_id,
+            "nome": self.nome,
+            "samples": self.samples,
+            "flushed": self.flushed,
+            "impulsoTotal": self.impulso_total,
+            "error": self.error
+        }
+
+def start_session_recording(session_meta: Dict[str, Any]) -> Optional[SessionRecorder]:
+    global session_recorder
+    if session_recorder is not None:
+        return None
+    recorder = SessionRecorder(session_meta)
+    session_recorder = recorder
+    recorder.start()
+    return recorder
+
+def stop_session_recording(session_meta: Optional[Dict[str, Any]] = None) -> Optional[SessionRecorder]:
+    recorder = session_recorder
+    if recorder is not None:
+        recorder.stop(session_meta)
+    return recorder
 
 # ================== HTTP Server & API ==================
+# Arquivos estáticos: cada arquivo é lido e comprimido uma única vez por versão
+# (caminho + mtime + tamanho) e por codificação; o resultado fica em um LRU
+# limitado a STATIC_CACHE_BYTES. Um os.stat por requisição (mais um por irmão
+# .br/.gz nos tipos comprimíveis) detecta arquivos alterados em /app/data. ETags fortes por representação permitem 304.
+# Arquivos a partir de STATIC_SENDFILE_MIN (e irmãos pré-comprimidos .br/.gz
+# gerados no build) não passam pela memória: vão do disco para o socket com
+# sendfile, inclusive em requisições Range.
+
+STATIC_COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+STATIC_HASHED_NAME = re.compile(r'[.-][0-9a-f]{8,}\.[A-Za-z0-9]+$')  # ex.: app.3f2a9c1d.js
+STATIC_ENCODING_SUFFIX = {'identity': '', 'gzip': '-gz', 'br': '-br'}
+
+STATIC_PRECOMPRESSED = (('br', '.br'), ('gzip', '.gz'))
+
+def precompressed_stats(path: str) -> tuple:
+    """(mtime_ns, tamanho) de cada irmão de STATIC_PRECOMPRESSED, ou None se não existir."""
+    stats = []
+    for _, ext in STATIC_PRECOMPRESSED:
+        try:
+            sibling = os.stat(path + ext)
+            stats.append((sibling.st_mtime_ns, sibling.st_size))
+        except OSError:
+            stats.append(None)
+    return tuple(stats)
+
+class StaticAsset:
+    """Uma versão de um arquivo estático e suas variantes comprimidas."""
+
+    def __init__(self, path: str, st: os.stat_result, ctype: str, digest: str, content: Optional[bytes]):
+        self.path = path
+        self.size = st.st_size
+        self.version = (st.st_mtime_ns, st.st_size)
+        self.ctype = ctype
+        self.last_modified = email.utils.formatdate(st.st_mtime, usegmt=True)
+        self.digest = digest
+        self.variants: Dict[str, bytes] = {}  # em memória
+        self.files: Dict[str, Tuple[str, int]] = {}  # no disco (servidas com sendfile): caminho, tamanho
+        if content is not None:
+            self.variants['identity'] = content
+        else:
+            self.files['identity'] = (path, st.st_size)
+        self.compressible = st.st_size > 0 and ctype.startswith(STATIC_COMPRESSIBLE_TYPES)
+        self.immutable = bool(STATIC_HASHED_NAME.search(os.path.basename(path)))
+        # Os irmãos .gz/.br fazem parte da versão: regenerados, mudam de tamanho
+        self.siblings = precompressed_stats(path) if self.compressible else None
+        if self.compressible:
+            for (encoding, ext), sibling in zip(STATIC_PRECOMPRESSED, self.siblings):
+                if sibling is None:
+                    continue
+                if sibling[0] >= st.st_mtime_ns:  # .gz/.br mais velho que o original seria conteúdo antigo
+                    self.files[encoding] = (path + ext, sibling[1])
+
+    def is_current(self, st: os.stat_result) -> bool:
+        """Se o arquivo e seus irmãos pré-comprimidos ainda são os desta versão."""
+        if self.version != (st.st_mtime_ns, st.st_size):
+            return False
+        return self.siblings is None or self.siblings == precompressed_stats(self.path)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(len(v) for v in self.variants.values())
+
+    def etag(self, encoding: str) -> str:
+        return f'"{self.digest}{STATIC_ENCODING_SUFFIX[encoding]}"'
+
+    def encodings(self) -> List[str]:
+        """Codificações oferecidas, na ordem de preferência."""
+        if not self.compressible:
+            return ['identity']
+        return (['br'] if brotli is not None or 'br' in self.files else []) + ['gzip', 'identity']
+
+    def compress(self, encoding: str) -> bytes:
+        content = self.variants.get('identity')
+        if content is None:
+            with open(self.path, 'rb') as f:
+                content = f.read()
+        if encoding == 'br':
+            return brotli.compress(content, quality=11)
+        # mtime=0: a mesma entrada gera sempre os mesmos bytes (ETag estável)
+        return gzip.compress(content, compresslevel=9, mtime=0)
+
+def negotiate_encoding(accept_encoding: str, offered: List[str]) -> str:
+    """Primeira codificação de `offered` aceita pelo cliente (q=0 recusa)."""
+    accepted = {}
+    for item in accept_encoding.split(','):
+        name, _, params = item.strip().partition(';')
+        q = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if name:
+            accepted[name.lower()] = q
+    for encoding in offered:
+        if encoding == 'identity' or accepted.get(encoding, accepted.get('*', 0.0)) > 0:
+            return encoding
+    return 'identity'
+
+def gzip_stream(chunks: Iterator[bytes], level: int = 6) -> Iterator[bytes]:
+    """Comprime `chunks` em gzip à medida que são gerados; fecha `chunks` ao terminar."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31: cabeçalho e trailer gzip
+    try:
+        for data in chunks:
+            out = compressor.compress(data)
+            if out:
+                yield out
+        yield compressor.flush()
+    finally:
+        chunks.close()
+
+def http_chunk(data: bytes) -> bytes:
+    """Um pedaço de Transfer-Encoding: chunked."""
+    return b"%x\r\n%s\r\n" % (len(data), data)
+
+def parse_byte_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    (início, fim inclusivo) de um cabeçalho `Range: bytes=...` com um único
+    intervalo; None se o cabeçalho deve ser ignorado (outra unidade, vários
+    intervalos, sintaxe inválida). ValueError se o intervalo é insatisfazível.
+    """
+    unit, _, spec = header.partition('=')
+    if unit.strip().lower() != 'bytes' or ',' in spec:
+        return None
+    first, sep, last = (part.strip() for part in spec.partition('-'))
+    if not sep or not (first or last) or not (first.isdigit() or first == '') or not (last.isdigit() or last == ''):
+        return None
+    if first == '':
+        suffix = int(last)  # bytes=-N: os últimos N bytes
+        if suffix == 0 or size == 0:
+            raise ValueError("Range vazio")
+        return max(0, size - suffix), size - 1
+    start, end = int(first), int(last) if last else size - 1
+    if last and end < start:
+        return None
+    if start >= size:
+        raise ValueError("Range após o fim do arquivo")
+    return start, min(end, size - 1)
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == '*':
+        return True
+    return any(tag.strip().removeprefix('W/') == etag for tag in if_none_match.split(','))
+
+class StaticAssetCache:
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.assets: "collections.OrderedDict[str, StaticAsset]" = collections.OrderedDict()
+        self.lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.loads = 0
+        self.compressions = 0
+        self.evictions = 0
+        self.sendfile_responses = 0
+        self.sendfile_bytes = 0
+        self.ranges = 0
+
+    def get(self, path: str) -> StaticAsset:
+        """Versão atual do arquivo (OSError se não existir ou não for arquivo)."""
+        st = os.stat(path)
+        if not os.path.isfile(path):
+            raise IsADirectoryError(path)
+        with self.lock:
+            asset = self.assets.get(path)
+        if asset is not None and asset.is_current(st):  # os.stat fora do lock
+            with self.lock:
+                if self.assets.get(path) is asset:
+                    self.assets.move_to_end(path)
+                self.hits += 1
+            return asset
+        with open(path, 'rb') as f:
+            st = os.fstat(f.fileno())
+            if st.st_size >= STATIC_SENDFILE_MIN:
+                # Grande: só o hash para a ETag; o conteúdo fica no disco
+                content = None
+                h = hashlib.blake2b(digest_size=10)
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    h.update(block)
+            else:
+                content = f.read()
+                h = hashlib.blake2b(content, digest_size=10)
+        ctype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        if os.path.basename(path) == 'apexcharts' or ctype == 'text/javascript':
+            ctype = 'application/javascript'
+        asset = StaticAsset(path, st, ctype, h.hexdigest(), content)
+        with self.lock:
+            self.loads += 1
+            self._replace_locked(path, asset)
+        logging.info(f"Arquivo estático carregado no cache: {path}")
+        return asset
+
+    def body(self, asset: StaticAsset, encoding: str):
+        """bytes em memória, ou (caminho, tamanho) para enviar do disco com sendfile."""
+        if encoding in asset.files:
+            return asset.files[encoding]
+        return self.variant(asset, encoding)
+
+    def count_response(self, nbytes: int, sendfile: bool, ranged: bool):
+        with self.lock:
+            if sendfile:
+                self.sendfile_responses += 1
+                self.sendfile_bytes += nbytes
+            if ranged:
+                self.ranges += 1
+
+    def variant(self, asset: StaticAsset, encoding: str) -> bytes:
+        body = asset.variants.get(encoding)
+        if body is not None:
+            return body
+        t0 = time.perf_counter()
+        body = asset.compress(encoding)
+        with self.lock:
+            self.compressions += 1
+            if encoding not in asset.variants:
+                asset.variants[encoding] = body
+                if self.assets.get(asset.path) is asset:
+                    self.bytes += len(body)
+                    self._evict_locked()
+        logging.info(f"Estático comprimido uma vez ({encoding}): {asset.path} {asset.size} -> {len(body)} bytes "
+                     f"em {(time.perf_counter() - t0) * 1000:.0f} ms")
+        return body
+
+    def _replace_locked(self, path: str, asset: StaticAsset):
+        old = self.assets.pop(path, None)
+        if old is not None:
+            self.bytes -= old.nbytes
+        self.assets[path] = asset
+        self.bytes += asset.nbytes
+        self._evict_locked()
+
+    def _evict_locked(self):
+        # Nunca remove o mais recente: um arquivo maior que o teto ainda é servido
+        while self.bytes > self.max_bytes and len(self.assets) > 1:
+            _, old = self.assets.popitem(last=False)
+            self.bytes -= old.nbytes
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "files": len(self.assets),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "loads": self.loads,
+                "compressions": self.compressions,
+                "evictions": self.evictions,
+                "sendfile_responses": self.sendfile_responses,
+                "sendfile_bytes": self.sendfile_bytes,
+                "ranges": self.ranges,
+                "brotli": brotli is not None
+            }
+
+static_assets = StaticAssetCache(STATIC_CACHE_BYTES)
+
 class APIRequestHandler(http.server.SimpleHTTPRequestHandler):
-    file_cache = {}  # Class-level cache for static files
 
     def __init__(self, *args, **kwargs):
-        super().__init__(*args, directory='/app/data', **kwargs)
+        super().__init__(*args, directory=STATIC_DIR, **kwargs)
+
+    def route_path(self) -> str:
+        """Caminho da requisição sem a query string."""
+        return urlsplit(self.path).path
+
+    def query_param(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        values = parse_qs(urlsplit(self.path).query).get(name)
+        return values[0] if values else default
 
     def translate_path(self, path):
         """Sobrescreve translate_path para carregar minimal.html como padrão em vez de index.html"""
@@ -601,84 +2697,27 @@ class APIRequestHandler(http.server.SimpleHTTPRequestHandler):
     def do_GET(self):
         start = time.perf_counter()
         try:
-            if self.path.startswith('/api/'):
-                if self.path == '/api/sessoes':
+            route = self.route_path()
+            if route.startswith('/api/'):
+                if route == '/api/sessoes':
                     self.handle_get_sessoes()
-                elif self.path.startswith('/api/sessoes/') and self.path.endswith('/leituras'):
+                elif route.startswith('/api/sessoes/') and route.endswith('/leituras'):
                     self.handle_get_leituras()
-                elif self.path.startswith('/api/sessoes/'):
+                elif route.startswith('/api/sessoes/') and route.endswith('/tiles'):
+                    self.handle_get_tiles()
+                elif route.startswith('/api/sessoes/'):
                     self.handle_get_sessao_by_id()
-                elif self.path == '/api/time':
+                elif route == '/api/time':
                     self.handle_get_time()
-                elif self.path == '/api/info':
+                elif route == '/api/info':
                     self.handle_get_info()
+                elif route == '/api/metrics':
+                    self.handle_get_metrics()
                 else:
                     self.send_error(404, "API endpoint not found")
                 return
 
-            # Handle static files with caching
-            path = self.translate_path(self.path)
-            
-            # Check cache first
-            cached_item = self.file_cache.get(path)
-            if cached_item:
-                if self.headers.get('If-Modified-Since') == cached_item['last_modified']:
-                    self.send_response(304)
-                    self.end_headers()
-                    return
-                
-                content = cached_item['content']
-                ctype = cached_item['type']
-                last_modified = cached_item['last_modified']
-                logging.debug(f"Serving static file from cache: {path}")
-            else:
-                # File not in cache, read from disk
-                try:
-                    with open(path, 'rb') as f:
-                        fs = os.fstat(f.fileno())
-                        content = f.read()
-                        ctype = self.guess_type(path)
-                        if os.path.basename(path) == 'apexcharts':
-                            ctype = 'application/javascript'
-                        last_modified = self.date_time_string(fs.st_mtime)
-                        
-                        # Store in cache
-                        self.file_cache[path] = {
-                            'content': content,
-                            'type': ctype,
-                            'last_modified': last_modified
-                        }
-                        logging.info(f"Caching new static file: {path}")
-
-                except FileNotFoundError:
-                    self.send_error(404, "File not found")
-                    return
-            
-            # Compress and send response
-            accept_encoding = self.headers.get('Accept-Encoding', '')
-            compressible_types = ('text/html', 'text/css', 'application/javascript', 'application/json')
-
-            if any(t in ctype for t in compressible_types) and 'gzip' in accept_encoding:
-                buf = io.BytesIO()
-                with gzip.GzipFile(fileobj=buf, mode='wb') as f_gzip:
-                    f_gzip.write(content)
-                compressed_content = buf.getvalue()
-                
-                self.send_response(200)
-                self.send_header("Content-type", ctype)
-                self.send_header("Content-Encoding", "gzip")
-                self.send_header("Content-Length", str(len(compressed_content)))
-                self.send_header("Last-Modified", last_modified)
-                self.send_header("Vary", "Accept-Encoding")
-                self.end_headers()
-                self.wfile.write(compressed_content)
-            else:
-                self.send_response(200)
-                self.send_header("Content-type", ctype)
-                self.send_header("Content-Length", str(len(content)))
-                self.send_header("Last-Modified", last_modified)
-                self.end_headers()
-                self.wfile.write(content)
+            self.send_static(self.translate_path(self.path))
 
         except (ConnectionResetError, BrokenPipeError, ConnectionAbortedError) as e:
             logging.debug(f"Cliente desconectou durante requisição GET {self.path}: {type(e).__name__}")
@@ -734,66 +2773,138 @@ class APIRequestHandler(http.server.SimpleHTTPRequestHandler):
         super().log_error(format, *args)
 
     def handle_get_sessoes(self):
+        """
+        Lista de sessões a partir do índice em memória. ?limit=&cursor= pagina por
+        data_inicio decrescente (próxima página em X-Next-Cursor); ?since= devolve só
+        o que mudou desde o `ate` de uma resposta anterior.
+        """
+        try:
+            limit = self.query_param('limit')
+            limit = int(limit) if limit is not None else None
+            if limit is not None and limit < 1:
+                raise ValueError
+            cursor = self.query_param('cursor')
+            after = parse_session_cursor(cursor) if cursor else None
+            since = self.query_param('since')
+            since = parse_since(since) if since else None
+        except ValueError:
+            self.send_error(400, "Invalid limit, cursor or since")
+            return
+
         if not mysql_connected:
             self.send_error(503, "MySQL Service Unavailable")
             return
         try:
-            with mysql_connection.cursor() as cursor:
-                cursor.execute("""
-                    SELECT id, nome, data_inicio, data_fim, data_modificacao,
-                           motor_name, motor_diameter, motor_length, motor_delay,
-                           motor_propweight, motor_totalweight, motor_manufacturer,
-                           motor_description, motor_observations, motor_temperatura, motor_umidade, motor_pressao,
-                           impulso_total, motor_class, class_color
-                    FROM sessoes ORDER BY data_inicio DESC
-                """)
-                sessoes = cursor.fetchall()
-
-                for sessao in sessoes:
-                    # Use pre-calculated values from database
-                    sessao['impulsoTotal'] = sessao.get('impulso_total', 0) or 0
-                    sessao['motorClass'] = sessao.get('motor_class', 'N/A') or 'N/A'
-                    sessao['classColor'] = sessao.get('class_color', '#95a5a6') or '#95a5a6'
-
-                    # Transform motor fields into metadadosMotor object
-                    sessao['metadadosMotor'] = {
-                        'name': sessao.get('motor_name', None),
-                        'diameter': sessao.get('motor_diameter', None),
-                        'length': sessao.get('motor_length', None),
-                        'delay': sessao.get('motor_delay', None),
-                        'propweight': sessao.get('motor_propweight', None),
-                        'totalweight': sessao.get('motor_totalweight', None),
-                        'manufacturer': sessao.get('motor_manufacturer', None),
-                        'description': sessao.get('motor_description', None),
-                        'observations': sessao.get('motor_observations', None),
-                        'temperatura': sessao.get('motor_temperatura', None),
-                        'umidade': sessao.get('motor_umidade', None),
-                        'pressao': sessao.get('motor_pressao', None)
-                    }
-                self.send_json_response(200, sessoes)
+            session_index.ensure_loaded()
         except pymysql.Error as e:
             logging.error(f"API Error (get_sessoes): {e}")
             self.send_error(500, "Internal Server Error")
+            return
+
+        if since is not None:
+            body, version = session_index.delta(since)
+            headers = {}
+        else:
+            body, next_cursor, total, version = session_index.page(limit, after)
+            headers = {'X-Total-Count': str(total)}
+            if next_cursor:
+                headers['X-Next-Cursor'] = next_cursor
+        etag = session_index.etag(version)
+        headers.update({'ETag': etag, 'Cache-Control': 'no-cache'})
+
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None and etag_matches(if_none_match, etag):
+            self.send_response(304)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            return
+        self.send_json_response(200, body, headers=headers)
 
     def handle_get_leituras(self):
         try:
-            sessao_id = int(self.path.split('/')[-2])
+            sessao_id = int(self.route_path().split('/')[-2])
         except (ValueError, IndexError):
             self.send_error(400, "Invalid Session ID")
             return
         
+        try:
+            points = self.query_param('points')
+            points = int(points) if points is not None else None
+            t_from = self.query_param('from')
+            t_from = float(t_from) if t_from is not None else None
+            t_to = self.query_param('to')
+            t_to = float(t_to) if t_to is not None else None
+            mode = self.query_param('mode', 'minmax')
+            if mode not in DECIMATORS or (points is not None and not 2 <= points <= SERIES_MAX_POINTS):
+                raise ValueError
+        except ValueError:
+            self.send_error(400, "Invalid decimation parameters")
+            return
+
         if not mysql_connected:
             self.send_error(503, "MySQL Service Unavailable")
             return
         try:
-            with mysql_connection.cursor() as cursor:
-                cursor.execute("SELECT tempo, forca, ema, massaKg, timestamp FROM leituras WHERE sessao_id = %s ORDER BY tempo ASC", (sessao_id,))
-                leituras = cursor.fetchall()
-                self.send_json_response(200, leituras)
-        except pymysql.Error as e:
+            headers = {}
+            if points is not None or t_from is not None or t_to is not None:
+                leituras, total = series_cache.decimated(sessao_id, mode, points or SERIES_MAX_POINTS,
+                                                         t_from, t_to, load_leituras)
+                headers['X-Leituras-Total'] = str(total)
+            else:
+                chunks = None
+                if LEITURAS_STREAM_ROWS > 0 and not self.wants_leituras_f32():
+                    chunks = stream_leituras_json(sessao_id, LEITURAS_STREAM_ROWS)
+                if chunks is not None:
+                    self.send_json_stream(200, chunks, headers)
+                    return
+                # f32, streaming desligado ou todas as vagas de stream ocupadas
+                with mysql_pool.connection() as conn, conn.cursor() as cursor:
+                    leituras = fetch_leituras(cursor, sessao_id)
+            # Conexão já devolvida ao pool antes de enviar a resposta
+            if self.wants_leituras_f32():
+                self.send_bytes_response(200, encode_leituras_f32(leituras), 'application/octet-stream', headers)
+            else:
+                self.send_json_response(200, leituras, headers)
+        except (pymysql.Error, ValueError, zlib.error) as e:
             logging.error(f"API Error (get_leituras): {e}")
             self.send_error(500, "Internal Server Error")
 
+    def handle_get_tiles(self):
+        """
+        GET /api/sessoes/{id}/tiles               -> metadados da pirâmide (níveis e início de cada tile)
+        GET /api/sessoes/{id}/tiles?level=L&start=K -> tile K do nível L (tempo, min, max, mean)
+        """
+        try:
+            sessao_id = int(self.route_path().split('/')[-2])
+            level = self.query_param('level')
+            level = int(level) if level is not None else None
+            start = int(self.query_param('start', '0'))
+            if start < 0 or (level is not None and level < 0):
+                raise ValueError
+        except (ValueError, IndexError):
+            self.send_error(400, "Invalid tile request")
+            return
+
+        if not mysql_connected:
+            self.send_error(503, "MySQL Service Unavailable")
+            return
+        try:
+            pyramid = pyramid_cache.get(sessao_id)
+        except (pymysql.Error, ValueError, zlib.error) as e:
+            logging.error(f"API Error (get_tiles): {e}")
+            self.send_error(500, "Internal Server Error")
+            return
+        if pyramid is None:
+            self.send_error(404, "Session Not Found")
+            return
+        if level is None:
+            self.send_json_response(200, pyramid.describe())
+        elif level >= len(pyramid.levels) or start * pyramid.tile_size >= max(1, len(pyramid.levels[level]["tempo"])):
+            self.send_error(404, "Tile Not Found")
+        else:
+            self.send_json_response(200, pyramid.tile(level, start))
+
     def handle_get_sessao_by_id(self):
         try:
             sessao_id = int(self.path.split('/')[-1])
@@ -805,13 +2916,16 @@ class APIRequestHandler(http.server.SimpleHTTPRequestHandler):
             self.send_error(503, "MySQL Service Unavailable")
             return
         try:
-            with mysql_connection.cursor() as cursor:
+            with mysql_pool.connection() as conn, conn.cursor() as cursor:
                     cursor.execute("""
                         SELECT id, nome, data_inicio, data_fim, data_modificacao,
                                motor_name, motor_diameter, motor_length, motor_delay,
                                motor_propweight, motor_totalweight, motor_manufacturer,
                                motor_description, motor_observations, motor_temperatura, motor_umidade, motor_pressao,
-                               burn_start_time, burn_end_time
+                               burn_start_time, burn_end_time,
+                               impulso_total, motor_class, class_color,
+                               forca_pico, tempo_ate_pico, queima_inicio, queima_fim, tempo_queima,
+                               forca_media, impulso_queima, designacao
                         FROM sessoes WHERE id = %s
                     """, (sessao_id,))
                     sessao = cursor.fetchone()
@@ -831,6 +2945,7 @@ class APIRequestHandler(http.server.SimpleHTTPRequestHandler):
                             'umidade': sessao.pop('motor_umidade', None),
                             'pressao': sessao.pop('motor_pressao', None)
                         }
+                        sessao['metricasEmpuxo'] = metricas_empuxo_json(sessao)
                         # Add burn metadata
                         sessao['burnMetadata'] = {
                             'burnStartTime': sessao.pop('burn_start_time', None),
@@ -843,31 +2958,81 @@ class APIRequestHandler(http.server.SimpleHTTPRequestHandler):
             logging.error(f"API Error (get_sessao_by_id): {e}")
             self.send_error(500, "Internal Server Error")
 
+    def iter_request_body(self, block_size: int = 65536):
+        """Lê o corpo da requisição em blocos (Content-Length ou Transfer-Encoding: chunked)."""
+        if 'chunked' in self.headers.get('Transfer-Encoding', '').lower():
+            while True:
+                size_line = self.rfile.readline(65537)
+                if not size_line:
+                    raise ValueError("Corpo chunked truncado")
+                size = int(size_line.split(b';', 1)[0].strip(), 16)
+                if size == 0:
+                    # Descarta trailers até a linha vazia final
+                    while self.rfile.readline(65537) not in (b'\r\n', b'\n', b''):
+                        pass
+                    return
+                remaining = size
+                while remaining > 0:
+                    data = self.rfile.read(min(remaining, block_size))
+                    if not data:
+                        raise ValueError("Corpo chunked truncado")
+                    remaining -= len(data)
+                    yield data
+                self.rfile.readline(65537)  # CRLF após cada chunk
+        else:
+            remaining = int(self.headers.get('Content-Length') or 0)
+            while remaining > 0:
+                data = self.rfile.read(min(remaining, block_size))
+                if not data:
+                    break
+                remaining -= len(data)
+                yield data
+
+    def handle_post_sessao_stream(self):
+        """
+        POST /api/sessoes com Content-Type: application/x-ndjson (opcionalmente chunked).
+        Linha 1: metadados da sessão (sem dadosTabela); demais linhas: uma leitura por linha.
+        """
+        if not mysql_connected:
+            self.send_error(503, "MySQL Service Unavailable")
+            return
+        records = iter_ndjson(self.iter_request_body())
+        try:
+            session_data = next(records)
+            if not isinstance(session_data, dict):
+                raise ValueError("A primeira linha deve conter os metadados da sessão")
+            total = save_session_stream_to_mysql_db(session_data, records)
+        except StopIteration:
+            self.send_error(400, "Empty body")
+            return
+        except ValueError as e:
+            # Inclui json.JSONDecodeError; o restante do corpo não foi lido
+            logging.error(f"Upload NDJSON inválido: {e}")
+            self.close_connection = True
+            self.send_error(400, "Invalid NDJSON")
+            return
+        except pymysql.Error as e:
+            logging.error(f"Erro de MySQL no upload NDJSON: {type(e).__name__}: {e}")
+            self.close_connection = True
+            self.send_error(500, "Failed to save session to database")
+            return
+        self.send_json_response(201, {"message": "Session created/updated successfully", "leituras": total})
+
     def handle_post_sessao(self):
+        content_type = self.headers.get('Content-Type', '')
+        if 'ndjson' in content_type:
+            self.handle_post_sessao_stream()
+            return
         try:
-            content_length = int(self.headers['Content-Length'])
-            post_data = self.rfile.read(content_length)
+            post_data = b''.join(self.iter_request_body())
             session_data = json.loads(post_data)
-        except (json.JSONDecodeError, TypeError, KeyError):
+        except (ValueError, TypeError, KeyError):
             self.send_error(400, "Invalid JSON")
             return
 
-        # We need to run the async save function in the main event loop
-        # This is a bit tricky from a synchronous handler in a different thread
-        # A simpler approach for now is to call it directly if it can be made synchronous,
-        # or use a thread-safe call to the loop.
-        # For this implementation, let's assume we can create a new loop to run the async task.
-        # This is not ideal but works for this isolated case.
-        
-        # asyncio.run() cannot be called from a running event loop.
-        # Since the http server runs in its own thread, we can get/create a loop for this thread.
-        try:
-            loop = asyncio.get_running_loop()
-        except RuntimeError:  # 'RuntimeError: There is no current event loop...'
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-
-        success = loop.run_until_complete(save_session_to_mysql_db(session_data))
+        # O handler já roda em uma thread própria do servidor HTTP: usa o caminho síncrono
+        # (sem criar um event loop por thread, que nunca era fechado)
+        success = save_session_to_mysql_db_blocking(session_data)
 
         if success:
             self.send_json_response(201, {"message": "Session created/updated successfully"})
@@ -885,9 +3050,11 @@ class APIRequestHandler(http.server.SimpleHTTPRequestHandler):
             self.send_error(503, "MySQL Service Unavailable")
             return
         try:
-            with mysql_connection.cursor() as cursor:
+            with mysql_pool.connection() as conn, conn.cursor() as cursor:
                 result = cursor.execute("DELETE FROM sessoes WHERE id = %s", (sessao_id,))
-                mysql_connection.commit()
+                conn.commit()
+                invalidate_session_caches(sessao_id)
+                session_index.remove(sessao_id)
                 if result > 0:
                     self.send_json_response(200, {"message": f"Sessão {sessao_id} deletada."})
                 else:
@@ -933,6 +3100,24 @@ class APIRequestHandler(http.server.SimpleHTTPRequestHandler):
         }
         self.send_json_response(200, info)
 
+    def handle_get_metrics(self):
+        """Retorna métricas internas do pipeline serial → WebSocket"""
+        self.send_json_response(200, {
+            "serial_queue": serial_queue.stats(),
+            "clients": [sender.stats() for sender in list(CONNECTED_CLIENTS.values())],
+            "recording": session_recorder.stats() if session_recorder else None,
+            "mysql_pool": mysql_pool.stats(),
+            "series_cache": series_cache.stats(),
+            "pyramid_cache": pyramid_cache.stats(),
+            "migration": session_migration.stats(),
+            "startup_ms": startup.stats(),
+            "event_loop": loop_lag.stats(),
+            "http_async": http_frontend.stats() if http_frontend else None,
+            "static_cache": static_assets.stats(),
+            "session_index": session_index.stats(),
+            "json_backend": JSON_BACKEND
+        })
+
     def handle_update_burn_metadata(self):
         """Atualiza os metadados de queima (burn_start_time e burn_end_time) de uma sessão"""
         try:
@@ -957,16 +3142,21 @@ class APIRequestHandler(http.server.SimpleHTTPRequestHandler):
                 self.send_error(400, "Missing burn_start_time or burn_end_time")
                 return
 
-            with mysql_connection.cursor() as cursor:
+            with mysql_pool.connection() as conn, conn.cursor() as cursor:
                 cursor.execute("""
                     UPDATE sessoes
                     SET burn_start_time = %s, burn_end_time = %s
                     WHERE id = %s
                 """, (float(burn_start_time), float(burn_end_time), sessao_id))
+                updated = cursor.rowcount > 0
+                if updated:
+                    # Duração, empuxo médio e impulso da queima dependem dos pontos escolhidos
+                    atualizar_metricas_sessao(cursor, sessao_id)
 
-                mysql_connection.commit()
+                conn.commit()
 
-                if cursor.rowcount > 0:
+                if updated:
+                    session_index.refresh([sessao_id], cursor)
                     logging.info(f"Metadados de queima atualizados para sessão {sessao_id}: "
                                f"início={burn_start_time}s, fim={burn_end_time}s")
                     self.send_json_response(200, {"message": "Burn metadata updated successfully"})
@@ -1089,8 +3279,99 @@ class APIRequestHandler(http.server.SimpleHTTPRequestHandler):
                 "message": "Erro ao processar dados da requisição"
             })
 
-    def send_json_response(self, status_code, data):
-        json_data = json.dumps(data, default=str).encode('utf-8')
+    def wants_leituras_f32(self) -> bool:
+        """Negociação do formato de /leituras: ?format=f32 ou Accept: application/octet-stream."""
+        fmt = self.query_param('format')
+        if fmt is not None:
+            return fmt == 'f32'
+        return 'application/octet-stream' in self.headers.get('Accept', '')
+
+    def send_static(self, path: str):
+        try:
+            asset = static_assets.get(path)
+        except OSError:
+            self.send_error(404, "File not found")
+            return
+        offered = asset.encodings()
+        encoding = negotiate_encoding(self.headers.get('Accept-Encoding', ''), offered)
+        cache_control = "public, max-age=31536000, immutable" if asset.immutable else "no-cache"
+
+        # Range vale para a representação sem compressão (If-Range: só se ainda for a mesma versão)
+        byte_range = None
+        range_header = self.headers.get('Range')
+        if_range = self.headers.get('If-Range')
+        if range_header and (if_range is None or if_range in (asset.etag('identity'), asset.last_modified)):
+            try:
+                byte_range = parse_byte_range(range_header, asset.size)
+            except ValueError:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{asset.size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            if byte_range is not None:
+                encoding = 'identity'
+        etag = asset.etag(encoding)
+
+        if_none_match = self.headers.get('If-None-Match')
+        not_modified = (etag_matches(if_none_match, etag) if if_none_match is not None
+                        else self.headers.get('If-Modified-Since') == asset.last_modified)
+        if not_modified:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", cache_control)
+            if len(offered) > 1:
+                self.send_header("Vary", "Accept-Encoding")
+            self.end_headers()
+            return
+
+        body = static_assets.body(asset, encoding)
+        total = len(body) if isinstance(body, bytes) else body[1]
+        start, end = byte_range if byte_range else (0, total - 1)
+        length = end - start + 1
+        self.send_response(206 if byte_range else 200)
+        self.send_header("Content-type", asset.ctype)
+        if encoding != 'identity':
+            self.send_header("Content-Encoding", encoding)
+        else:
+            self.send_header("Accept-Ranges", "bytes")
+        if byte_range:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{total}")
+        self.send_header("Content-Length", str(length))
+        self.send_header("Last-Modified", asset.last_modified)
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", cache_control)
+        if len(offered) > 1:
+            self.send_header("Vary", "Accept-Encoding")
+        self.end_headers()
+        static_assets.count_response(length, not isinstance(body, bytes), byte_range is not None)
+        if isinstance(body, bytes):
+            self.wfile.write(body[start:end + 1] if byte_range else body)
+        elif length > 0:
+            self.send_file_body(body[0], start, length)
+
+    def send_file_body(self, path: str, offset: int, count: int):
+        """Envia `count` bytes do arquivo direto para o socket (os.sendfile quando disponível)."""
+        self.wfile.flush()
+        with open(path, 'rb') as f:
+            sent = self.connection.sendfile(f, offset, count)
+        if sent < count:
+            # Arquivo encolheu no meio do envio: o Content-Length já não vale
+            self.close_connection = True
+
+    def send_bytes_response(self, status_code, body: bytes, content_type: str, headers: Optional[Dict[str, str]] = None):
+        self.send_response(status_code)
+        self.send_header('Content-Type', content_type)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Vary', 'Accept')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_json_response(self, status_code, data, headers: Optional[Dict[str, str]] = None):
+        json_data = json_dumps(data)
+        headers = headers or {}
         accept_encoding = self.headers.get('Accept-Encoding', '')
 
         if 'gzip' in accept_encoding and len(json_data) > 1024:
@@ -1104,6 +3385,8 @@ class APIRequestHandler(http.server.SimpleHTTPRequestHandler):
             self.send_header('Content-Encoding', 'gzip')
             self.send_header('Content-Length', str(len(compressed_data)))
             self.send_header('Vary', 'Accept-Encoding')
+            for name, value in headers.items():
+                self.send_header(name, value)
             self.end_headers()
             self.wfile.write(compressed_data)
             
@@ -1113,9 +3396,54 @@ class APIRequestHandler(http.server.SimpleHTTPRequestHandler):
             self.send_response(status_code)
             self.send_header('Content-Type', 'application/json')
             self.send_header('Content-Length', str(len(json_data)))
+            for name, value in headers.items():
+                self.send_header(name, value)
             self.end_headers()
             self.wfile.write(json_data)
 
+    def send_json_stream(self, status_code, chunks: Iterator[bytes], headers: Optional[Dict[str, str]] = None):
+        """
+        Resposta JSON gerada aos poucos, sem Content-Length: gzip incremental se
+        o cliente aceitar; em HTTP/1.1 usa Transfer-Encoding: chunked, em HTTP/1.0
+        o corpo termina com o fechamento da conexão.
+        """
+        gzipped = negotiate_encoding(self.headers.get('Accept-Encoding', ''), ['gzip', 'identity']) == 'gzip'
+        if gzipped:
+            chunks = gzip_stream(chunks)
+        chunked = self.protocol_version == 'HTTP/1.1' and self.request_version == 'HTTP/1.1'
+        self.send_response(status_code)
+        self.send_header('Content-Type', 'application/json')
+        if gzipped:
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Vary', 'Accept-Encoding')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if chunked:
+            self.send_header('Transfer-Encoding', 'chunked')
+        else:
+            self.close_connection = True
+        self.end_headers()
+        self.send_stream_body(chunks, chunked)
+
+    def send_stream_body(self, chunks: Iterator[bytes], chunked: bool):
+        # Cliente que parou de ler não segura a conexão MySQL do stream para sempre
+        self.connection.settimeout(HTTP_STREAM_WRITE_TIMEOUT)
+        try:
+            for data in chunks:
+                if data:
+                    self.wfile.write(http_chunk(data) if chunked else data)
+            if chunked:
+                self.wfile.write(b"0\r\n\r\n")
+        except (pymysql.Error, ValueError, zlib.error) as e:
+            # Cabeçalhos já enviados: resta interromper o corpo (sem o pedaço final)
+            logging.error(f"Erro no meio de uma resposta em streaming: {e}")
+            self.close_connection = True
+        except socket.timeout:
+            logging.warning(f"Cliente {self.client_address[0]} parou de receber a resposta em streaming; encerrando")
+            self.close_connection = True
+        finally:
+            chunks.close()
+
 class DualStackTCPServer(socketserver.ThreadingMixIn,socketserver.TCPServer):
     address_family = socket.AF_INET # Force IPv4
     allow_reuse_address = True
@@ -1152,33 +3480,401 @@ def start_http_server():
         logging.error(f"Falha ao iniciar servidor HTTP: {e}", exc_info=True)
         return None
 
+# ============ HTTP no event loop (HTTP_SERVER=asyncio) ============
+# Alternativa ao DualStackTCPServer: conexões, keep-alive e pipelining ficam no
+# event loop (sem uma thread por conexão). Cada requisição é lida por inteiro e
+# entregue ao mesmo APIRequestHandler sobre buffers em memória, então o
+# roteamento é exatamente o mesmo. Rotas leves rodam no próprio loop; as que
+# tocam o MySQL ou o disco vão para um pool fixo de HTTP_ASYNC_WORKERS threads.
+
+HTTP_INLINE_ROUTES = ('/api/time', '/api/info', '/api/metrics')
+
+class BufferedAPIRequestHandler(APIRequestHandler):
+    """APIRequestHandler para uma requisição já lida: rfile/wfile em memória."""
+    protocol_version = "HTTP/1.1"
+
+    def __init__(self, raw_request: bytes, client_address, server):
+        self.raw_request = raw_request
+        super().__init__(None, client_address, server)
+
+    def setup(self):
+        self.rfile = io.BytesIO(self.raw_request)
+        self.wfile = io.BytesIO()
+
+    def handle(self):
+        self.close_connection = True
+        self.handle_one_request()
+
+    def finish(self):
+        pass
+
+    def handle_expect_100(self):
+        # O front end já respondeu 100 Continue antes de ler o corpo
+        return True
+
+    def send_file_body(self, path: str, offset: int, count: int):
+        # O front end envia depois dos cabeçalhos, com loop.sendfile
+        self.file_body = (path, offset, count)
+
+    def send_stream_body(self, chunks: Iterator[bytes], chunked: bool):
+        # O front end consome o gerador depois dos cabeçalhos, sem juntar o corpo em memória
+        self.stream_body = (chunks, chunked)
+
+    def send_header(self, keyword, value):
+        if keyword.lower() == 'connection':
+            self.connection_header_sent = True
+        super().send_header(keyword, value)
+
+    def end_headers(self):
+        # Em HTTP/1.1 o cliente só sabe que a conexão vai fechar se o servidor avisar
+        if self.close_connection and not getattr(self, 'connection_header_sent', False):
+            self.send_header('Connection', 'close')
+        super().end_headers()
+
+class HTTPRequestTooLarge(Exception):
+    pass
+
+async def read_http_request(reader: asyncio.StreamReader, idle_timeout: float) -> Optional[Tuple[bytes, Dict[bytes, bytes]]]:
+    """
+    Lê a linha de requisição e os cabeçalhos. Retorna (bytes brutos, cabeçalhos
+    em minúsculas) ou None se o cliente fechou a conexão ociosa.
+    """
+    try:
+        head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), idle_timeout)
+    except asyncio.IncompleteReadError as e:
+        if e.partial.strip():
+            raise
+        return None
+    headers = {}
+    for line in head.split(b"\r\n")[1:]:
+        name, sep, value = line.partition(b":")
+        if sep:
+            headers[name.strip().lower()] = value.strip().lower()
+    return head, headers
+
+async def read_http_body(reader: asyncio.StreamReader, headers: Dict[bytes, bytes]) -> bytes:
+    """Corpo bruto (com o enquadramento chunked, que o handler decodifica em iter_request_body)."""
+    if b"chunked" in headers.get(b"transfer-encoding", b""):
+        parts = []
+        total = 0
+        while True:
+            size_line = await reader.readuntil(b"\r\n")
+            parts.append(size_line)
+            size = int(size_line.split(b";", 1)[0].strip(), 16)
+            if size == 0:
+                while True:
+                    trailer = await reader.readuntil(b"\r\n")
+                    parts.append(trailer)
+                    if trailer == b"\r\n":
+                        return b"".join(parts)
+            total += size
+            if total > HTTP_MAX_BODY:
+                raise HTTPRequestTooLarge()
+            parts.append(await reader.readexactly(size + 2))
+    length = int(headers.get(b"content-length", b"0") or 0)
+    if length > HTTP_MAX_BODY:
+        raise HTTPRequestTooLarge()
+    return await reader.readexactly(length) if length else b""
+
+class AsyncHTTPServer:
+    """Front end HTTP/1.1 em asyncio.start_server que despacha para `handler_class`."""
+
+    def __init__(self, handler_class=BufferedAPIRequestHandler, workers: int = HTTP_ASYNC_WORKERS,
+                 keepalive_timeout: float = HTTP_KEEPALIVE_TIMEOUT):
+        self.handler_class = handler_class
+        self.keepalive_timeout = keepalive_timeout
+        self.workers = max(1, workers)
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="http")
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.open_connections = 0
+        self.connections = 0
+        self.requests = 0
+        self.reused = 0  # requisições servidas em uma conexão já usada (keep-alive/pipelining)
+        self.inline = 0
+
+    async def start(self, host: str, port: int):
+        self.server = await asyncio.start_server(self.handle_connection, host, port, reuse_address=True)
+        return self
+
+    @property
+    def port(self) -> int:
+        return self.server.sockets[0].getsockname()[1]
+
+    def process(self, raw_request: bytes, client_address) -> Tuple[bytes, bool, Optional[tuple], Optional[tuple]]:
+        handler = self.handler_class(raw_request, client_address, self)
+        return (handler.wfile.getvalue(), handler.close_connection,
+                getattr(handler, 'file_body', None), getattr(handler, 'stream_body', None))
+
+    async def write_stream(self, writer: asyncio.StreamWriter, chunks: Iterator[bytes], chunked: bool) -> bool:
+        """
+        Envia um corpo gerado aos poucos. Cada pedaço é produzido no executor (o
+        gerador pode esperar o MySQL) e só se gera o próximo depois do drain.
+        Retorna False se o corpo foi interrompido.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                data = await loop.run_in_executor(self.executor, next, chunks, None)
+                if data is None:
+                    break
+                if data:
+                    writer.write(http_chunk(data) if chunked else data)
+                    # asyncio.TimeoutError encerra a conexão em handle_connection
+                    await asyncio.wait_for(writer.drain(), HTTP_STREAM_WRITE_TIMEOUT)
+            if chunked:
+                writer.write(b"0\r\n\r\n")
+            return True
+        except (pymysql.Error, ValueError, zlib.error) as e:
+            logging.error(f"Erro no meio de uma resposta em streaming: {e}")
+            return False
+        finally:
+            await loop.run_in_executor(self.executor, chunks.close)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        loop = asyncio.get_running_loop()
+        client_address = writer.get_extra_info('peername') or ("?", 0)
+        self.open_connections += 1
+        self.connections += 1
+        served = 0
+        try:
+            while True:
+                request = await read_http_request(reader, self.keepalive_timeout)
+                if request is None:
+                    break
+                head, headers = request
+                if headers.get(b"expect") == b"100-continue":
+                    writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+                try:
+                    raw_request = head + await read_http_body(reader, headers)
+                except HTTPRequestTooLarge:
+                    writer.write(b"HTTP/1.1 413 Payload Too Large\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+                    break
+
+                target = head.split(b" ", 2)[1] if head.count(b" ") >= 2 else b""
+                route = urlsplit(target.decode('latin-1')).path
+                if route in HTTP_INLINE_ROUTES:
+                    self.inline += 1
+                    response, close, file_body, stream_body = self.process(raw_request, client_address)
+                else:
+                    response, close, file_body, stream_body = await loop.run_in_executor(
+                        self.executor, self.process, raw_request, client_address)
+
+                self.requests += 1
+                if served:
+                    self.reused += 1
+                served += 1
+                if not response:
+                    break  # o handler falhou sem responder: fecha, como o servidor com threads
+                writer.write(response)
+                if file_body:
+                    path, offset, count = file_body
+                    with open(path, 'rb') as f:
+                        sent = await loop.sendfile(writer.transport, f, offset, count)
+                    close = close or sent < count
+                if stream_body:
+                    close = not await self.write_stream(writer, *stream_body) or close
+                await writer.drain()
+                if close:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                ValueError, ConnectionError):
+            pass  # ocioso demais, requisição malformada ou cliente desconectou
+        finally:
+            self.open_connections -= 1
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+    def close(self):
+        if self.server:
+            self.server.close()
+        self.executor.shutdown(wait=False)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "open_connections": self.open_connections,
+            "connections": self.connections,
+            "requests": self.requests,
+            "reused": self.reused,
+            "inline": self.inline,
+            "workers": self.workers
+        }
+
+http_frontend: Optional[AsyncHTTPServer] = None
+
+async def start_async_http_server() -> Optional[AsyncHTTPServer]:
+    global http_frontend
+    try:
+        http_frontend = await AsyncHTTPServer().start(BIND_HOST, HTTP_PORT)
+        logging.info(f"Servidor HTTP/API (asyncio, keep-alive) iniciado em {BIND_HOST}:{HTTP_PORT}")
+        return http_frontend
+    except OSError as e:
+        logging.error(f"Falha ao iniciar servidor HTTP: {e}", exc_info=True)
+        return None
+
 
 # ================== WebSocket ==================
+class ClientSender:
+    """
+    Fila de saída limitada + task de envio dedicada para um cliente WebSocket.
+    Um cliente lento só atrasa a si mesmo; quando a fila enche aplica-se a
+    política WS_SLOW_CLIENT_POLICY. Frames de dados podem ser descartados,
+    frames de status/config/respostas nunca são descartados antes deles.
+    """
+
+    def __init__(self, websocket, capacity: int = WS_CLIENT_QUEUE_SIZE, policy: str = WS_SLOW_CLIENT_POLICY):
+        self.ws = websocket
+        self.capacity = max(2, capacity)
+        self.policy = policy if policy in ("drop_oldest", "downsample", "disconnect") else "drop_oldest"
+        self.queue = collections.deque()  # (instante de enfileiramento, frame, descartável)
+        self.wakeup = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.closing = False
+        self.sent = 0
+        self.dropped = 0
+        self.lag = 0.0
+        self.max_lag = 0.0
+        try:
+            self.remote = str(websocket.remote_address[0])
+        except (AttributeError, IndexError, TypeError):
+            self.remote = "?"
+
+    def start(self):
+        self.task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        self.closing = True
+        if self.task:
+            self.task.cancel()
+
+    def enqueue(self, data: str, droppable: bool = True):
+        if self.closing:
+            return
+        if len(self.queue) >= self.capacity:
+            if self.policy == "disconnect":
+                logging.warning(f"Cliente WS {self.remote} lento ({len(self.queue)} frames pendentes), desconectando")
+                self.closing = True
+                asyncio.ensure_future(self.ws.close(code=1013, reason="Cliente lento"))
+                return
+            if self.policy == "downsample":
+                self._thin()
+            else:
+                self._drop_oldest()
+        self.queue.append((time.monotonic(), data, droppable))
+        self.wakeup.set()
+
+    def _drop_oldest(self):
+        for i, (_, _, droppable) in enumerate(self.queue):
+            if droppable:
+                del self.queue[i]
+                self.dropped += 1
+                return
+        self.queue.popleft()
+        self.dropped += 1
+
+    def _thin(self):
+        """Descarta um a cada dois frames de dados pendentes (reduz a taxa à metade)."""
+        kept = collections.deque()
+        skip = False
+        for item in self.queue:
+            if item[2]:
+                skip = not skip
+                if skip:
+                    self.dropped += 1
+                    continue
+            kept.append(item)
+        self.queue = kept
+        if len(self.queue) >= self.capacity:
+            self._drop_oldest()
+
+    async def _run(self):
+        try:
+            while True:
+                while not self.queue:
+                    self.wakeup.clear()
+                    await self.wakeup.wait()
+                enqueued_at, data, _ = self.queue.popleft()
+                await self.ws.send(data)
+                self.sent += 1
+                self.lag = time.monotonic() - enqueued_at
+                if self.lag > self.max_lag:
+                    self.max_lag = self.lag
+        except asyncio.CancelledError:
+            raise
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        except Exception as e:
+            logging.error(f"Erro ao enviar para cliente WS {self.remote}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "remote": self.remote,
+            "policy": self.policy,
+            "depth": len(self.queue),
+            "capacity": self.capacity,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "lag_ms": round(self.lag * 1000, 1),
+            "max_lag_ms": round(self.max_lag * 1000, 1)
+        }
+
 async def ws_handler(websocket):
-    CONNECTED_CLIENTS.add(websocket)
+    sender = ClientSender(websocket)
+    CONNECTED_CLIENTS[websocket] = sender
+    sender.start()
     try:
         # Send initial status on connect
-        await websocket.send(json.dumps({
+        sender.enqueue(json_dumps_text({
             "mysql_connected": mysql_connected,
             "serial_connected": serial_connected,
             "serial_error": serial_last_error
-        }))
+        }), droppable=False)
+        recorder = session_recorder
+        if recorder is not None:
+            # Aba aberta (ou reaberta) durante uma gravação no servidor: permite encerrá-la
+            sender.enqueue(json_dumps_text({
+                "type": "recording_started",
+                "message": recorder.nome,
+                "sessionId": recorder.session_id
+            }), droppable=False)
 
         async for message in websocket:
             try:
                 cmd = json.loads(message)
                 cmd_type = cmd.get("cmd")
 
-                if cmd_type == "save_session_to_mysql":
+                if cmd_type == "start_recording":
+                    recorder = start_session_recording(cmd.get("payload") or {})
+                    if recorder:
+                        send_to_clients(json_dumps_text({
+                            "type": "recording_started",
+                            "message": recorder.nome,
+                            "sessionId": recorder.session_id
+                        }), droppable=False)
+                    else:
+                        sender.enqueue(json_dumps_text({
+                            "type": "recording_error",
+                            "message": "Já existe uma gravação em andamento",
+                            "sessionId": session_recorder.session_id if session_recorder else None
+                        }), droppable=False)
+                elif cmd_type == "stop_recording":
+                    recorder = stop_session_recording(cmd.get("payload"))
+                    if not recorder:
+                        sender.enqueue(json_dumps_text({
+                            "type": "recording_error",
+                            "message": "Nenhuma gravação em andamento",
+                            "sessionId": None
+                        }), droppable=False)
+                elif cmd_type == "save_session_to_mysql":
                     session_data = cmd.get("payload")
                     if session_data:
                         success = await save_session_to_mysql_db(session_data)
                         response_type = "mysql_save_success" if success else "mysql_save_error"
-                        await websocket.send(json.dumps({
+                        sender.enqueue(json_dumps_text({
                             "type": response_type,
                             "message": session_data.get("nome"),
                             "sessionId": session_data.get("id")
-                        }))
+                        }), droppable=False)
                 else:
                     binary_packet = json_to_binary_command(cmd)
                     if binary_packet:
@@ -1200,22 +3896,68 @@ async def ws_handler(websocket):
     except websockets.exceptions.ConnectionClosed:
         pass
     finally:
-        CONNECTED_CLIENTS.remove(websocket)
+        sender.stop()
+        CONNECTED_CLIENTS.pop(websocket, None)
+
+class LoopLagMonitor:
+    """
+    Sonda do event loop: dorme LOOP_LAG_INTERVAL_MS e mede quanto acordou
+    atrasado. Atraso acima de LOOP_LAG_WARN_MS significa que algo bloqueou o
+    loop (e, com ele, o envio de dados para todos os clientes WS).
+    """
+
+    def __init__(self, interval_ms: float, warn_ms: float):
+        self.interval = interval_ms / 1000.0
+        self.warn_ms = warn_ms
+        self.samples = 0
+        self.blocked = 0
+        self.max_ms = 0.0
+        self.last_ms = 0.0
+        self.recent = collections.deque(maxlen=600)
+
+    async def run(self):
+        while True:
+            t0 = time.monotonic()
+            await asyncio.sleep(self.interval)
+            lag_ms = max(0.0, (time.monotonic() - t0 - self.interval) * 1000)
+            self.samples += 1
+            self.last_ms = lag_ms
+            self.max_ms = max(self.max_ms, lag_ms)
+            self.recent.append(lag_ms)
+            if lag_ms > self.warn_ms:
+                self.blocked += 1
+                logging.warning(f"Event loop bloqueado por {lag_ms:.0f} ms (limite {self.warn_ms:.0f} ms)")
+
+    def stats(self) -> Dict[str, Any]:
+        recent = sorted(self.recent)
+        return {
+            "interval_ms": self.interval * 1000,
+            "warn_ms": self.warn_ms,
+            "samples": self.samples,
+            "blocked": self.blocked,
+            "last_ms": round(self.last_ms, 1),
+            "max_ms": round(self.max_ms, 1),
+            "p99_recent_ms": round(recent[int(len(recent) * 0.99)], 1) if recent else None
+        }
+
+loop_lag = LoopLagMonitor(LOOP_LAG_INTERVAL_MS, LOOP_LAG_WARN_MS)
 
 async def ws_server_main():
     try:
+        t0 = time.monotonic()
         async with websockets.serve(ws_handler, BIND_HOST, WS_PORT, max_size=None):
+            startup.add("ws", time.monotonic() - t0)
             logging.info(f"WebSocket ativo em {BIND_HOST}:{WS_PORT}")
-            await asyncio.Future()
+            startup.log("Servidores HTTP/WS e leitura serial prontos")
+            await loop_lag.run()
     except OSError as e:
         logging.error(f"Falha ao iniciar WebSocket: {e}", exc_info=True)
 
 def sanitize_for_json(obj):
     """Recursively replace NaN/Infinity with None for valid JSON serialization."""
-    import math
     if isinstance(obj, dict):
         return {k: sanitize_for_json(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
+    elif isinstance(obj, (list, tuple)):
         return [sanitize_for_json(item) for item in obj]
     elif isinstance(obj, float):
         if math.isnan(obj) or math.isinf(obj):
@@ -1223,18 +3965,184 @@ def sanitize_for_json(obj):
         return obj
     return obj
 
+def send_to_clients(data: str, droppable: bool = True):
+    """Enfileira o frame para cada cliente; o envio real acontece na task de cada um."""
+    for sender in list(CONNECTED_CLIENTS.values()):
+        sender.enqueue(data, droppable)
+
 async def broadcast_json(obj: Dict[str, Any]):
     if not CONNECTED_CLIENTS:
         return
-    obj["mysql_connected"] = mysql_connected
-    obj["serial_connected"] = serial_connected
-    obj["serial_error"] = serial_last_error
-    sanitized = sanitize_for_json(obj)
-    data = json.dumps(sanitized, separators=(",", ":"))
-    await asyncio.gather(*[ws.send(data) for ws in list(CONNECTED_CLIENTS)], return_exceptions=True)
+    # Preserva a ordem: amostras pendentes saem antes de config/status
+    pending = data_batcher.take_frame()
+    if pending:
+        send_to_clients(pending)
+    obj["mysql_connected"], obj["serial_connected"], obj["serial_error"] = data_batcher.note_status()
+    send_to_clients(json_dumps_text(obj), droppable=obj.get("type") == "data")
+
+class DataBroadcastBatcher:
+    """
+    Agrupa amostras DATA em frames {"type": "data_batch", "samples": [...]}.
+    Um frame sai a cada `window_ms` ou quando `max_samples` amostras acumulam.
+    Os frames de dados não levam status: quando ele muda, sai antes um frame só de
+    status que nunca é descartado. Usar apenas na thread do event loop.
+    """
+
+    def __init__(self, window_ms: float, max_samples: int):
+        self.window = window_ms / 1000.0
+        self.max_samples = max(1, max_samples)
+        self.samples: List[Dict[str, Any]] = []
+        self.flush_handle: Optional[asyncio.TimerHandle] = None
+        self.last_status = None
+
+    def add(self, sample: Dict[str, Any]) -> Optional[str]:
+        """Acumula uma amostra; retorna o frame pronto quando o lote enche."""
+        forca = sample.get("forca")
+        if forca is not None and not math.isfinite(forca):
+            sample["forca"] = None
+        if self.window <= 0:
+            # Agrupamento desativado: um frame "data" por amostra
+            return self.frame_for([sample]) if CONNECTED_CLIENTS else None
+        self.samples.append(sample)
+        if len(self.samples) >= self.max_samples:
+            return self.take_frame()
+        if self.flush_handle is None:
+            self.flush_handle = asyncio.get_running_loop().call_later(self.window, self.flush)
+        return None
+
+    def take_frame(self) -> Optional[str]:
+        """Retira as amostras pendentes já serializadas como um frame data_batch."""
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        if not self.samples:
+            return None
+        samples, self.samples = self.samples, []
+        if not CONNECTED_CLIENTS:
+            return None
+        return self.frame_for(samples)
+
+    def frame_for(self, samples: List[Dict[str, Any]]) -> str:
+        if self.window <= 0:
+            frame = samples[0]
+        else:
+            frame = {"type": "data_batch", "samples": samples}
+        self.send_status_if_changed()
+        return json_dumps_text(frame)
+
+    def note_status(self) -> tuple:
+        """Status atual, registrado como já enviado (o chamador o anexa a um frame não descartável)."""
+        self.last_status = (mysql_connected, serial_connected, serial_last_error)
+        return self.last_status
+
+    def send_status_if_changed(self):
+        # Frame próprio e não descartável: se fosse junto de um frame de dados, o
+        # descarte de um cliente lento o deixaria com o status antigo
+        if (mysql_connected, serial_connected, serial_last_error) != self.last_status:
+            mysql, serial, erro = self.note_status()
+            send_to_clients(json_dumps_text({
+                "mysql_connected": mysql,
+                "serial_connected": serial,
+                "serial_error": erro
+            }), droppable=False)
+
+    def flush(self):
+        frame = self.take_frame()
+        if frame:
+            send_to_clients(frame)
+
+data_batcher = DataBroadcastBatcher(WS_BATCH_WINDOW_MS, WS_BATCH_MAX_SAMPLES)
+
+class SerialHandoffQueue:
+    """
+    Fila limitada entre a thread serial (produtor) e o event loop (consumidor único).
+    O produtor só usa deque.append/popleft (atômicos no CPython) e acorda o loop no
+    máximo uma vez por tick. Quando a fila enche, descarta a mensagem mais antiga.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, capacity)
+        self.items = collections.deque()
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.wakeup: Optional[asyncio.Event] = None
+        self.wakeup_pending = False
+        self.enqueued = 0
+        self.dropped = 0
+        self.high_water = 0
+        self.last_drop_log = 0.0
+
+    def start(self):
+        """Associa a fila ao event loop em execução e inicia a task consumidora."""
+        self.loop = asyncio.get_running_loop()
+        self.wakeup = asyncio.Event()
+        return self.loop.create_task(self._consume())
+
+    def put(self, obj: Dict[str, Any]):
+        self._push(obj)
+        self._notify()
+
+    def put_many(self, objs: List[Dict[str, Any]]):
+        for obj in objs:
+            self._push(obj)
+        self._notify()
+
+    def _push(self, obj: Dict[str, Any]):
+        if len(self.items) >= self.capacity:
+            try:
+                self.items.popleft()
+                self.dropped += 1
+            except IndexError:
+                pass
+        self.items.append(obj)
+        self.enqueued += 1
+        depth = len(self.items)
+        if depth > self.high_water:
+            self.high_water = depth
+
+    def _notify(self):
+        if self.dropped and time.monotonic() - self.last_drop_log > 5:
+            self.last_drop_log = time.monotonic()
+            logging.warning(f"Event loop atrasado: {self.dropped} mensagens seriais descartadas "
+                            f"(pico da fila: {self.high_water}/{self.capacity})")
+        if self.loop is None or self.wakeup_pending:
+            return
+        self.wakeup_pending = True
+        try:
+            self.loop.call_soon_threadsafe(self.wakeup.set)
+        except RuntimeError:  # loop encerrado
+            self.wakeup_pending = False
+
+    async def _consume(self):
+        while True:
+            await self.wakeup.wait()
+            self.wakeup.clear()
+            self.wakeup_pending = False
+            while self.items:
+                obj = self.items.popleft()
+                try:
+                    if obj.get("type") == "data":
+                        frame = data_batcher.add(obj)
+                        if frame:
+                            send_to_clients(frame)
+                    else:
+                        await broadcast_json(obj)
+                except Exception as e:
+                    logging.error(f"Erro ao distribuir mensagem serial: {e}", exc_info=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "depth": len(self.items),
+            "capacity": self.capacity,
+            "enqueued": self.enqueued,
+            "dropped": self.dropped,
+            "high_water": self.high_water
+        }
+
+serial_queue = SerialHandoffQueue(SERIAL_QUEUE_SIZE)
 
 # ================== Binary Protocol & Serial ==================
-def crc16_ccitt(data: bytes) -> int:
+def crc16_ccitt_bitwise(data: bytes) -> int:
+    """Implementação de referência bit a bit (8 iterações por byte)."""
     crc = 0xFFFF
     for b in data:
         crc ^= b << 8
@@ -1242,6 +4150,48 @@ def crc16_ccitt(data: bytes) -> int:
             crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else (crc << 1)
     return crc & 0xFFFF
 
+def _build_crc16_table() -> tuple:
+    table = []
+    for i in range(256):
+        crc = i << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else (crc << 1)
+        table.append(crc & 0xFFFF)
+    return tuple(table)
+
+CRC16_TABLE = _build_crc16_table()
+
+def crc16_ccitt_table(data: bytes) -> int:
+    """CRC16-CCITT (poly 0x1021, init 0xFFFF) com tabela de 256 entradas."""
+    crc = 0xFFFF
+    table = CRC16_TABLE
+    for b in data:
+        crc = ((crc << 8) & 0xFF00) ^ table[(crc >> 8) ^ b]
+    return crc
+
+def crc16_ccitt_hqx(data: bytes) -> int:
+    """CRC16-CCITT via binascii.crc_hqx (mesmo polinômio, implementado em C)."""
+    return binascii.crc_hqx(data, 0xFFFF)
+
+CRC16_IMPLEMENTATIONS = {
+    "bitwise": crc16_ccitt_bitwise,
+    "table": crc16_ccitt_table,
+    "hqx": crc16_ccitt_hqx,
+}
+
+def _select_crc16_impl(name: str):
+    impl = CRC16_IMPLEMENTATIONS.get(name)
+    if impl is None:
+        logging.warning(f"CRC16_IMPL '{name}' desconhecido, usando 'table'")
+        impl = crc16_ccitt_table
+    # Vetor de verificação padrão do CRC-16/CCITT-FALSE
+    if impl(b"123456789") != 0x29B1:
+        logging.warning(f"CRC16_IMPL '{name}' falhou na autoverificação, usando 'table'")
+        impl = crc16_ccitt_table
+    return impl
+
+crc16_ccitt = _select_crc16_impl(CRC16_IMPL)
+
 def parse_data_packet_v1(data: bytes) -> Optional[Dict[str, Any]]:
     """Parses the original 16-byte data packet."""
     if len(data) != 16: return None
@@ -1274,6 +4224,67 @@ def parse_data_packet_v2(data: bytes) -> Optional[Dict[str, Any]]:
     except struct.error:
         return None
 
+# Layout do pacote DATA v2: magic, ver, type, t_ms, forca_N, raw, status, reservado, crc
+DATA_V2_STRUCT = struct.Struct("<HBBIfiBBH")
+DATA_V2_HEADER = struct.pack("<HBB", MAGIC, 0x02, TYPE_DATA)
+
+if np is not None:
+    DATA_V2_DTYPE = np.dtype([
+        ("magic", "<u2"), ("ver", "u1"), ("type", "u1"), ("t_ms", "<u4"),
+        ("forca", "<f4"), ("raw", "<i4"), ("status", "u1"), ("reserved", "u1"), ("crc", "<u2")
+    ])
+    CRC16_TABLE_NP = np.array(CRC16_TABLE, dtype=np.uint16)
+
+def crc16_ccitt_rows(rows) -> "np.ndarray":
+    """CRC16-CCITT de cada linha de uma matriz uint8 (N, L), processando todas as linhas em paralelo."""
+    crc = np.full(rows.shape[0], 0xFFFF, dtype=np.uint16)
+    for col in range(rows.shape[1]):
+        crc = (crc << 8) ^ CRC16_TABLE_NP[(crc >> 8) ^ rows[:, col]]
+    return crc
+
+def count_data_run_v2(buf: bytearray) -> int:
+    """Conta quantos pacotes DATA v2 contíguos e alinhados existem a partir do início do buffer."""
+    count = 0
+    offset = 0
+    limit = len(buf) - SIZE_DATA
+    while offset <= limit and buf.startswith(DATA_V2_HEADER, offset):
+        count += 1
+        offset += SIZE_DATA
+    return count
+
+def decode_data_run_v2(data: bytes, count: int, use_numpy: Optional[bool] = None) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Decodifica em uma passada uma rajada de `count` pacotes DATA v2 contíguos.
+    Retorna (amostras válidas, número de pacotes com CRC inválido).
+    """
+    if use_numpy is None:
+        use_numpy = np is not None and count >= SERIAL_BATCH_NUMPY_MIN
+
+    if use_numpy:
+        packets = np.frombuffer(data, dtype=DATA_V2_DTYPE, count=count)
+        rows = np.frombuffer(data, dtype=np.uint8, count=count * SIZE_DATA).reshape(count, SIZE_DATA)
+        valid = crc16_ccitt_rows(rows[:, :-2]) == packets["crc"]
+        good = packets[valid]
+        samples = [
+            {"type": "data", "tempo": t, "forca": f, "raw": r, "status": st}
+            for t, f, r, st in zip((good["t_ms"] / 1000.0).tolist(), good["forca"].astype(np.float64).tolist(),
+                                   good["raw"].tolist(), good["status"].tolist())
+        ]
+        return samples, count - len(samples)
+
+    samples = []
+    crc_errors = 0
+    crc = crc16_ccitt
+    view = memoryview(data)[:count * SIZE_DATA]
+    offset = 0
+    for _, _, _, t_ms, forca_N, raw_value, status, _, crc_rx in DATA_V2_STRUCT.iter_unpack(view):
+        if crc(view[offset:offset + SIZE_DATA - 2]) != crc_rx:
+            crc_errors += 1
+        else:
+            samples.append({"type": "data", "tempo": t_ms / 1000.0, "forca": forca_N, "raw": raw_value, "status": status})
+        offset += SIZE_DATA
+    return samples, crc_errors
+
 def parse_data_packet(data: bytes, version: int) -> Optional[Dict[str, Any]]:
     if version == 0x01:
         return parse_data_packet_v1(data)
@@ -1396,7 +4407,7 @@ def find_serial_port() -> Optional[str]:
     ports = [p.device for p in serial.tools.list_ports.comports() if "USB" in p.device or "ACM" in p.device]
     return ports[0] if ports else None
 
-def serial_reader(loop: asyncio.AbstractEventLoop):
+def serial_reader():
     global serial_connection, serial_connected, serial_last_error
     retry_count = 0
     max_retry_log = 5  # Logar apenas as primeiras 5 tentativas
@@ -1419,7 +4430,7 @@ def serial_reader(loop: asyncio.AbstractEventLoop):
                     "connected": False,
                     "error": serial_last_error
                 }
-                asyncio.run_coroutine_threadsafe(broadcast_json(status_update), loop)
+                serial_queue.put(status_update)
 
             time.sleep(5)  # Aguarda 5 segundos antes de tentar novamente
             continue
@@ -1439,7 +4450,7 @@ def serial_reader(loop: asyncio.AbstractEventLoop):
                 "port": port,
                 "baudrate": SERIAL_BAUD
             }
-            asyncio.run_coroutine_threadsafe(broadcast_json(status_update), loop)
+            serial_queue.put(status_update)
 
             buf = bytearray()
             invalid_packet_count = 0
@@ -1474,12 +4485,30 @@ def serial_reader(loop: asyncio.AbstractEventLoop):
                     pkt_ver = buf[2]
                     pkt_type = buf[3]
 
-                    size_map = {
-                        0x01: {TYPE_DATA: 16, TYPE_CONFIG: 64, TYPE_STATUS: 14},
-                        0x02: {TYPE_DATA: 20, TYPE_CONFIG: 64, TYPE_STATUS: 14}
-                    }
-                    
-                    expected_size = size_map.get(pkt_ver, {}).get(pkt_type)
+                    # Modo em lote: rajada de pacotes DATA v2 alinhados decodificada de uma vez
+                    if SERIAL_BATCH_DECODE and pkt_ver == 0x02 and pkt_type == TYPE_DATA:
+                        run_count = count_data_run_v2(buf)
+                        if run_count >= 2:
+                            run = bytes(buf[:run_count * SIZE_DATA])
+                            del buf[:run_count * SIZE_DATA]
+                            samples, crc_errors = decode_data_run_v2(run, run_count)
+                            if samples:
+                                recorder = session_recorder
+                                if recorder:
+                                    recorder.append(samples)
+                                serial_queue.put_many(samples)
+                            if crc_errors:
+                                logging.warning(f"[V2 Batch] CRC mismatch em {crc_errors}/{run_count} pacotes DATA")
+                                invalid_packet_count += crc_errors
+                                if invalid_packet_count > max_invalid_packets:
+                                    logging.warning(f"Muitos pacotes inválidos ({invalid_packet_count}). Resincronizando.")
+                                    buf.clear()
+                                    invalid_packet_count = 0
+                            elif samples:
+                                invalid_packet_count = 0
+                            continue
+
+                    expected_size = PACKET_SIZES.get(pkt_ver, {}).get(pkt_type)
 
                     if not expected_size:
                         del buf[0]
@@ -1505,7 +4534,10 @@ def serial_reader(loop: asyncio.AbstractEventLoop):
 
                     if json_obj:
                         invalid_packet_count = 0
-                        asyncio.run_coroutine_threadsafe(broadcast_json(json_obj), loop)
+                        recorder = session_recorder
+                        if recorder and json_obj.get("type") == "data":
+                            recorder.append([json_obj])
+                        serial_queue.put(json_obj)
                     else:
                         invalid_packet_count += 1
                         if invalid_packet_count > max_invalid_packets:
@@ -1529,7 +4561,7 @@ def serial_reader(loop: asyncio.AbstractEventLoop):
                 "connected": False,
                 "error": serial_last_error
             }
-            asyncio.run_coroutine_threadsafe(broadcast_json(status_update), loop)
+            serial_queue.put(status_update)
 
         except Exception as e:
             logging.error(f"Erro inesperado na leitura serial: {e}", exc_info=True)
@@ -1542,7 +4574,7 @@ def serial_reader(loop: asyncio.AbstractEventLoop):
                 "connected": False,
                 "error": serial_last_error
             }
-            asyncio.run_coroutine_threadsafe(broadcast_json(status_update), loop)
+            serial_queue.put(status_update)
 
         finally:
             if serial_connection:
@@ -1555,22 +4587,70 @@ def serial_reader(loop: asyncio.AbstractEventLoop):
             time.sleep(3)  # Aguarda antes de tentar reconectar
 
 # ================== Main ==================
+class StartupTimeline:
+    """Duração de cada fase da inicialização, para o log de boot e /api/metrics."""
+
+    def __init__(self):
+        self.t0 = time.monotonic()
+        self.phases: List[Tuple[str, float]] = []
+        self.lock = threading.Lock()
+
+    def add(self, name: str, seconds: float):
+        with self.lock:
+            self.phases.append((name, seconds))
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        t0 = time.monotonic()
+        try:
+            yield
+        finally:
+            self.add(name, time.monotonic() - t0)
+
+    def log(self, titulo: str):
+        with self.lock:
+            fases = " | ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in self.phases)
+        logging.info(f"{titulo} em {(time.monotonic() - self.t0) * 1000:.0f}ms desde o início ({fases})")
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {name: round(seconds * 1000, 1) for name, seconds in self.phases}
+
+startup = StartupTimeline()
+
+def init_mysql_background():
+    """
+    Inicializa o MySQL fora do caminho crítico do boot: as retentativas com
+    backoff não seguram mais a interface. Com o banco pronto, dispara a migração
+    das sessões antigas.
+    """
+    init_mysql_db()
+    startup.log("MySQL pronto" if mysql_connected else "MySQL indisponível")
+    if mysql_connected:
+        session_migration.start()
+
 async def main():
     httpd = None
     try:
-        init_mysql_db()
-        httpd = start_http_server()
-        loop = asyncio.get_running_loop()
-        threading.Thread(target=serial_reader, args=(loop,), daemon=True).start()
+        with startup.phase("http"):
+            if HTTP_SERVER_MODE == "asyncio":
+                await start_async_http_server()
+            else:
+                httpd = start_http_server()
+        with startup.phase("serial"):
+            serial_queue.start()
+            threading.Thread(target=serial_reader, daemon=True).start()
+        threading.Thread(target=init_mysql_background, name="mysql-init", daemon=True).start()
         await ws_server_main()
     except OSError as e:
         if e.errno == 98: logging.error("Porta já em uso.")
         else: raise
     finally:
         if httpd: httpd.shutdown()
-        if mysql_connection and mysql_connection.open:
-            mysql_connection.close()
-            logging.info("Conexão MySQL fechada.")
+        if http_frontend: http_frontend.close()
+        db_executor.shutdown(wait=True)
+        mysql_pool.close_all()
+        logging.info("Conexões MySQL fechadas.")
 
 if __name__ == "__main__":
     try: